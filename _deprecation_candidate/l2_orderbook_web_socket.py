@@ -1,78 +1,53 @@
 import json
 import os
 import threading
-import time
 
+import requests
 import websocket
 from dotenv import load_dotenv
 
+from bullish.heartbeat import HEARTBEATS
+from bullish.fixed_point import MarketPrecision
+from bullish.orderbook import OrderBook
+from bullish.sequence import SequenceTracker
+
 load_dotenv()
 
+API_HOST_NAME = os.getenv("BX_API_HOSTNAME")
 WS_HOST_NAME = os.getenv("BX_WS_API_HOSTNAME")
-BIDS = {}
-ASKS = {}
-SEQ_NUM = None
-IS_FIRST_CONFLATED_MESSAGE = True
-
-
-def get_id():
-    return str(int(time.time() * 1000))
-
-
-def ping(conn):
-    ping_message = {
-        "jsonrpc": "2.0",
-        "type": "command",
-        "method": "keepalivePing",
-        "params": {},
-        "id": get_id()
-    }
-    conn.send(json.dumps(ping_message))
-    threading.Timer(interval=5, function=ping, args=(conn,)).start()
-
-
-def update_price_level(new_price_levels, current_price_levels):
-    for i in range(0, len(new_price_levels), 2):
-        price = new_price_levels[i]
-        qty = new_price_levels[i + 1]
-        if float(qty) == 0 and price in current_price_levels:
-            current_price_levels.pop(price)
-        else:
-            current_price_levels[price] = qty
-
-
-def validate_seq_num(conn, seq_num_range):
-    global IS_FIRST_CONFLATED_MESSAGE, SEQ_NUM
-    if IS_FIRST_CONFLATED_MESSAGE:
-        if seq_num_range[0] <= SEQ_NUM + 1 and SEQ_NUM <= seq_num_range[1]:
-            IS_FIRST_CONFLATED_MESSAGE = False
-            SEQ_NUM = seq_num_range[1]
-        else:
-            print(f"Sequence out of order. current={SEQ_NUM}, received={seq_num_range[0]}")
-            conn.close()
-    elif seq_num_range[0] != SEQ_NUM + 1:
-        print(f"Sequence out of order. expected={SEQ_NUM + 1}, received={seq_num_range[0]}")
-        conn.close()
+MARKET = requests.get(API_HOST_NAME + "/trading-api/v1/markets/BTCUSD").json()
+ORDER_BOOK = OrderBook("BTCUSD", MarketPrecision.from_market(MARKET))
+
+
+def request_snapshot():
+    """Resynchronise from the REST orderbook instead of reconnecting, then apply the updates held behind the gap"""
+    snapshot = requests.get(API_HOST_NAME + "/trading-api/v1/markets/BTCUSD/orderbook/hybrid").json()
+    print(f"Sequence gap not filled, resynchronising from snapshot sequenceNumber={snapshot['sequenceNumber']}")
+    ORDER_BOOK.apply_snapshot({
+        "bids": [x for level in snapshot["bids"] for x in (level["price"], level["priceLevelQuantity"])],
+        "asks": [x for level in snapshot["asks"] for x in (level["price"], level["priceLevelQuantity"])],
+        "sequenceNumber": snapshot["sequenceNumber"],
+    })
+    for update in SEQUENCE.reset(snapshot["sequenceNumber"]):
+        ORDER_BOOK.apply_update(update)
+
+
+SEQUENCE = SequenceTracker(request_snapshot, window=1.0)
 
 
 def on_message(conn, message):
-    global BIDS, ASKS, SEQ_NUM, IS_FIRST_CONFLATED_MESSAGE
     message = json.loads(message)
     if "type" not in message:
         return
     data = message["data"]
-    bids = data["bids"]
-    asks = data["asks"]
-    seq_num_range = data["sequenceNumberRange"]
-    if SEQ_NUM is not None:
-        validate_seq_num(conn, seq_num_range)
-    SEQ_NUM = seq_num_range[1]
     if message["type"] == "snapshot":
-        BIDS, ASKS = {}, {}
-    update_price_level(bids, BIDS)
-    update_price_level(asks, ASKS)
-    BIDS = dict(sorted(BIDS.items(), key=lambda price_level: float(price_level[0]), reverse=True))
-    ASKS = dict(sorted(ASKS.items(), key=lambda price_level: float(price_level[0])))
+        ORDER_BOOK.apply_snapshot(data)
+        updates = SEQUENCE.reset(data["sequenceNumberRange"][1])
+    else:
+        first, last = data["sequenceNumberRange"]
+        updates = SEQUENCE.accept(first, last, data)
+    for update in updates:
+        ORDER_BOOK.apply_update(update)
 
 
 def on_error(conn, message):
@@ -81,6 +56,8 @@ def on_error(conn, message):
 
 def on_close(conn, close_status_code, close_msg):
     print(f"Closed connection to {conn.url}. close_status_code={close_status_code}, close_msg={close_msg}")
+    HEARTBEATS.unregister(conn)
+    print(f"Sequence stats: {SEQUENCE.stats()}")
 
 
 def open_connection():
@@ -88,7 +65,7 @@ def open_connection():
                                      on_message=on_message,
                                      on_error=on_error,
                                      on_close=on_close)
-    threading.Timer(interval=5, function=ping, args=(ws_conn,)).start()
+    HEARTBEATS.register(ws_conn, interval=5)
     ws_conn.run_forever()
 
 
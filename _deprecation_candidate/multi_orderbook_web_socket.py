@@ -6,6 +6,8 @@ import time
 import websocket
 from dotenv import load_dotenv
 
+from bullish.heartbeat import HEARTBEATS
+
 load_dotenv()
 
 HOST_NAME = os.getenv("BX_WS_API_HOSTNAME")
@@ -15,18 +17,6 @@ def get_id():
     return str(int(time.time() * 1000))
 
 
-def ping(conn):
-    ping_message = {
-        "jsonrpc": "2.0",
-        "type": "command",
-        "method": "keepalivePing",
-        "params": {},
-        "id": get_id()
-    }
-    conn.send(json.dumps(ping_message))
-    threading.Timer(interval=5, function=ping, args=(conn,)).start()
-
-
 def on_message(conn, message):
     print(f"Received message: {message}")
 
@@ -37,6 +27,7 @@ def on_error(conn, message):
 
 def on_close(conn, close_status_code, close_msg):
     print(f"Closed connection to {conn.url}. close_status_code={close_status_code}, close_msg={close_msg}")
+    HEARTBEATS.unregister(conn)
 
 
 def on_open(conn):
@@ -103,7 +94,7 @@ def open_connection():
                                      on_message=on_message,
                                      on_error=on_error,
                                      on_close=on_close)
-    threading.Timer(interval=5, function=ping, args=(ws_conn,)).start()
+    HEARTBEATS.register(ws_conn, interval=5)
     ws_conn.run_forever()
 
 
@@ -0,0 +1,105 @@
+"""
+Submits the same V3CreateOrder requests through the synchronous path of the example scripts, one blocking
+session.post at a time on the shared bullish.rest client, and through bullish.aio_rest.AsyncRestClient with up to
+BX_ASYNC_IN_FLIGHT orders awaited at once, and compares their throughput and latency. Run it against a local
+bullish/mock_exchange.py or another test host, never production.
+
+Orders are HMAC-signed with BX_SECRET_KEY and the JWT is BX_JWT, see session/generate_jwt_hmac.py.
+
+    BX_ASYNC_ORDERS=2000            orders per run
+    BX_ASYNC_IN_FLIGHT=200          orders awaited at once by the async client
+    BX_ASYNC_CONNECTIONS=32         connections of the async client
+
+    PYTHONPATH=. python3 benchmarks/async_rest_benchmark.py
+"""
+import asyncio
+import os
+import time
+from collections import Counter
+
+from dotenv import load_dotenv
+
+from bullish.aio_rest import ORDERS_PATH, AsyncRestClient
+from bullish.canonical import V3_CREATE_ORDER
+from bullish.latency import LatencyStats
+from bullish.nonce import NonceAllocator
+from bullish.rest import RestClient, get_client
+from bullish.signing import HmacSigner
+
+load_dotenv()
+
+HOST_NAME = os.getenv("BX_API_HOSTNAME")
+JWT_TOKEN = os.getenv("BX_JWT")
+TRADING_ACCOUNT_ID = os.getenv("BX_TRADING_ACCOUNT_ID")
+RATELIMIT_TOKEN = os.getenv("BX_RATELIMIT_TOKEN")
+ORDERS = int(os.getenv("BX_ASYNC_ORDERS", "2000"))
+IN_FLIGHT = int(os.getenv("BX_ASYNC_IN_FLIGHT", "200"))
+CONNECTIONS = int(os.getenv("BX_ASYNC_CONNECTIONS", "32"))
+ORDER = V3_CREATE_ORDER.bind(symbol="BTCUSDC", type="LIMIT", side="BUY", quantity="0.00100000", timeInForce="GTC",
+                             allowBorrow=False, tradingAccountId=TRADING_ACCOUNT_ID)
+
+
+def order_body(nonce, i):
+    return ORDER.render(price=f"{1000 + i % 100}.0000", clientOrderId=nonce)
+
+
+def report(name, statuses, elapsed, latencies):
+    print(f"{name:<6} {sum(statuses.values()):,} orders in {elapsed:.2f}s, "
+          f"{sum(statuses.values()) / elapsed:,.0f} orders/s, statuses={dict(statuses)}")
+    latencies.report()
+
+
+def run_sync(signer, nonces):
+    # without the rate limiter of the shared client, neither client is paced
+    session = RestClient()
+    session.warm(HOST_NAME)
+    statuses, latencies = Counter(), LatencyStats()
+    start = time.perf_counter()
+    for i in range(ORDERS):
+        nonce = str(nonces.next())
+        timestamp = str(time.time_ns() // 1_000_000)
+        body = order_body(nonce, i)
+        headers = {
+            "Content-type": "application/json",
+            "Authorization": f"Bearer {JWT_TOKEN}",
+            "BX-SIGNATURE": signer.sign(timestamp, nonce, "POST", ORDERS_PATH, body),
+            "BX-TIMESTAMP": timestamp,
+            "BX-NONCE": nonce,
+            "BX-RATELIMIT-TOKEN": f"{RATELIMIT_TOKEN}",
+        }
+        sent = time.perf_counter()
+        response = session.post(HOST_NAME + ORDERS_PATH, data=body, headers=headers)
+        latencies.record("rtt", time.perf_counter() - sent)
+        statuses[response.status_code] += 1
+    report("sync", statuses, time.perf_counter() - start, latencies)
+
+
+async def run_async(signer, nonces):
+    statuses, latencies = Counter(), LatencyStats()
+    in_flight = asyncio.Semaphore(IN_FLIGHT)
+
+    async def send(client, i):
+        async with in_flight:
+            # the clientOrderId only has to be unique, so it is drawn apart from the nonce the client signs with
+            body = order_body(str(nonces.next()), i)
+            sent = time.perf_counter()
+            response = await client.create_order(body)
+            latencies.record("rtt", time.perf_counter() - sent)
+            statuses[response.status] += 1
+
+    async with AsyncRestClient(HOST_NAME, signer, JWT_TOKEN, nonces=nonces, ratelimit_token=RATELIMIT_TOKEN,
+                               max_connections=CONNECTIONS) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(send(client, i) for i in range(ORDERS)))
+        report("async", statuses, time.perf_counter() - start, latencies)
+
+
+def main():
+    signer = HmacSigner(os.getenv("BX_SECRET_KEY"))
+    nonces = NonceAllocator.sync(get_client(HOST_NAME), HOST_NAME, path=os.getenv("BX_NONCE_FILE"))
+    run_sync(signer, nonces)
+    asyncio.run(run_async(signer, nonces))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Compares serializing request bodies with json.dumps(body, separators=(",", ":")) and encoding, as the examples used to
+do, against bullish.canonical.canonical() and the precompiled templates, for each command type with a template. Orders
+are also rendered from a template bound to one market, patching only the side, price, quantity and clientOrderId. All
+are checked to give the same bytes.
+
+    PYTHONPATH=. python3 benchmarks/canonical_benchmark.py [bodies per command type]
+"""
+import json
+import sys
+import time
+
+from bullish.canonical import V1_AMEND_ORDER, V1_CREATE_OTC_TRADE, V1_WITHDRAWAL, V3_CREATE_ORDER, canonical
+
+
+def create_order(i):
+    return V3_CREATE_ORDER, {
+        "symbol": "BTCUSDC",
+        "commandType": "V3CreateOrder",
+        "type": "LIMIT",
+        "side": "BUY" if i % 2 else "SELL",
+        "quantity": f"0.{i % 1000:05d}000",
+        "price": f"{30000 + i % 100:.4f}",
+        "timeInForce": "GTC",
+        "allowBorrow": False,
+        "clientOrderId": str(1_700_000_000_000_000 + i),
+        "tradingAccountId": "111000000000001",
+    }
+
+
+def amend_order(i):
+    return V1_AMEND_ORDER, {
+        "commandType": "V1AmendOrder",
+        "orderId": str(832910066626069505 + i),
+        "type": "POST_ONLY",
+        "symbol": "ETHUSDC",
+        "tradingAccountId": "111000000000001",
+    }
+
+
+def create_otc_trade(i):
+    return V1_CREATE_OTC_TRADE, {
+        "commandType": "V1CreateOtcTrade",
+        "sharedMatchKey": f"match{i}",
+        "clientOtcTradeId": str(20250519000 + i),
+        "tradingAccountId": "111000000000001",
+        "isTaker": False,
+        "remarks": "create otc trade",
+        "trades": [
+            {"symbol": "SOL-USDC-PERP", "side": "SELL", "price": "130", "quantity": "1.0000"},
+            {"symbol": "BTC-USDC-20250829", "side": "BUY", "price": "52669.3", "quantity": "0.25"},
+        ],
+    }
+
+
+def withdrawal(i):
+    return V1_WITHDRAWAL, {
+        "nonce": f"85548fae-5fec-44ab-83a4-{i:012d}",
+        "timestamp": str(1696841072969 + i),
+        "authorizer": "59E62367E8C900000500000000000000",
+        "command": {
+            "commandType": "V1Withdrawal",
+            "destinationId": "2097b2374a02a345b23845c023d84c502d83cf45c23ed2345acb98b274",
+            "network": "EOS",
+            "symbol": "EOS",
+            "quantity": "0.1",
+        },
+    }
+
+
+def field_values(template, body):
+    """The render() arguments of a body, i.e. its values under the template's field names"""
+    values = {}
+    for key, value in body.items():
+        if key in template.fields:
+            values[key] = value
+        elif isinstance(value, dict):
+            values.update(field_values(template, value))
+    return values
+
+
+def run(name, count, serialize_all):
+    start = time.perf_counter()
+    serialized = serialize_all()
+    elapsed = time.perf_counter() - start
+    print(f"  {name:<12} {count / elapsed:>12,.0f} bodies/s {elapsed / count * 1e6:>8,.2f} us/body")
+    return serialized
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    for command in (create_order, amend_order, create_otc_trade, withdrawal):
+        template = command(0)[0]
+        bodies = [command(i)[1] for i in range(count)]
+        values = [field_values(template, body) for body in bodies]
+        print(command.__name__)
+        expected = run("json.dumps", count, lambda: [
+            json.dumps(body, separators=(",", ":")).encode("utf-8") for body in bodies])
+        assert run("canonical", count, lambda: [canonical(body) for body in bodies]) == expected
+        assert run("template", count, lambda: [template.render(**fields) for fields in values]) == expected
+        if template is V3_CREATE_ORDER:
+            bound = template.bind(symbol="BTCUSDC", type="LIMIT", timeInForce="GTC", allowBorrow=False,
+                                  tradingAccountId="111000000000001")
+            patched = [{name: fields[name] for name in bound.fields} for fields in values]
+            assert run("bound", count, lambda: [bound.render(**fields) for fields in patched]) == expected
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Compares decoding every frame with json.loads before routing, as the websocket examples used to do, against
+bullish.dispatch.Dispatcher, which peeks the routing fields and decodes only the frames a handler subscribed to, with
+the json and orjson codecs.
+
+Frames are read from a recording made with BX_RECORD_DIR (bullish/recorder.py segment files), or generated as a mixed
+multi-symbol orderbook feed. The handler subscribes to a single symbol, so most frames are never decoded, and then to
+every symbol, where the codec decodes every frame. Each case reports the best of BX_DISPATCH_REPEATS runs.
+
+    PYTHONPATH=. python3 benchmarks/dispatch_benchmark.py [recording directory] [symbol]
+"""
+import json
+import os
+import random
+import sys
+import time
+
+from bullish.dispatch import Dispatcher, get_codec
+from bullish.recorder import FeedReader
+
+REPEATS = int(os.getenv("BX_DISPATCH_REPEATS", "5"))
+SYMBOLS = ["BTCUSDC", "ETHUSDC", "SOLUSDC", "XRPUSDC", "BTCUSD", "ETHUSD", "LTCUSDC", "DOGEUSDC"]
+
+
+def generate_frames(count, seed=7):
+    rng = random.Random(seed)
+    frames = []
+    for i in range(count):
+        symbol = rng.choice(SYMBOLS)
+        if rng.random() < 0.02:
+            frames.append(json.dumps({"id": str(i), "jsonrpc": "2.0", "result": {"responseCode": "200"}}))
+            continue
+        levels = [x for level in range(20) for x in (f"{30000 - level * 0.1:.1f}", f"{rng.uniform(0, 5):.8f}")]
+        frames.append(json.dumps({
+            "type": "snapshot",
+            "dataType": "V1TALevel2",
+            "data": {
+                "symbol": symbol,
+                "bids": levels,
+                "asks": levels,
+                "sequenceNumber": str(i),
+                "timestamp": str(1700000000000 + i),
+            },
+        }, separators=(",", ":")))
+    return frames
+
+
+def run(name, frames, on_frame, received):
+    best = None
+    for _ in range(REPEATS):
+        received.clear()
+        start = time.perf_counter()
+        for frame in frames:
+            on_frame(frame)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"  {name:<18} {len(frames) / best:>12,.0f} frames/s")
+    return len(received)
+
+
+def main():
+    if len(sys.argv) > 1:
+        frames = [frame for _, _, frame in FeedReader(sys.argv[1]).frames()]
+    else:
+        frames = generate_frames(50_000)
+    symbol = sys.argv[2] if len(sys.argv) > 2 else "BTCUSDC"
+    received = []
+
+    def on_message(message):
+        # counted rather than kept, so that garbage collection of the decoded frames does not skew the timings
+        received.append(None)
+
+    for wanted in (symbol, None):
+        print(f"subscribed to {wanted or 'every symbol'}")
+
+        def decode_all(frame):
+            message = json.loads(frame)
+            if "type" not in message:
+                return
+            if wanted is None or message["data"].get("symbol") == wanted:
+                on_message(message)
+
+        expected = run("json.loads all", frames, decode_all, received)
+        for codec in ("json", "orjson"):
+            dispatcher = Dispatcher(codec=get_codec(codec))
+            if wanted is None:
+                dispatcher.subscribe(on_message)
+            else:
+                dispatcher.subscribe(on_message, symbol=wanted)
+            count = run(f"dispatch ({get_codec(codec).__name__})", frames, dispatcher.dispatch, received)
+            assert count == expected, f"{count} != {expected}"
+
+
+if __name__ == "__main__":
+    main()
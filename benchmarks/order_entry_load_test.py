@@ -0,0 +1,196 @@
+"""
+Order-entry load test: submits V3CreateOrder requests signed as in orders/create_order_hmac.py or
+orders/create_order_ecdsa.py against BX_API_HOSTNAME, e.g. a local bullish/mock_exchange.py, and records sign time,
+serialize time and round-trip time separately. Bodies are rendered from a bullish.canonical template
+bound to everything but the side, price, quantity and clientOrderId.
+
+Orders are sent from BX_LOAD_CONCURRENCY threads sharing one bullish.rest client, with a connection per thread opened
+before the test starts, and the results count how many requests reused a connection. With BX_LOAD_RATE set the
+orders are scheduled open-loop at that many per second, and "late" records how far behind schedule each was sent;
+otherwise every thread sends back to back. Results are printed and written as JSON to BX_LOAD_RESULTS.
+
+    BX_LOAD_SIGNING=hmac|ecdsa      signing scheme, ecdsa signs with BX_PRIVATE_KEY_PEM
+    BX_PRIVATE_KEY_PEM=             PEM-encoded ECDSA private key, required with BX_LOAD_SIGNING=ecdsa
+    BX_ECDSA_BACKEND=               cryptography|ecdsa, the fastest one installed by default
+    BX_LOAD_RATE=0                  orders per second, 0 for as fast as the threads allow
+    BX_LOAD_CONCURRENCY=4           sending threads
+    BX_LOAD_DURATION=10             seconds
+    BX_LOAD_RESULTS=load_test.json
+    BX_LOAD_LOGIN=false             log in with BX_PUBLIC_KEY/BX_SECRET_KEY or the ECDSA key instead of using BX_JWT
+
+The mock exchange only accepts ECDSA signatures from keys that logged in or are listed in BX_MOCK_PUBLIC_KEY_FILE.
+
+    PYTHONPATH=. python3 benchmarks/order_entry_load_test.py
+"""
+import base64
+import itertools
+import json
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+import requests
+from dotenv import load_dotenv
+
+from bullish.canonical import V3_CREATE_ORDER
+from bullish.latency import LatencyStats
+from bullish.nonce import NonceAllocator
+from bullish.rest import POOL_SIZE, RestClient
+from bullish.signing import HmacSigner, ecdsa_signer
+
+load_dotenv()
+
+HOST_NAME = os.getenv("BX_API_HOSTNAME")
+TRADING_ACCOUNT_ID = os.getenv("BX_TRADING_ACCOUNT_ID")
+RATELIMIT_TOKEN = os.getenv("BX_RATELIMIT_TOKEN")
+SIGNING = os.getenv("BX_LOAD_SIGNING", "hmac")
+RATE = float(os.getenv("BX_LOAD_RATE", "0"))
+CONCURRENCY = int(os.getenv("BX_LOAD_CONCURRENCY", "4"))
+DURATION = float(os.getenv("BX_LOAD_DURATION", "10"))
+RESULTS = os.getenv("BX_LOAD_RESULTS", "load_test.json")
+LOGIN = os.getenv("BX_LOAD_LOGIN", "false").lower() == "true"
+URI = "/trading-api/v2/orders"
+# everything but the side, price, quantity and clientOrderId is encoded once
+ORDER = V3_CREATE_ORDER.bind(symbol="BTCUSDC", type="LIMIT", timeInForce="GTC", allowBorrow=False,
+                             tradingAccountId=TRADING_ACCOUNT_ID)
+
+
+def hmac_login(session, signer):
+    public_key = os.getenv("BX_PUBLIC_KEY")
+    path = "/trading-api/v1/users/hmac/login"
+    nonce = str(int(datetime.now(timezone.utc).timestamp()))
+    timestamp = str(int(datetime.now(timezone.utc).timestamp() * 1000))
+    signature = signer.sign_login(timestamp, nonce, path)
+    headers = {"BX-PUBLIC-KEY": public_key, "BX-NONCE": nonce, "BX-SIGNATURE": signature, "BX-TIMESTAMP": timestamp}
+    return session.get(HOST_NAME + path, headers=headers).json()["token"]
+
+
+def ecdsa_login(session, signer):
+    metadata = os.getenv("BX_API_METADATA")
+    user_id = str(json.loads(base64.b64decode(metadata)).get("userId", "")) if metadata else ""
+    timestamp = int(datetime.now(timezone.utc).timestamp())
+    login_payload = {"userId": user_id, "nonce": timestamp, "expirationTime": timestamp + 300,
+                     "biometricsUsed": False, "sessionKey": None}
+    payload = json.dumps(login_payload, separators=(",", ":")).encode("utf-8")
+    body = {"publicKey": signer.public_key_pem().strip(), "signature": signer.sign(payload),
+            "loginPayload": login_payload}
+    return session.post(HOST_NAME + "/trading-api/v2/users/login", json=body).json()["token"]
+
+
+class LoadTest:
+
+    def __init__(self, session, sign, jwt_token, nonces, rate=RATE, concurrency=CONCURRENCY, duration=DURATION):
+        self.session = session
+        self.sign = sign
+        self.nonces = nonces
+        self.jwt_token = jwt_token
+        self.rate = rate
+        self.concurrency = concurrency
+        self.duration = duration
+        self.latencies = LatencyStats()
+        self.statuses = Counter()
+        self.errors = Counter()
+        self._sequence = itertools.count()
+
+    def send_order(self):
+        next_nonce_str = str(self.nonces.next())
+        timestamp = str(int(datetime.now(timezone.utc).timestamp() * 1000))
+        started = time.perf_counter()
+        body = ORDER.render(side="BUY", quantity="0.00100000", price="1000.0000", clientOrderId=next_nonce_str)
+        serialized = time.perf_counter()
+        signature = self.sign(timestamp, next_nonce_str, "POST", URI, body)
+        signed = time.perf_counter()
+        headers = {
+            "Content-type": "application/json",
+            "Authorization": f"Bearer {self.jwt_token}",
+            "BX-SIGNATURE": signature,
+            "BX-TIMESTAMP": timestamp,
+            "BX-NONCE": next_nonce_str,
+            "BX-RATELIMIT-TOKEN": f"{RATELIMIT_TOKEN}"
+        }
+        response = self.session.post(HOST_NAME + URI, data=body, headers=headers)
+        finished = time.perf_counter()
+        self.latencies.record("serialize", serialized - started)
+        self.latencies.record("sign", signed - serialized)
+        self.latencies.record("rtt", finished - signed)
+        self.statuses[response.status_code] += 1
+        if response.status_code != 200:
+            try:
+                self.errors[response.json().get("errorCodeName", response.status_code)] += 1
+            except ValueError:
+                self.errors[response.status_code] += 1
+
+    def worker(self, start, end):
+        while True:
+            if self.rate:
+                due = start + next(self._sequence) / self.rate
+                if due >= end:
+                    return
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    self.latencies.record("late", -delay)
+            elif time.perf_counter() >= end:
+                return
+            try:
+                self.send_order()
+            except requests.RequestException as e:
+                self.errors[type(e).__name__] += 1
+
+    def run(self):
+        start = time.perf_counter()
+        end = start + self.duration
+        threads = [threading.Thread(target=self.worker, args=(start, end)) for _ in range(self.concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        orders = sum(self.statuses.values())
+        return {
+            "host": HOST_NAME,
+            "signing": SIGNING,
+            "target_rate": self.rate,
+            "concurrency": self.concurrency,
+            "duration": self.duration,
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "orders": orders,
+            "achieved_rate": orders / elapsed,
+            "statuses": {str(status): count for status, count in self.statuses.items()},
+            "errors": dict(self.errors),
+            "latency_us": self.latencies.summary(),
+            "connections": self.session.stats(),
+        }
+
+
+def main():
+    session = RestClient(pool_size=max(POOL_SIZE, CONCURRENCY))
+    session.warm(HOST_NAME, CONCURRENCY)
+    if SIGNING == "ecdsa":
+        private_key_pem = os.getenv("BX_PRIVATE_KEY_PEM")
+        if not private_key_pem:
+            raise SystemExit("BX_LOAD_SIGNING=ecdsa needs the PEM-encoded private key in BX_PRIVATE_KEY_PEM")
+        signer = ecdsa_signer(private_key_pem, backend=os.getenv("BX_ECDSA_BACKEND"))
+        sign = signer.sign_request
+        print(f"Signing with the {signer.backend} package")
+        jwt_token = ecdsa_login(session, signer) if LOGIN else os.getenv("BX_JWT")
+    else:
+        signer = HmacSigner(os.getenv("BX_SECRET_KEY"))
+        sign = signer.sign_request
+        jwt_token = hmac_login(session, signer) if LOGIN else os.getenv("BX_JWT")
+    nonces = NonceAllocator.sync(session, HOST_NAME, path=os.getenv("BX_NONCE_FILE"))
+    load_test = LoadTest(session, sign, jwt_token, nonces)
+    results = load_test.run()
+    print(f"{results['orders']:,} orders in {DURATION:.0f}s, {results['achieved_rate']:,.1f} orders/s, "
+          f"statuses={results['statuses']} errors={results['errors']} connections={results['connections']}")
+    load_test.latencies.report()
+    with open(RESULTS, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {RESULTS}")
+
+
+if __name__ == "__main__":
+    main()
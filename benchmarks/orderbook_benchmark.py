@@ -0,0 +1,89 @@
+"""
+Compares the dict rebuild-and-sort order book from the original hybrid orderbook example against bullish.orderbook.
+
+    PYTHONPATH=. python3 benchmarks/orderbook_benchmark.py [number of updates] [book depth]
+"""
+import random
+import sys
+import time
+
+from bullish.fixed_point import MarketPrecision
+from bullish.orderbook import OrderBook
+
+
+def legacy_update_price_level(new_price_levels, current_price_levels):
+    for i in range(0, len(new_price_levels), 2):
+        price = new_price_levels[i]
+        qty = new_price_levels[i + 1]
+        if float(qty) == 0 and price in current_price_levels:
+            current_price_levels.pop(price)
+        else:
+            current_price_levels[price] = qty
+
+
+def legacy_on_message(book, message):
+    data = message["data"]
+    if message["type"] == "snapshot":
+        book["bids"], book["asks"] = {}, {}
+    legacy_update_price_level(data["bids"], book["bids"])
+    legacy_update_price_level(data["asks"], book["asks"])
+    book["bids"] = dict(sorted(book["bids"].items(), key=lambda price_level: float(price_level[0]), reverse=True))
+    book["asks"] = dict(sorted(book["asks"].items(), key=lambda price_level: float(price_level[0])))
+
+
+def generate_messages(updates, depth, mid=30000.0, tick=0.1, seed=7):
+    rng = random.Random(seed)
+
+    def level(offset):
+        return f"{mid + offset * tick:.1f}"
+
+    snapshot = {
+        "type": "snapshot",
+        "data": {
+            "bids": [x for i in range(1, depth + 1) for x in (level(-i), "1.00000000")],
+            "asks": [x for i in range(1, depth + 1) for x in (level(i), "1.00000000")],
+            "sequenceNumberRange": [1, 1],
+        },
+    }
+    messages = [snapshot]
+    for seq in range(2, updates + 2):
+        side = "bids" if rng.random() < 0.5 else "asks"
+        # most activity happens close to the top of the book
+        offset = int(rng.expovariate(1 / (depth / 10))) + 1
+        price = level(-offset if side == "bids" else offset)
+        quantity = "0" if rng.random() < 0.3 else f"{rng.uniform(0.01, 5):.8f}"
+        data = {"bids": [], "asks": [], "sequenceNumberRange": [seq, seq]}
+        data[side] = [price, quantity]
+        messages.append({"type": "update", "data": data})
+    return messages
+
+
+def run(name, messages, handler):
+    start = time.perf_counter()
+    for message in messages:
+        handler(message)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<10} {len(messages) / elapsed:>12,.0f} msg/s  ({elapsed * 1e6 / len(messages):.2f} us/msg)")
+
+
+def main():
+    updates = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    depth = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    messages = generate_messages(updates, depth)
+
+    legacy_book = {"bids": {}, "asks": {}}
+    run("legacy", messages, lambda message: legacy_on_message(legacy_book, message))
+
+    precision = MarketPrecision(base_precision=8, quote_precision=4)
+    book = OrderBook("BTCUSD", precision)
+    run("ladder", messages, book.on_message)
+
+    # the legacy update keeps deletes of unknown levels around as "0" quantity levels, skip those
+    legacy_bbo = tuple(next((precision.parse_price(price), precision.parse_quantity(quantity))
+                            for price, quantity in legacy_book[side].items() if float(quantity) != 0)
+                       for side in ("bids", "asks"))
+    assert book.bbo() == legacy_bbo, f"books diverged: {book.bbo()} != {legacy_bbo}"
+
+
+if __name__ == "__main__":
+    main()
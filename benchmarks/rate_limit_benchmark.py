@@ -0,0 +1,85 @@
+"""
+Sends a burst of BX_RATELIMIT_ORDERS new orders followed by BX_RATELIMIT_CANCELS cancels, all at once through
+bullish.aio_rest.AsyncRestClient, first unpaced and then paced by a bullish.ratelimit.RateLimiter, and reports the
+429s and how long the orders and the cancels took. Against a server that enforces a limit the unpaced burst is
+mostly rejected. The limiter learns the limit from the response headers during its first burst, which is only
+rejected as far as it exceeded the limit before the first response, and sends the cancels ahead of the queued orders.
+A second burst through the same limiter shows it once tuned.
+
+Run it against bullish/mock_exchange.py started with BX_MOCK_RATE_LIMIT, e.g. 20 requests per second, never against
+production. Orders are HMAC-signed with BX_SECRET_KEY and the JWT is BX_JWT, see session/generate_jwt_hmac.py.
+
+    BX_RATELIMIT_ORDERS=100         new orders in the burst
+    BX_RATELIMIT_CANCELS=5          cancels queued behind them
+
+    PYTHONPATH=. python3 benchmarks/rate_limit_benchmark.py
+"""
+import asyncio
+import os
+import time
+from collections import Counter
+
+from dotenv import load_dotenv
+
+from bullish.aio_rest import AsyncRestClient
+from bullish.canonical import V3_CREATE_ORDER
+from bullish.latency import LatencyStats
+from bullish.nonce import NonceAllocator
+from bullish.ratelimit import RateLimiter
+from bullish.rest import get_client
+from bullish.signing import HmacSigner
+
+load_dotenv()
+
+HOST_NAME = os.getenv("BX_API_HOSTNAME")
+JWT_TOKEN = os.getenv("BX_JWT")
+TRADING_ACCOUNT_ID = os.getenv("BX_TRADING_ACCOUNT_ID")
+RATELIMIT_TOKEN = os.getenv("BX_RATELIMIT_TOKEN")
+ORDERS = int(os.getenv("BX_RATELIMIT_ORDERS", "100"))
+CANCELS = int(os.getenv("BX_RATELIMIT_CANCELS", "5"))
+ORDER = V3_CREATE_ORDER.bind(symbol="BTCUSDC", type="LIMIT", side="BUY", quantity="0.00100000", timeInForce="GTC",
+                             allowBorrow=False, tradingAccountId=TRADING_ACCOUNT_ID)
+
+
+async def burst(signer, nonces, rate_limiter):
+    statuses = {"orders": Counter(), "cancels": Counter()}
+    latencies = LatencyStats()
+
+    async def send(kind, request):
+        sent = time.perf_counter()
+        response = await request
+        latencies.record(kind, time.perf_counter() - sent)
+        statuses[kind][response.status] += 1
+
+    async with AsyncRestClient(HOST_NAME, signer, JWT_TOKEN, nonces=nonces, ratelimit_token=RATELIMIT_TOKEN,
+                               rate_limiter=rate_limiter) as client:
+        orders = [send("orders", client.create_order(ORDER.render(price=f"{1000 + i}.0000",
+                                                                  clientOrderId=str(nonces.next()))))
+                  for i in range(ORDERS)]
+        cancels = [send("cancels", client.cancel_order(orderId=str(i), symbol="BTCUSDC",
+                                                       tradingAccountId=TRADING_ACCOUNT_ID))
+                   for i in range(CANCELS)]
+        start = time.perf_counter()
+        await asyncio.gather(*orders, *cancels)
+        elapsed = time.perf_counter() - start
+    print(f"  {ORDERS} orders and {CANCELS} cancels in {elapsed:.2f}s, orders={dict(statuses['orders'])} "
+          f"cancels={dict(statuses['cancels'])}")
+    latencies.report()
+
+
+def main():
+    signer = HmacSigner(os.getenv("BX_SECRET_KEY"))
+    nonces = NonceAllocator.sync(get_client(HOST_NAME), HOST_NAME, path=os.getenv("BX_NONCE_FILE"))
+    print("unpaced")
+    asyncio.run(burst(signer, nonces, None))
+    rate_limiter = RateLimiter()
+    for name in ("rate limited", "rate limited, tuned"):
+        # let the server's window reset, so that each burst starts from a full budget
+        time.sleep(1)
+        print(name)
+        asyncio.run(burst(signer, nonces, rate_limiter))
+    print(f"limiter stats={dict(rate_limiter.stats)}")
+
+
+if __name__ == "__main__":
+    main()
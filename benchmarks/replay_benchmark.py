@@ -0,0 +1,115 @@
+"""
+Replays recorded websocket frames through order book, trades, tick and private-data handlers and reports the handler
+throughput reached, see bullish/replay.py.
+
+The handlers are stand-ins built here from the same library pieces the websocket scripts use: orderbook frames go to
+an OrderBookManager, trade updates to a TradeBuffer and a CandleAggregator per symbol. The scripts' own on_message
+functions are not called, because importing a script connects to the exchange. Tick and private-data frames are only
+decoded by the Dispatcher, their handlers do nothing. The throughput is therefore that of decoding plus the library
+handlers, not of the example scripts, whose printing alone would dominate it.
+
+Pass one or more directories recorded with BX_RECORD_DIR (e.g. one per shard process), they are merged by receive
+time. Without a recording, per-symbol orderbook and trades streams are generated and merged the same way. The replay
+runs as fast as the handlers allow unless BX_REPLAY_SPEED is set (1 for the recorded pace, 10 for ten times faster).
+Prices and quantities are decoded with 8 decimals, so no markets request is needed offline.
+
+    PYTHONPATH=. python3 benchmarks/replay_benchmark.py [recording directory ...]
+"""
+import json
+import os
+import random
+import sys
+from collections import defaultdict
+
+from bullish.aio_websocket import ORDERBOOK_PATH, PRIVATE_DATA_PATH, TICK_PATH, TRADES_PATH
+from bullish.candles import CandleAggregator
+from bullish.dispatch import Dispatcher, get_codec
+from bullish.fixed_point import MarketPrecision
+from bullish.orderbook import OrderBookManager
+from bullish.recorder import FeedReader
+from bullish.replay import FeedReplayer
+from bullish.trades import TradeBuffer
+
+SYMBOLS = ["BTCUSDC", "ETHUSDC", "SOLUSDC", "XRPUSDC"]
+PRECISION = MarketPrecision(8, 8)
+CODEC = get_codec()
+
+
+def generate_symbol_stream(symbol, count, seed):
+    """Orderbook snapshots and trade updates of one symbol, as (received_ns, channel, frame) in receive order"""
+    rng = random.Random(seed)
+    received_ns = 1_700_000_000_000_000_000
+    mid = rng.uniform(100, 30000)
+    for i in range(count):
+        received_ns += rng.randint(100_000, 2_000_000)
+        mid *= 1 + rng.uniform(-0.0005, 0.0005)
+        if rng.random() < 0.7:
+            levels = [f"{mid * (1 - level * 0.0001):.2f}" for level in range(1, 11)]
+            asks = [f"{mid * (1 + level * 0.0001):.2f}" for level in range(1, 11)]
+            data = {
+                "symbol": symbol,
+                "bids": [x for price in levels for x in (price, f"{rng.uniform(0, 5):.8f}")],
+                "asks": [x for price in asks for x in (price, f"{rng.uniform(0, 5):.8f}")],
+                "sequenceNumber": str(i),
+                "timestamp": str(received_ns // 1_000_000),
+            }
+            frame = {"type": "snapshot", "dataType": "V1TALevel2", "data": data}
+            yield received_ns, ORDERBOOK_PATH, json.dumps(frame, separators=(",", ":"))
+        else:
+            data = {
+                "symbol": symbol,
+                "tradeId": str(100_000_000 + i),
+                "price": f"{mid:.2f}",
+                "quantity": f"{rng.uniform(0, 2):.8f}",
+                "side": rng.choice(("BUY", "SELL")),
+                "createdAtTimestamp": str(received_ns // 1_000_000),
+            }
+            frame = {"type": "update", "dataType": "V1TAAnonymousTradeUpdate", "data": data}
+            yield received_ns, TRADES_PATH.format(symbol=symbol), json.dumps(frame, separators=(",", ":"))
+
+
+def main():
+    if len(sys.argv) > 1:
+        sources = [FeedReader(directory) for directory in sys.argv[1:]]
+    else:
+        sources = [list(generate_symbol_stream(symbol, 50_000, seed)) for seed, symbol in enumerate(SYMBOLS)]
+    speed = float(os.getenv("BX_REPLAY_SPEED", "0")) or None
+
+    order_books = OrderBookManager(defaultdict(lambda: PRECISION))
+    book_dispatcher = Dispatcher(codec=CODEC)
+    book_dispatcher.subscribe(order_books.on_message)
+
+    trades = defaultdict(lambda: TradeBuffer(10_000, (60, 300)))
+    candles = CandleAggregator()
+
+    def on_trades_message(message):
+        data = message["data"]
+        for trade in (data if isinstance(data, list) else [data]):
+            trade = PRECISION.parse_trade(trade)
+            trades[trade["symbol"]].append_trade(trade)
+            candles.add_trade(trade["symbol"], trade["price"], trade["quantity"], int(trade["createdAtTimestamp"]))
+
+    trades_dispatcher = Dispatcher(codec=CODEC)
+    trades_dispatcher.subscribe(on_trades_message, type="update")
+
+    other_dispatcher = Dispatcher(codec=CODEC)
+    other_dispatcher.subscribe(lambda message: None)
+
+    replayer = FeedReplayer(sources, speed=speed)
+    replayer.route(ORDERBOOK_PATH, lambda conn, message: book_dispatcher.dispatch(message))
+    replayer.route(TRADES_PATH.format(symbol=""), lambda conn, message: trades_dispatcher.dispatch(message))
+    replayer.route(TICK_PATH, lambda conn, message: other_dispatcher.dispatch(message))
+    replayer.route(PRIVATE_DATA_PATH, lambda conn, message: other_dispatcher.dispatch(message))
+    stats = replayer.run()
+
+    print(f"replayed {stats['frames']:,} frames ({stats['skipped']:,} skipped) covering "
+          f"{stats['recorded_seconds']:.1f}s in {stats['elapsed_seconds']:.2f}s, max lag {stats['max_lag_seconds']:.3f}s")
+    for path, frames in stats["frames_by_path"].items():
+        print(f"  {path:<45} {frames:>10,} frames")
+    print(f"stand-in handler throughput {stats['handler_frames_per_second']:,.0f} frames/s")
+    for symbol in sorted({symbol for _, symbol in order_books.books}):
+        print(f"  {symbol:<10} bbo={order_books.bbo(symbol)} trades={len(trades[symbol]) if symbol in trades else 0}")
+
+
+if __name__ == "__main__":
+    main()
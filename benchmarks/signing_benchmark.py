@@ -0,0 +1,130 @@
+"""
+Measures request signing on V3CreateOrder payloads with bullish.signing.
+
+HMAC: keying hmac.new() and concatenating the payload string on every request, as orders/create_order_hmac.py used
+to, against HmacSigner, which copies a pre-keyed state and builds the payload in a reused bytearray. Signs with
+BX_SECRET_KEY, or a fixed test key.
+
+ECDSA: the backends of ecdsa_signer(), signing as in orders/create_order_ecdsa.py, checked to produce byte-identical
+signatures. Signs with PRIVATE_KEY_PEM, or with a freshly generated P-256 key when it is not set. Backends that are not
+installed are skipped.
+
+Pool: bursts of BX_SIGNING_BURST (40) orders, e.g. a quote refresh across 40 markets, signed in one process against a
+SigningPool of each size in BX_SIGNING_PROCESSES (1,2,4,8) up to the number of cores, checked to keep the order.
+
+    PYTHONPATH=. python3 benchmarks/signing_benchmark.py [ECDSA signatures, HMAC signs 20 times as many]
+"""
+import hmac
+import json
+import os
+import sys
+import time
+from hashlib import sha256
+
+from bullish.signing import ECDSA_BACKENDS, HmacSigner, SigningPool, ecdsa_signer
+
+URI = "/trading-api/v2/orders"
+BURST = int(os.getenv("BX_SIGNING_BURST", "40"))
+PROCESSES = [int(n) for n in os.getenv("BX_SIGNING_PROCESSES", "1,2,4,8").split(",") if int(n) <= (os.cpu_count() or 1)]
+
+
+def generate_requests(count):
+    """(timestamp, nonce, body) of `count` orders"""
+    requests = []
+    for i in range(count):
+        nonce = str(1_700_000_000_000_000 + i)
+        body = {
+            "symbol": "BTCUSDC",
+            "commandType": "V3CreateOrder",
+            "type": "LIMIT",
+            "side": "BUY",
+            "quantity": "0.00100000",
+            "price": f"{30000 + i % 100:.4f}",
+            "timeInForce": "GTC",
+            "allowBorrow": False,
+            "clientOrderId": nonce,
+            "tradingAccountId": "111000000000001",
+        }
+        requests.append((str(1_700_000_000_000 + i), nonce, json.dumps(body, separators=(",", ":"))))
+    return requests
+
+
+def run(name, count, sign_all, repeat=1):
+    """Sign everything `repeat` times and report the fastest run"""
+    elapsed = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        signatures = sign_all()
+        elapsed = min(elapsed, time.perf_counter() - start)
+    print(f"{name:<20} {count / elapsed:>12,.0f} signatures/s {elapsed / count * 1e6:>10,.2f} us/signature")
+    return signatures
+
+
+def benchmark_hmac(requests):
+    secret_key = os.getenv("BX_SECRET_KEY", "benchmark-secret-key").encode("utf-8")
+    signer = HmacSigner(secret_key)
+
+    def per_request():
+        signatures = []
+        for timestamp, nonce, body in requests:
+            payload = timestamp + nonce + "POST" + URI + body
+            digest = sha256(payload.encode("utf-8")).hexdigest().encode("utf-8")
+            signatures.append(hmac.new(secret_key, digest, sha256).hexdigest())
+        return signatures
+
+    def precomputed():
+        return [signer.sign(timestamp, nonce, "POST", URI, body) for timestamp, nonce, body in requests]
+
+    expected = run("hmac.new per request", len(requests), per_request, repeat=5)
+    assert run("HmacSigner", len(requests), precomputed, repeat=5) == expected, "HmacSigner produced different signatures"
+
+
+def benchmark_ecdsa(requests, private_key_pem):
+    count = len(requests)
+    payloads = [(timestamp + nonce + "POST" + URI + body).encode("utf-8") for timestamp, nonce, body in requests]
+    signatures = {}
+    for backend in ECDSA_BACKENDS:
+        try:
+            signer = ecdsa_signer(private_key_pem, backend=backend)
+        except Exception as e:
+            print(f"{'ecdsa ' + backend:<20} skipped: {e}")
+            continue
+        signatures[backend] = run(f"ecdsa {backend}", count, lambda: [signer.sign_der(payload) for payload in payloads])
+    results = list(signatures.values())
+    assert all(result == results[0] for result in results), "backends produced different signatures"
+    print(f"signatures identical across {', '.join(signatures)}")
+
+
+def benchmark_pool(requests, private_key_pem):
+    """Bursts of BURST orders signed in one process against a SigningPool of each size in PROCESSES"""
+    bursts = [[(timestamp, nonce, "POST", URI, body) for timestamp, nonce, body in requests[i:i + BURST]]
+              for i in range(0, len(requests), BURST)]
+    for backend in ECDSA_BACKENDS:
+        try:
+            signer = ecdsa_signer(private_key_pem, backend=backend)
+        except Exception:
+            continue
+        expected = run(f"{backend} 1 process", len(requests), lambda: [
+            [signer.sign((timestamp + nonce + method + path + body).encode("utf-8"))
+             for timestamp, nonce, method, path, body in burst] for burst in bursts])
+        for processes in PROCESSES:
+            with SigningPool(private_key_pem, processes=processes, backend=backend) as pool:
+                signed = run(f"{backend} pool of {processes}", len(requests), lambda: [
+                    [headers["BX-SIGNATURE"] for headers in pool.signed_headers(burst)] for burst in bursts])
+            assert signed == expected, "the pool returned signatures out of order"
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    private_key_pem = os.getenv("PRIVATE_KEY_PEM")
+    if not private_key_pem:
+        from ecdsa import NIST256p, SigningKey
+        private_key_pem = SigningKey.generate(curve=NIST256p).to_pem().decode()
+    benchmark_hmac(generate_requests(count * 20))
+    benchmark_ecdsa(generate_requests(count), private_key_pem)
+    print(f"bursts of {BURST} orders, {os.cpu_count()} cores")
+    benchmark_pool(generate_requests(count), private_key_pem)
+
+
+if __name__ == "__main__":
+    main()
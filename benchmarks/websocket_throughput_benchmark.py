@@ -0,0 +1,95 @@
+"""
+Message throughput of N feeds consumed with one websocket.WebSocketApp thread per connection, as in the websocket/
+examples, against the same feeds on one asyncio loop with bullish.aio_websocket.
+
+A local aiohttp server in a separate process pushes a fixed number of orderbook-sized frames down every connection.
+
+    PYTHONPATH=. python3 benchmarks/websocket_throughput_benchmark.py [connections] [messages per connection]
+"""
+import asyncio
+import json
+import multiprocessing
+import sys
+import threading
+import time
+
+import websocket
+from aiohttp import web
+
+from bullish.aio_websocket import FeedClient
+
+PORT = 18765
+FRAME = json.dumps({
+    "type": "update",
+    "dataType": "V1TAOrderBook",
+    "data": {
+        "symbol": "BTCUSDC",
+        "bids": ["30000.1", "1.00000000", "30000.0", "2.50000000"],
+        "asks": ["30000.2", "0.75000000", "30000.3", "4.00000000"],
+        "sequenceNumber": 1,
+        "timestamp": "1700000000000",
+    },
+})
+
+
+def serve(messages):
+    async def handler(request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        for _ in range(messages):
+            await ws.send_str(FRAME)
+        await ws.close()
+        return ws
+
+    app = web.Application()
+    app.router.add_get("/feed", handler)
+    web.run_app(app, host="127.0.0.1", port=PORT, print=None)
+
+
+def consume(message):
+    json.loads(message)
+
+
+def run_threaded(url, connections):
+    def on_message(conn, message):
+        consume(message)
+
+    threads = [threading.Thread(target=websocket.WebSocketApp(url, on_message=on_message).run_forever)
+               for _ in range(connections)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def run_asyncio(host, connections):
+    def on_message(conn, message):
+        consume(message)
+
+    feeds = FeedClient(host)
+    for _ in range(connections):
+        feeds.add("/feed", on_message, reconnect=False)
+    start = time.perf_counter()
+    asyncio.run(feeds.run())
+    return time.perf_counter() - start
+
+
+def main():
+    connections = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    messages = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    server = multiprocessing.Process(target=serve, args=(messages,), daemon=True)
+    server.start()
+    time.sleep(1)
+    try:
+        total = connections * messages
+        for name, elapsed in (("threaded", run_threaded(f"ws://127.0.0.1:{PORT}/feed", connections)),
+                              ("asyncio", run_asyncio(f"ws://127.0.0.1:{PORT}", connections))):
+            print(f"{name:<10} {connections} connections {total / elapsed:>12,.0f} msg/s")
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+"""
+Shared helpers used by the example scripts in this repository.
+
+Run the scripts from the repository root with the root on the Python path, e.g.
+
+    PYTHONPATH=. python3 websocket/multi_orderbook_web_socket.py
+"""
@@ -0,0 +1,157 @@
+"""
+asyncio client for the signed REST endpoints: orders, amends and cancels through /v2/command, OTC trades and commands,
+and custody withdrawals.
+
+Requests are signed as in the HMAC and ECDSA example scripts, with any signer from bullish.signing, and take their
+BX-NONCE from a bullish.nonce.NonceAllocator, so they can share the nonce file of synchronous scripts. Any number of
+requests can be awaited at once. They are sent over at most `max_connections` kept-alive connections and the rest
+wait for a free one, so hundreds of orders can be in flight without opening hundreds of sockets. Bodies are
+serialized once with bullish.canonical and the same bytes are signed and sent.
+
+With a bullish.ratelimit.RateLimiter as `rate_limiter`, requests are paced by the client's rate-limit token and their
+endpoint, cancels ahead of new orders, and the limiter tunes itself from the responses.
+
+Signing runs on the event loop. HMAC and the `cryptography` ECDSA backend take microseconds; with the pure-Python
+`ecdsa` package, sign bursts with bullish.signing.SigningPool instead.
+
+    async with AsyncRestClient(HOST_NAME, HmacSigner(SECRET_KEY), JWT_TOKEN, ratelimit_token=RATELIMIT_TOKEN) as client:
+        responses = await asyncio.gather(*(client.create_order(body) for body in bodies))
+"""
+import asyncio
+import json
+import time
+import uuid
+
+import aiohttp
+
+from bullish.canonical import V1_WITHDRAWAL, canonical
+from bullish.nonce import NonceAllocator
+from bullish.rest import get_client
+
+ORDERS_PATH = "/trading-api/v2/orders"
+COMMAND_PATH = "/trading-api/v2/command"
+OTC_TRADES_PATH = "/trading-api/v2/otc-trades"
+OTC_COMMAND_PATH = "/trading-api/v2/otc-command"
+WITHDRAWAL_PATH = "/trading-api/v1/wallets/withdrawal"
+# these sign the body with its spaces removed, see otc/create_otc_trade_hmac.py
+OTC_PATHS = (OTC_TRADES_PATH, OTC_COMMAND_PATH)
+
+
+class RestResponse:
+    """Status and decoded JSON body of a response, `data` is None when the body is not JSON"""
+
+    def __init__(self, status, data, text):
+        self.status = status
+        self.data = data
+        self.text = text
+
+    def __repr__(self):
+        return f"RestResponse(status={self.status}, body={self.text})"
+
+
+class AsyncRestClient:
+
+    def __init__(self, host_name, signer, jwt_token, nonces=None, ratelimit_token=None, max_connections=100,
+                 rate_limiter=None):
+        self.host_name = host_name
+        self.signer = signer
+        self.jwt_token = jwt_token
+        # synced with /trading-api/v1/nonce once, before the event loop needs a nonce
+        self.nonces = nonces if nonces is not None else NonceAllocator.sync(get_client(host_name), host_name)
+        self.ratelimit_token = ratelimit_token
+        self.max_connections = max_connections
+        self.rate_limiter = rate_limiter
+        self.session = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.max_connections, limit_per_host=self.max_connections)
+        self.session = aiohttp.ClientSession(connector=connector)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def _headers(self):
+        headers = {"Content-type": "application/json", "Authorization": f"Bearer {self.jwt_token}"}
+        if self.ratelimit_token:
+            headers["BX-RATELIMIT-TOKEN"] = self.ratelimit_token
+        return headers
+
+    async def _acquire(self, method, path, body=None):
+        # before the request is signed, so that its timestamp is not stale by the time it is sent
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire_async(method, path, body, self.ratelimit_token)
+
+    async def _send(self, method, path, headers, body=None, params=None):
+        async with self.session.request(method, self.host_name + path, data=body, headers=headers,
+                                        params=params) as response:
+            text = await response.text()
+        if self.rate_limiter is not None:
+            self.rate_limiter.update(method, path, self.ratelimit_token, response.status, response.headers)
+        try:
+            data = json.loads(text)
+        except ValueError:
+            data = None
+        return RestResponse(response.status, data, text)
+
+    async def post(self, path, body):
+        """POST a signed command, `body` is a dict or already serialized bytes"""
+        if not isinstance(body, (bytes, bytearray)):
+            body = canonical(body)
+        await self._acquire("POST", path, body)
+        nonce = str(self.nonces.next())
+        timestamp = str(time.time_ns() // 1_000_000)
+        signed_body = body.replace(b" ", b"") if path in OTC_PATHS else body
+        headers = self._headers()
+        headers["BX-SIGNATURE"] = self.signer.sign_request(timestamp, nonce, "POST", path, signed_body)
+        headers["BX-TIMESTAMP"] = timestamp
+        headers["BX-NONCE"] = nonce
+        return await self._send("POST", path, headers, body)
+
+    async def get(self, path, **params):
+        await self._acquire("GET", path)
+        return await self._send("GET", path, self._headers(), params=params or None)
+
+    async def create_order(self, body):
+        return await self.post(ORDERS_PATH, body)
+
+    async def command(self, body):
+        return await self.post(COMMAND_PATH, body)
+
+    async def amend_order(self, **fields):
+        return await self.command({"commandType": "V1AmendOrder", **fields})
+
+    async def cancel_order(self, **fields):
+        return await self.command({"commandType": "V3CancelOrder", **fields})
+
+    async def create_otc_trade(self, body):
+        return await self.post(OTC_TRADES_PATH, body)
+
+    async def otc_command(self, body):
+        return await self.post(OTC_COMMAND_PATH, body)
+
+    async def withdraw(self, authorizer, destination_id, network, symbol, quantity):
+        """
+        A custody withdrawal. Its nonce and timestamp are in the body rather than the headers, see
+        custody/custody_withdrawal_ecdsa.py
+        """
+        await self._acquire("POST", WITHDRAWAL_PATH)
+        nonce = str(uuid.uuid4())
+        timestamp = str(time.time_ns() // 1_000_000)
+        body = V1_WITHDRAWAL.render(nonce=nonce, timestamp=timestamp, authorizer=authorizer,
+                                    destinationId=destination_id, network=network, symbol=symbol, quantity=quantity)
+        headers = self._headers()
+        headers["BX-SIGNATURE"] = self.signer.sign_request(timestamp, nonce, "POST", WITHDRAWAL_PATH, body)
+        return await self._send("POST", WITHDRAWAL_PATH, headers, body)
+
+    def run(self, coroutine_function):
+        """Run `coroutine_function(client)` on a new event loop, for scripts"""
+        async def main():
+            async with self:
+                return await coroutine_function(self)
+        return asyncio.run(main())
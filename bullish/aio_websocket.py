@@ -0,0 +1,124 @@
+"""
+asyncio connection layer for the Bullish market-data and private-data websockets.
+
+All feeds share one event loop instead of one websocket.WebSocketApp thread each. Every FeedConnection subscribes
+on connect, sends its keepalivePing from a task on the same loop and passes each received frame to its handler, which
+has the same (conn, message) signature as the websocket-client on_message callbacks in this repository. Dropped
+connections are reopened with the same backoff and metrics as bullish.supervisor.FeedSupervisor.
+
+    feeds = FeedClient(HOST_NAME)
+    feeds.add("/trading-api/v1/market-data/orderbook", on_message,
+              subscriptions=[{"topic": "l2Orderbook", "symbol": "BTCUSDC"}])
+    feeds.add("/trading-api/v1/market-data/trades/BTCUSDC", on_message)
+    feeds.run_forever()
+"""
+import asyncio
+
+import aiohttp
+
+from bullish.jsonrpc import command_message
+from bullish.supervisor import Backoff, ReconnectMetrics
+
+ORDERBOOK_PATH = "/trading-api/v1/market-data/orderbook"
+TICK_PATH = "/trading-api/v1/market-data/tick"
+TRADES_PATH = "/trading-api/v1/market-data/trades/{symbol}"
+PRIVATE_DATA_PATH = "/trading-api/v1/private-data"
+
+
+class FeedConnection:
+    """A single websocket endpoint, its subscriptions and its message handler"""
+
+    def __init__(self, url, on_message, subscriptions=(), cookie=None, keepalive_interval=5, reconnect=True,
+                 on_reconnect=None, backoff=None, recorder=None):
+        self.url = url
+        self.on_message = on_message
+        self.subscriptions = list(subscriptions)
+        self.cookie = cookie
+        self.keepalive_interval = keepalive_interval
+        self.reconnect = reconnect
+        self.on_reconnect = on_reconnect
+        self.backoff = backoff or Backoff()
+        self.recorder = recorder
+        self.metrics = ReconnectMetrics()
+        self.ws = None
+        self.messages_received = 0
+
+    async def send(self, message):
+        await self.ws.send_str(message)
+
+    async def subscribe(self, params):
+        await self.send(command_message("subscribe", params))
+
+    async def _keepalive(self):
+        while not self.ws.closed:
+            await asyncio.sleep(self.keepalive_interval)
+            if not self.ws.closed:
+                await self.send(command_message("keepalivePing"))
+
+    async def _run_once(self, session):
+        headers = {"Cookie": self.cookie} if self.cookie else None
+        async with session.ws_connect(self.url, headers=headers, autoping=True) as ws:
+            self.ws = ws
+            self.metrics.on_connect()
+            for params in self.subscriptions:
+                await self.subscribe(params)
+            keepalive = asyncio.create_task(self._keepalive())
+            receiving = handled = False
+            try:
+                async for msg in ws:
+                    if msg.type == aiohttp.WSMsgType.TEXT:
+                        if self.recorder is not None:
+                            self.recorder.record(self.url, msg.data)
+                        if not receiving:
+                            receiving = True
+                            if self.metrics.on_first_message():
+                                print(f"Reconnected to {self.url}, blind for {self.metrics.last_blind_time:.3f}s")
+                        self.messages_received += 1
+                        self.on_message(self, msg.data)
+                        if not handled:
+                            # only once a message went through, so a handler that always fails keeps backing off
+                            handled = True
+                            self.backoff.reset()
+                    elif msg.type == aiohttp.WSMsgType.ERROR:
+                        print(f"Received error on {self.url}: {ws.exception()}")
+                        break
+            finally:
+                keepalive.cancel()
+        print(f"Closed connection to {self.url}. close_code={ws.close_code}")
+
+    async def run(self, session):
+        while True:
+            try:
+                await self._run_once(session)
+            except Exception as e:
+                # a failed connect or a handler error drops only this feed, the others keep running
+                print(f"Connection to {self.url} failed: {e!r}")
+            self.metrics.on_disconnect()
+            if not self.reconnect:
+                return
+            delay = self.backoff.next_delay()
+            print(f"Connection to {self.url} dropped, reconnecting in {delay:.2f}s")
+            await asyncio.sleep(delay)
+            if self.on_reconnect:
+                self.on_reconnect()
+
+
+class FeedClient:
+    """Runs any number of FeedConnections on one event loop"""
+
+    def __init__(self, host_name):
+        self.host_name = host_name
+        self.connections = []
+
+    def add(self, path, on_message, subscriptions=(), cookie=None, keepalive_interval=5, **kwargs):
+        connection = FeedConnection(self.host_name + path, on_message, subscriptions, cookie, keepalive_interval,
+                                    **kwargs)
+        self.connections.append(connection)
+        return connection
+
+    async def run(self):
+        async with aiohttp.ClientSession() as session:
+            await asyncio.gather(*(connection.run(session) for connection in self.connections))
+
+    def run_forever(self):
+        asyncio.run(self.run())
@@ -0,0 +1,141 @@
+"""
+Streaming OHLCV candles built from the trades feed.
+
+CandleAggregator keeps bars for any number of symbols at several resolutions (1s, 1m, 5m and 1h by default). Each
+trade updates one bar per resolution with a dict lookup, so the cost per trade is O(1) per resolution.
+
+Trades can arrive late or out of order. A bar stays open until the symbol's watermark (the latest trade timestamp
+seen) passes the end of the bar by `lateness_ms`, and open/close are taken from the earliest/latest trade timestamp
+rather than from arrival order. When a bar closes, `on_bar_close(bar)` is called with the Bar itself. A trade older
+than that for a bar still in the recent history updates it and calls `on_bar_amend(bar)`. Anything older is counted
+in `dropped_late`.
+"""
+from collections import OrderedDict
+
+RESOLUTIONS = (1, 60, 300, 3600)
+
+
+class Bar:
+    __slots__ = ("symbol", "resolution", "start", "open", "high", "low", "close", "volume", "notional", "count",
+                 "first_timestamp", "last_timestamp")
+
+    def __init__(self, symbol, resolution, start, price, quantity, timestamp):
+        self.symbol = symbol
+        self.resolution = resolution
+        self.start = start
+        self.open = self.high = self.low = self.close = price
+        self.volume = quantity
+        self.notional = price * quantity
+        self.count = 1
+        self.first_timestamp = self.last_timestamp = timestamp
+
+    @property
+    def end(self):
+        return self.start + self.resolution * 1000
+
+    def add(self, price, quantity, timestamp):
+        if price > self.high:
+            self.high = price
+        elif price < self.low:
+            self.low = price
+        if timestamp < self.first_timestamp:
+            self.open = price
+            self.first_timestamp = timestamp
+        if timestamp >= self.last_timestamp:
+            self.close = price
+            self.last_timestamp = timestamp
+        self.volume += quantity
+        self.notional += price * quantity
+        self.count += 1
+
+    def vwap(self):
+        return self.notional // self.volume if self.volume else None
+
+    def __repr__(self):
+        return (f"Bar({self.symbol} {self.resolution}s start={self.start} o={self.open} h={self.high} l={self.low} "
+                f"c={self.close} v={self.volume} n={self.count})")
+
+
+class _Series:
+    """The open bars and recently closed bars of one symbol at one resolution, keyed by bar start"""
+
+    def __init__(self):
+        self.open_bars = OrderedDict()
+        self.closed_bars = OrderedDict()
+
+
+class CandleAggregator:
+
+    def __init__(self, resolutions=RESOLUTIONS, lateness_ms=1000, history=100, on_bar_close=None, on_bar_amend=None):
+        self.resolutions = tuple(resolutions)
+        self.lateness_ms = lateness_ms
+        self.history = history
+        self.on_bar_close = on_bar_close
+        self.on_bar_amend = on_bar_amend
+        self._series = {}
+        self._watermarks = {}
+        self.dropped_late = 0
+
+    def add_trade(self, symbol, price, quantity, timestamp):
+        """Add a trade with fixed-point price/quantity and a millisecond timestamp"""
+        series_by_resolution = self._series.get(symbol)
+        if series_by_resolution is None:
+            series_by_resolution = self._series[symbol] = {resolution: _Series() for resolution in self.resolutions}
+            self._watermarks[symbol] = timestamp
+        for resolution, series in series_by_resolution.items():
+            length = resolution * 1000
+            start = timestamp - timestamp % length
+            bar = series.open_bars.get(start)
+            if bar is not None:
+                bar.add(price, quantity, timestamp)
+                continue
+            bar = series.closed_bars.get(start)
+            if bar is not None:
+                bar.add(price, quantity, timestamp)
+                if self.on_bar_amend:
+                    self.on_bar_amend(bar)
+                continue
+            if start + length + self.lateness_ms <= self._watermarks[symbol]:
+                self.dropped_late += 1
+                continue
+            series.open_bars[start] = Bar(symbol, resolution, start, price, quantity, timestamp)
+            if len(series.open_bars) > 1 and start < next(reversed(series.open_bars)):
+                # a late trade opened a bar behind newer ones, keep the open bars in start order
+                for key in sorted(series.open_bars):
+                    series.open_bars.move_to_end(key)
+        if timestamp > self._watermarks[symbol]:
+            self.advance(symbol, timestamp)
+
+    def advance(self, symbol, timestamp):
+        """Move the watermark of `symbol` to `timestamp` and close every bar it has passed"""
+        self._watermarks[symbol] = max(self._watermarks.get(symbol, timestamp), timestamp)
+        cutoff = self._watermarks[symbol] - self.lateness_ms
+        for series in self._series.get(symbol, {}).values():
+            open_bars = series.open_bars
+            while open_bars:
+                start, bar = next(iter(open_bars.items()))
+                if bar.end > cutoff:
+                    break
+                del open_bars[start]
+                series.closed_bars[start] = bar
+                if len(series.closed_bars) > self.history:
+                    series.closed_bars.popitem(last=False)
+                if self.on_bar_close:
+                    self.on_bar_close(bar)
+
+    def advance_all(self, timestamp):
+        """Close bars of quiet symbols, e.g. from a timer with the current time in milliseconds"""
+        for symbol in list(self._series):
+            self.advance(symbol, timestamp)
+
+    def current(self, symbol, resolution):
+        """The most recent open bar of `symbol` at `resolution`, or None"""
+        series = self._series.get(symbol, {}).get(resolution)
+        if series is None or not series.open_bars:
+            return None
+        return next(reversed(series.open_bars.values()))
+
+    def closed(self, symbol, resolution):
+        """Recently closed bars of `symbol` at `resolution`, oldest first"""
+        series = self._series.get(symbol, {}).get(resolution)
+        return [] if series is None else list(series.closed_bars.values())
@@ -0,0 +1,149 @@
+"""
+Canonical request bodies: serialized once to the bytes that are both signed and sent.
+
+canonical() serializes any body compactly, exactly as json.dumps(body, separators=(",", ":")) did in the examples,
+but with one shared encoder instead of building a new one per call. The result is bytes, to be passed to the signer
+and as `data=` to requests, never `json=`, which serializes again with spaces and so sends different bytes than were
+signed.
+
+The common commands also have precompiled templates. A template serializes its constant keys and values once, when it
+is created, and render() only encodes the field values between them, giving the same bytes as canonical() of the
+equivalent dict. Bodies with other fields, or the same fields in another order, go through canonical().
+
+bind() fixes the fields that repeat from one request to the next, so that most of an order is encoded once per
+market and rendering it only encodes the side, price, quantity and clientOrderId.
+
+    body = V3_CREATE_ORDER.render(symbol="ETHUSDC", type="LIMIT", side="SELL", quantity="1.123", price="1432.6",
+                                  timeInForce="GTC", allowBorrow=False, clientOrderId=next_nonce,
+                                  tradingAccountId=TRADING_ACCOUNT_ID)
+    payload = signing_payload(timestamp, next_nonce, "POST", URI, body)
+    session.post(HOST_NAME + URI, data=body, headers=headers)
+
+    BTCUSDC_LIMIT = V3_CREATE_ORDER.bind(symbol="BTCUSDC", type="LIMIT", timeInForce="GTC", allowBorrow=False,
+                                         tradingAccountId=TRADING_ACCOUNT_ID)
+    body = BTCUSDC_LIMIT.render(side="BUY", price="30000.0", quantity="0.001", clientOrderId=next_nonce)
+"""
+import json
+import re
+from json.encoder import encode_basestring_ascii
+
+ENCODER = json.JSONEncoder(separators=(",", ":"))
+
+# stands for a value given to render(), under the name of its key
+FIELD = object()
+
+_CONSTANTS = {True: "true", False: "false", None: "null"}
+
+
+def canonical(body):
+    """The compact JSON of `body` as bytes"""
+    return ENCODER.encode(body).encode()
+
+
+def signing_payload(timestamp, nonce, method, path, body):
+    """The bytes to sign for a request whose body is already serialized"""
+    return (timestamp + nonce + method + path).encode() + body
+
+
+class BodyTemplate:
+    """A body with constant keys and values, and FIELD placeholders that are filled by render()"""
+
+    def __init__(self, body):
+        self.body = body
+        self.fields = []
+        text = ENCODER.encode(self._mark(body))
+        parts = re.split(r'"\x00(\d+)\x00"', text.replace("\\u0000", "\x00"))
+        self._head = parts[0]
+        self._slots = [(self.fields[int(index)], static) for index, static in zip(parts[1::2], parts[2::2])]
+
+    def _mark(self, value, key=None):
+        if value is FIELD:
+            if key in self.fields:
+                raise ValueError(f"Field {key!r} appears more than once")
+            self.fields.append(key)
+            return f"\x00{len(self.fields) - 1}\x00"
+        if isinstance(value, dict):
+            return {k: self._mark(v, k) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self._mark(v) for v in value]
+        return value
+
+    def bind(self, **values):
+        """
+        A template with some fields fixed, e.g. all but side, price, quantity and clientOrderId of the orders of one
+        market, so that only those are encoded per order
+        """
+        unknown = set(values) - set(self.fields)
+        if unknown:
+            raise TypeError(f"Unknown fields {sorted(unknown)}, expected some of {self.fields}")
+        return BodyTemplate(self._fill(self.body, values))
+
+    def _fill(self, value, values, key=None):
+        if value is FIELD:
+            return values.get(key, FIELD)
+        if isinstance(value, dict):
+            return {k: self._fill(v, values, k) for k, v in value.items()}
+        if isinstance(value, (list, tuple)):
+            return [self._fill(v, values) for v in value]
+        return value
+
+    def render(self, **values):
+        """The body bytes with every field set, values are encoded as in canonical()"""
+        if len(values) != len(self._slots):
+            raise TypeError(f"Expected the fields {self.fields}, got {sorted(values)}")
+        parts = [self._head]
+        for name, static in self._slots:
+            value = values[name]
+            if type(value) is str:
+                parts.append(encode_basestring_ascii(value))
+            elif value is True or value is False or value is None:
+                parts.append(_CONSTANTS[value])
+            else:
+                parts.append(ENCODER.encode(value))
+            parts.append(static)
+        return "".join(parts).encode()
+
+
+V3_CREATE_ORDER = BodyTemplate({
+    "symbol": FIELD,
+    "commandType": "V3CreateOrder",
+    "type": FIELD,
+    "side": FIELD,
+    "quantity": FIELD,
+    "price": FIELD,
+    "timeInForce": FIELD,
+    "allowBorrow": FIELD,
+    "clientOrderId": FIELD,
+    "tradingAccountId": FIELD,
+})
+
+V1_AMEND_ORDER = BodyTemplate({
+    "commandType": "V1AmendOrder",
+    "orderId": FIELD,
+    "type": FIELD,
+    "symbol": FIELD,
+    "tradingAccountId": FIELD,
+})
+
+V1_CREATE_OTC_TRADE = BodyTemplate({
+    "commandType": "V1CreateOtcTrade",
+    "sharedMatchKey": FIELD,
+    "clientOtcTradeId": FIELD,
+    "tradingAccountId": FIELD,
+    "isTaker": FIELD,
+    "remarks": FIELD,
+    "trades": FIELD,
+})
+
+V1_WITHDRAWAL = BodyTemplate({
+    "nonce": FIELD,
+    "timestamp": FIELD,
+    "authorizer": FIELD,
+    "command": {
+        "commandType": "V1Withdrawal",
+        "destinationId": FIELD,
+        "network": FIELD,
+        "symbol": FIELD,
+        "quantity": FIELD,
+    },
+})
@@ -0,0 +1,97 @@
+"""
+Routing websocket frames without decoding them first.
+
+A Dispatcher peeks the routing fields a handler asked for (`type`, `dataType`, `topic`, `symbol`) straight out of the
+raw frame with str.find, drops frames that no handler wants, and decodes the rest exactly once with a pluggable JSON
+codec. A peek returns the first occurrence of the field in the frame, so routing fields must precede nested objects
+with the same key, which holds for the Bullish feeds where `type` and `dataType` come before `data`.
+
+Frames without a `type` are JSON-RPC responses (subscribe acks, keepalive responses) and go to the response handler.
+
+The websocket examples decode with BX_JSON_CODEC, "orjson" by default. When most frames are decoded it dispatches
+them about 1.5x faster than the standard library, and when most are skipped unread the two are even, see
+benchmarks/dispatch_benchmark.py. Set it to "json" to compare.
+
+    DISPATCHER = Dispatcher(codec=get_codec())
+    DISPATCHER.on_response(SUBSCRIPTION_MANAGER.on_message)
+    DISPATCHER.subscribe(ORDER_BOOKS.on_message, dataType="V1TALevel2", symbol="BTCUSDC")
+
+    def on_message(conn, message):
+        DISPATCHER.dispatch(message)
+"""
+import json
+import os
+
+CODEC = os.getenv("BX_JSON_CODEC", "orjson")
+
+
+def get_codec(name=None):
+    """
+    Return a module with a `loads` function, BX_JSON_CODEC by default. "orjson" falls back to the standard library if
+    it is not installed
+    """
+    if (name or CODEC) == "orjson":
+        try:
+            import orjson
+            return orjson
+        except ImportError:
+            pass
+    return json
+
+
+def peek(frame, field):
+    """Return the string value of the first `"field":"value"` in `frame` without decoding it, or None"""
+    return _peek(frame, f'"{field}":')
+
+
+def _peek(frame, key):
+    start = frame.find(key)
+    if start < 0:
+        return None
+    start += len(key)
+    if frame.startswith(" ", start):
+        start += 1
+    if not frame.startswith('"', start):
+        return None
+    end = frame.find('"', start + 1)
+    return frame[start + 1:end] if end >= 0 else None
+
+
+class Dispatcher:
+
+    def __init__(self, codec=json):
+        self.codec = codec
+        self._routes = []
+        self._fields = []
+        self._keys = []
+        self._response_handlers = []
+        self.decoded = 0
+        self.dropped = 0
+
+    def subscribe(self, handler, **fields):
+        """Call `handler(message)` with the decoded message of every frame whose peeked fields equal `fields`"""
+        self._routes.append((tuple(fields.items()), handler))
+        for field in fields:
+            if field not in self._fields:
+                self._fields.append(field)
+        self._keys = [(field, f'"{field}":') for field in self._fields]
+
+    def on_response(self, handler):
+        self._response_handlers.append(handler)
+
+    def dispatch(self, frame):
+        """Route a raw frame, returns the number of handlers it was delivered to"""
+        if _peek(frame, '"type":') is None:
+            handlers = self._response_handlers
+        else:
+            values = {field: _peek(frame, key) for field, key in self._keys}
+            handlers = [handler for fields, handler in self._routes
+                        if all(values[field] == value for field, value in fields)]
+        if not handlers:
+            self.dropped += 1
+            return 0
+        message = self.codec.loads(frame)
+        self.decoded += 1
+        for handler in handlers:
+            handler(message)
+        return len(handlers)
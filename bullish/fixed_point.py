@@ -0,0 +1,72 @@
+"""
+Fixed-point decoding of the decimal strings used for prices and quantities on the Bullish API.
+
+Prices are scaled by the market `quotePrecision` and quantities by the market `basePrecision`, as returned by
+/trading-api/v1/markets/{symbol}. Wire strings are decoded to integers once when a message is received, so book and
+trade state can be compared, summed and used as dict keys exactly, and are only formatted back to strings when a
+request body is built.
+"""
+
+# price strings repeat heavily on book and trade feeds, so decoded prices are memoised up to this many entries
+PRICE_CACHE_SIZE = 65536
+
+
+def parse_fixed(value, precision):
+    """Decode a decimal string such as "1432.60" to an integer scaled by 10**precision, without going via float"""
+    point = value.find(".")
+    if point < 0:
+        return int(value) * 10 ** precision
+    decimals = len(value) - point - 1
+    if decimals <= precision:
+        return int(value.replace(".", "", 1)) * 10 ** (precision - decimals)
+    if value[point + 1 + precision:].strip("0"):
+        raise ValueError(f"{value} has more than {precision} decimal places")
+    return int(value[:point] + value[point + 1:point + 1 + precision])
+
+
+def format_fixed(value, precision):
+    """Encode an integer scaled by 10**precision as a decimal string with exactly `precision` decimal places"""
+    if precision == 0:
+        return str(value)
+    whole, fraction = divmod(abs(value), 10 ** precision)
+    sign = "-" if value < 0 else ""
+    return f"{sign}{whole}.{fraction:0{precision}d}"
+
+
+class MarketPrecision:
+    """
+    Decoder/encoder for one market. Use `MarketPrecision.from_market(session.get(...).json())` with the response of
+    the markets endpoint.
+    """
+
+    def __init__(self, base_precision, quote_precision):
+        self.base_precision = int(base_precision)
+        self.quote_precision = int(quote_precision)
+        self._prices = {}
+
+    @classmethod
+    def from_market(cls, market):
+        return cls(market["basePrecision"], market["quotePrecision"])
+
+    def parse_price(self, price):
+        parsed = self._prices.get(price)
+        if parsed is None:
+            if len(self._prices) >= PRICE_CACHE_SIZE:
+                self._prices.clear()
+            parsed = self._prices[price] = parse_fixed(price, self.quote_precision)
+        return parsed
+
+    def parse_quantity(self, quantity):
+        return parse_fixed(quantity, self.base_precision)
+
+    def format_price(self, price):
+        return format_fixed(price, self.quote_precision)
+
+    def format_quantity(self, quantity):
+        return format_fixed(quantity, self.base_precision)
+
+    def parse_trade(self, trade):
+        """Decode the price and quantity of a trade message in place and return it"""
+        trade["price"] = self.parse_price(trade["price"])
+        trade["quantity"] = self.parse_quantity(trade["quantity"])
+        return trade
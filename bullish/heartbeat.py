@@ -0,0 +1,102 @@
+"""
+One keepalive thread for any number of websocket connections.
+
+The examples used to re-arm a new threading.Timer for every keepalivePing, which starts a thread per ping and keeps
+pinging after the connection has closed. HeartbeatScheduler keeps the next due time of every registered connection in
+a heap and sends all pings from a single daemon thread. Connections are dropped from the schedule when they are
+unregistered (call it from on_close) or when a send fails.
+
+    from bullish.heartbeat import HEARTBEATS
+
+    HEARTBEATS.register(ws_conn, interval=5)   # before run_forever()
+    HEARTBEATS.unregister(conn)                # in on_close
+"""
+import heapq
+import itertools
+import threading
+import time
+
+from bullish.jsonrpc import command_message
+
+
+def send_keepalive(conn):
+    """Send a keepalivePing on a websocket.WebSocketApp, skipping it while the socket is not connected"""
+    if conn.sock and conn.sock.connected:
+        conn.send(command_message("keepalivePing"))
+
+
+class HeartbeatScheduler:
+
+    def __init__(self, send=send_keepalive, clock=time.monotonic):
+        self.send = send
+        self.clock = clock
+        self._condition = threading.Condition()
+        self._heap = []
+        self._registered = {}
+        self._generations = itertools.count()
+        self._thread = None
+        self._stopped = False
+
+    def register(self, conn, interval=5):
+        """Ping `conn` every `interval` seconds, starting one interval from now"""
+        with self._condition:
+            generation = next(self._generations)
+            self._registered[conn] = (generation, interval)
+            heapq.heappush(self._heap, (self.clock() + interval, generation, conn))
+            if self._thread is None:
+                self._stopped = False
+                self._thread = threading.Thread(target=self._run, name="heartbeat", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def unregister(self, conn):
+        with self._condition:
+            # the heap entry is discarded lazily when it comes due
+            self._registered.pop(conn, None)
+
+    def __len__(self):
+        return len(self._registered)
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._registered.clear()
+            self._heap.clear()
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _next_due(self):
+        """Wait for the next ping that is due, returns None once stopped"""
+        with self._condition:
+            while not self._stopped:
+                if not self._heap:
+                    self._condition.wait()
+                    continue
+                due, generation, conn = self._heap[0]
+                delay = due - self.clock()
+                if delay > 0:
+                    self._condition.wait(delay)
+                    continue
+                heapq.heappop(self._heap)
+                registered = self._registered.get(conn)
+                if registered is None or registered[0] != generation:
+                    continue
+                heapq.heappush(self._heap, (due + registered[1], generation, conn))
+                return conn
+            return None
+
+    def _run(self):
+        while True:
+            conn = self._next_due()
+            if conn is None:
+                return
+            try:
+                self.send(conn)
+            except Exception as e:
+                print(f"Keepalive failed, no longer pinging {getattr(conn, 'url', conn)}: {e}")
+                self.unregister(conn)
+
+
+HEARTBEATS = HeartbeatScheduler()
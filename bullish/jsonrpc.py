@@ -0,0 +1,29 @@
+"""
+JSON-RPC command messages for the Bullish websockets.
+
+Request ids come from a process-wide counter, so they are unique on every connection even when many commands are
+sent within the same millisecond.
+"""
+import itertools
+import json
+
+_request_ids = itertools.count(1)
+
+
+def next_request_id():
+    return str(next(_request_ids))
+
+
+def command(method, params=None, request_id=None):
+    """Build a command as a dict, e.g. command("subscribe", {"topic": "tick", "symbol": "BTCUSDC"})"""
+    return {
+        "jsonrpc": "2.0",
+        "type": "command",
+        "method": method,
+        "params": params or {},
+        "id": request_id or next_request_id()
+    }
+
+
+def command_message(method, params=None, request_id=None):
+    return json.dumps(command(method, params, request_id))
@@ -0,0 +1,44 @@
+"""
+Latency samples and their percentiles, for the load tests and benchmarks.
+
+Samples are recorded in seconds under a name ("sign", "rtt", ...) and summarised in microseconds. Appending to a list
+is atomic, so one LatencyStats can be shared by several worker threads.
+"""
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+def percentile(sorted_samples, p):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_samples:
+        return None
+    rank = max(int(-(-len(sorted_samples) * p // 100)), 1)
+    return sorted_samples[min(rank, len(sorted_samples)) - 1]
+
+
+class LatencyStats:
+
+    def __init__(self, percentiles=PERCENTILES):
+        self.percentiles = percentiles
+        self.samples = {}
+
+    def record(self, name, seconds):
+        samples = self.samples.get(name)
+        if samples is None:
+            samples = self.samples.setdefault(name, [])
+        samples.append(seconds)
+
+    def summary(self):
+        """{name: {"count", "mean", "max", "p50", ...}} with latencies in microseconds"""
+        summary = {}
+        for name, samples in self.samples.items():
+            samples = sorted(samples)
+            stats = {"count": len(samples), "mean": sum(samples) / len(samples) * 1e6, "max": samples[-1] * 1e6}
+            for p in self.percentiles:
+                stats[f"p{p:g}"] = percentile(samples, p) * 1e6
+            summary[name] = stats
+        return summary
+
+    def report(self):
+        for name, stats in self.summary().items():
+            points = " ".join(f"{key}={value:,.1f}" for key, value in stats.items() if key.startswith("p"))
+            print(f"{name:<10} n={stats['count']:<8} mean={stats['mean']:,.1f} {points} max={stats['max']:,.1f} us")
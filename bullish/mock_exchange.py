@@ -0,0 +1,768 @@
+"""
+Local stand-in for the Bullish REST and websocket API, so the examples can be exercised in load tests and CI without
+the live host.
+
+It serves the endpoints the examples use: nonce, markets, HMAC and ECDSA login, logout, trading accounts, orders,
+/v2/command, OTC trades and commands, custody wallets and withdrawals, and the orderbook, tick, trades and private-data
+websockets. Signed requests are checked the way the examples sign them: the signature covers
+timestamp + nonce + method + path + body, as an HMAC of the SHA-256 hex digest or as a base64 DER ECDSA signature
+over SHA-256. OTC bodies are signed with spaces removed. BX-NONCE must lie within the /v1/nonce bounds and must not be
+reused by the same credential. Only the nonces of the last NONCE_WINDOW microseconds below a credential's highest are
+remembered, older ones are rejected, so memory stays flat however long a load test runs.
+
+A token returned by a login is bound to the key it logged in with. Any other bearer token or JWT_COOKIE is accepted
+too, unless `strict_tokens` is set, and its requests are checked against every configured or logged-in key.
+
+With `rate_limit` set, each BX-RATELIMIT-TOKEN, or its absence, may make that many REST requests per one-second
+window. Responses carry BX-RATELIMIT-LIMIT, BX-RATELIMIT-REMAINING and BX-RATELIMIT-RESET, the seconds until the
+window resets, and requests over the limit get a 429 with Retry-After.
+
+Websocket feeds are synthetic random walks that send `feed_rate` messages per second for every subscription. Each
+connection gets its own markets, so every client sees a consistent book and sequence.
+
+    PYTHONPATH=. python3 -m bullish.mock_exchange
+    export BX_API_HOSTNAME=http://127.0.0.1:8765
+    export BX_WS_API_HOSTNAME=ws://127.0.0.1:8765
+
+BX_PUBLIC_KEY/BX_SECRET_KEY configure the HMAC key, BX_MOCK_PUBLIC_KEY_FILE a PEM file of ECDSA public keys, and
+BX_MOCK_HOST, BX_MOCK_PORT, BX_MOCK_FEED_RATE, BX_MOCK_RATE_LIMIT and BX_MOCK_STRICT_TOKENS the server.
+"""
+import asyncio
+import base64
+import hmac
+import itertools
+import json
+import math
+import os
+import random
+import secrets
+import time
+from datetime import datetime, timezone
+from hashlib import sha256
+
+import aiohttp
+from aiohttp import web
+from ecdsa import BadSignatureError, VerifyingKey
+from ecdsa.der import UnexpectedDER
+from ecdsa.util import sigdecode_der
+
+from bullish.fixed_point import MarketPrecision
+
+MARKETS = [
+    {"symbol": "BTCUSDC", "baseSymbol": "BTC", "quoteSymbol": "USDC", "basePrecision": 8, "quotePrecision": 4,
+     "tickSize": "0.1000", "marketType": "SPOT", "price": "60000.0000"},
+    {"symbol": "ETHUSDC", "baseSymbol": "ETH", "quoteSymbol": "USDC", "basePrecision": 8, "quotePrecision": 4,
+     "tickSize": "0.0100", "marketType": "SPOT", "price": "3000.0000"},
+    {"symbol": "SOLUSDC", "baseSymbol": "SOL", "quoteSymbol": "USDC", "basePrecision": 8, "quotePrecision": 4,
+     "tickSize": "0.0100", "marketType": "SPOT", "price": "150.0000"},
+    {"symbol": "BTCUSD", "baseSymbol": "BTC", "quoteSymbol": "USD", "basePrecision": 8, "quotePrecision": 4,
+     "tickSize": "0.1000", "marketType": "SPOT", "price": "60000.0000"},
+    {"symbol": "ETHUSD", "baseSymbol": "ETH", "quoteSymbol": "USD", "basePrecision": 8, "quotePrecision": 4,
+     "tickSize": "0.0100", "marketType": "SPOT", "price": "3000.0000"},
+    {"symbol": "BTC-USDC-PERP", "baseSymbol": "BTC", "quoteSymbol": "USDC", "basePrecision": 8, "quotePrecision": 4,
+     "tickSize": "0.1000", "marketType": "PERPETUAL", "price": "60000.0000"},
+]
+AUTHORIZER = "59E62367E8C900000500000000000000"
+TRADING_ACCOUNT_ID = "111596587573002"
+OTC_PATHS = ("/trading-api/v2/otc-trades", "/trading-api/v2/otc-command")
+COMMAND_TYPES = {
+    "/trading-api/v2/orders": {"V3CreateOrder"},
+    "/trading-api/v2/command": {"V1AmendOrder", "V3CancelOrder", "V1CancelAllOrders", "V1CancelAllOrdersByMarket"},
+    "/trading-api/v2/otc-trades": {"V1CreateOtcTrade"},
+    "/trading-api/v2/otc-command": {"V1CancelOtcTrade", "V1CancelAllOtcTrades"},
+}
+PRIVATE_TOPICS = {"orders", "trades", "spotAccounts", "tradingAccounts"}
+# microseconds below a credential's highest BX-NONCE within which a nonce may still arrive out of order
+NONCE_WINDOW = 10_000_000
+
+
+def now_ms():
+    return time.time_ns() // 1_000_000
+
+
+def iso_datetime(timestamp_ms):
+    return datetime.fromtimestamp(timestamp_ms / 1000, timezone.utc).isoformat(timespec="milliseconds")[:-6] + "Z"
+
+
+def nonce_bounds():
+    """Lower and upper bound of BX-NONCE in microseconds, the current UTC day as returned by /v1/nonce"""
+    day_us = 86_400_000_000
+    lower = time.time_ns() // 1000 // day_us * day_us
+    return lower, lower + day_us - 1
+
+
+def hmac_verifier(secret):
+    """Check a request signature made as in orders/create_order_hmac.py"""
+    def verify(payload, signature):
+        digest = sha256(payload).hexdigest().encode("utf-8")
+        return hmac.compare_digest(hmac.new(secret, digest, sha256).hexdigest(), signature)
+    return verify
+
+
+def ecdsa_verifier(public_key_pem):
+    """Check a base64 DER signature made as in orders/create_order_ecdsa.py"""
+    key = VerifyingKey.from_pem(public_key_pem)
+
+    def verify(payload, signature):
+        try:
+            return key.verify(base64.b64decode(signature), payload, hashfunc=sha256, sigdecode=sigdecode_der)
+        except (BadSignatureError, UnexpectedDER, ValueError):
+            return False
+    return verify
+
+
+class SyntheticMarket:
+    """A random-walk order book and trade stream of one market, kept as fixed-point integers"""
+
+    def __init__(self, market, rng, depth=10):
+        self.symbol = market["symbol"]
+        self.precision = MarketPrecision.from_market(market)
+        self.rng = rng
+        self.depth = depth
+        self.tick_size = self.precision.parse_price(market["tickSize"])
+        self.mid = self.precision.parse_price(market["price"])
+        self.sequence_number = 1
+        self.trade_ids = itertools.count(100_000_000_000_000_000 + rng.randrange(1_000_000))
+        self.last_trade = None
+        self.bids = {self.mid - level * self.tick_size: self._quantity() for level in range(1, depth + 1)}
+        self.asks = {self.mid + level * self.tick_size: self._quantity() for level in range(1, depth + 1)}
+
+    def _quantity(self):
+        return self.rng.randrange(1, 5 * 10 ** self.precision.base_precision)
+
+    def _levels(self, levels):
+        format_price = self.precision.format_price
+        format_quantity = self.precision.format_quantity
+        return [x for price, quantity in levels for x in (format_price(price), format_quantity(quantity))]
+
+    def step(self):
+        """Change one or two levels, returns the changes as flat bids and asks lists (a zero quantity removes)"""
+        self.sequence_number += 1
+        bids, asks = [], []
+        if self.rng.random() < 0.1:
+            self.mid += self.rng.choice((-self.tick_size, self.tick_size))
+            for price in [price for price in self.bids if price >= self.mid]:
+                del self.bids[price]
+                bids.append((price, 0))
+            for price in [price for price in self.asks if price <= self.mid]:
+                del self.asks[price]
+                asks.append((price, 0))
+        is_bid = self.rng.random() < 0.5
+        side, changes = (self.bids, bids) if is_bid else (self.asks, asks)
+        level = self.rng.randint(1, self.depth)
+        price = self.mid - level * self.tick_size if is_bid else self.mid + level * self.tick_size
+        if price in side and self.rng.random() < 0.2:
+            del side[price]
+            changes.append((price, 0))
+        else:
+            side[price] = self._quantity()
+            changes.append((price, side[price]))
+        for side, changes, worst, best in ((self.bids, bids, min, self.mid - self.tick_size),
+                                           (self.asks, asks, max, self.mid + self.tick_size)):
+            if not side:
+                side[best] = self._quantity()
+                changes.append((best, side[best]))
+            while len(side) > self.depth:
+                price = worst(side)
+                del side[price]
+                changes.append((price, 0))
+        return self._levels(bids), self._levels(asks)
+
+    def depth_levels(self):
+        return (sorted(self.bids.items(), reverse=True)[:self.depth], sorted(self.asks.items())[:self.depth])
+
+    def _book_data(self, timestamp):
+        return {"symbol": self.symbol, "timestamp": str(timestamp), "datetime": iso_datetime(timestamp),
+                "publishedAtTimestamp": str(timestamp)}
+
+    def l2_snapshot(self):
+        bids, asks = self.depth_levels()
+        data = self._book_data(now_ms())
+        data.update(bids=self._levels(bids), asks=self._levels(asks), sequenceNumber=self.sequence_number,
+                    sequenceNumberRange=[self.sequence_number, self.sequence_number])
+        return {"type": "snapshot", "dataType": "V1TALevel2", "data": data}
+
+    def l2_update(self):
+        bids, asks = self.step()
+        data = self._book_data(now_ms())
+        data.update(bids=bids, asks=asks, sequenceNumberRange=[self.sequence_number, self.sequence_number])
+        return {"type": "update", "dataType": "V1TALevel2", "data": data}
+
+    def l1_snapshot(self):
+        bids, asks = self.depth_levels()
+        data = self._book_data(now_ms())
+        data.update(bid=self._levels(bids[:1]), ask=self._levels(asks[:1]), sequenceNumber=self.sequence_number)
+        return {"type": "snapshot", "dataType": "V1TALevel1", "data": data}
+
+    def hybrid_orderbook(self):
+        """The REST /markets/{symbol}/orderbook/hybrid response"""
+        bids, asks = self.depth_levels()
+        timestamp = now_ms()
+
+        def levels(side):
+            return [{"price": self.precision.format_price(price),
+                     "priceLevelQuantity": self.precision.format_quantity(quantity)} for price, quantity in side]
+
+        return {"bids": levels(bids), "asks": levels(asks), "sequenceNumber": self.sequence_number,
+                "timestamp": str(timestamp), "datetime": iso_datetime(timestamp)}
+
+    def trade(self):
+        self.step()
+        side = self.rng.choice(("BUY", "SELL"))
+        price = min(self.asks) if side == "BUY" else max(self.bids)
+        timestamp = now_ms()
+        self.last_trade = {
+            "tradeId": str(next(self.trade_ids)),
+            "symbol": self.symbol,
+            "price": self.precision.format_price(price),
+            "quantity": self.precision.format_quantity(self.rng.randrange(1, 10 ** self.precision.base_precision)),
+            "side": side,
+            "isTaker": True,
+            "createdAtTimestamp": str(timestamp),
+            "createdAtDatetime": iso_datetime(timestamp),
+            "publishedAtTimestamp": str(timestamp),
+        }
+        return self.last_trade
+
+    def trade_update(self):
+        return {"type": "update", "dataType": "V1TAAnonymousTradeUpdate", "data": self.trade()}
+
+    def trade_snapshot(self, count=20):
+        trades = [self.trade() for _ in range(count)]
+        return {"type": "snapshot", "dataType": "V1TAAnonymousTradeUpdate", "data": trades[::-1]}
+
+    def tick(self):
+        trade = self.trade()
+        (bid, bid_quantity), (ask, ask_quantity) = max(self.bids.items()), min(self.asks.items())
+        data = self._book_data(int(trade["createdAtTimestamp"]))
+        data.update(bestBid=self.precision.format_price(bid), bidVolume=self.precision.format_quantity(bid_quantity),
+                    bestAsk=self.precision.format_price(ask), askVolume=self.precision.format_quantity(ask_quantity),
+                    last=trade["price"], lastTradeQuantity=trade["quantity"], createdAtTimestamp=data["timestamp"])
+        return {"type": "update", "dataType": "V1TATickerResponse", "data": data}
+
+
+def _error(status, code_name, message):
+    return web.json_response({"errorCodeName": code_name, "message": message}, status=status)
+
+
+def _result(request_id, message):
+    return json.dumps({"id": request_id, "jsonrpc": "2.0",
+                       "result": {"responseCode": "200", "responseCodeName": "OK", "message": message}})
+
+
+def _rpc_error(request_id, message):
+    return json.dumps({"id": request_id, "jsonrpc": "2.0", "error": {"code": 400, "message": message}})
+
+
+class MockExchange:
+    """
+    `hmac_keys` maps HMAC public keys to their secret (bytes). `public_keys` are the PEM ECDSA public keys accepted at
+    login; when empty, any key whose login payload signature is valid is accepted.
+    """
+
+    def __init__(self, hmac_keys=None, public_keys=(), markets=MARKETS, feed_rate=10, strict_tokens=False, seed=7,
+                 rate_limit=0):
+        self.hmac_keys = dict(hmac_keys or {})
+        self.public_keys = {pem.strip() for pem in public_keys}
+        self.markets = {market["symbol"]: market for market in markets}
+        self.feed_rate = feed_rate
+        self.strict_tokens = strict_tokens
+        self.seed = seed
+        self.rate_limit = rate_limit
+        # BX-RATELIMIT-TOKEN -> [window start, requests in the window]
+        self.rate_windows = {}
+        self.verifiers = {f"hmac:{key}": hmac_verifier(secret) for key, secret in self.hmac_keys.items()}
+        for pem in self.public_keys:
+            self.verifiers[pem] = ecdsa_verifier(pem)
+        self.tokens = {}
+        # credential -> [highest BX-NONCE, pruned up to, the nonces used above that]
+        self.nonces = {}
+        self.withdrawal_nonces = {}
+        self.orders = {}
+        self.otc_trades = {}
+        self.private_connections = {}
+        self.rest_markets = {symbol: SyntheticMarket(market, random.Random(f"{seed}:{symbol}"))
+                             for symbol, market in self.markets.items()}
+        self._ids = itertools.count(int(time.time() * 1000) << 20)
+        self.stats = {"requests": 0, "rejected": 0, "throttled": 0, "frames_sent": 0}
+        self.app = web.Application(middlewares=[self.rate_limited] if rate_limit else [])
+        self.app.add_routes([
+            web.get("/trading-api/v1/nonce", self.get_nonce),
+            web.get("/trading-api/v1/markets", self.get_markets),
+            web.get("/trading-api/v1/markets/{symbol}", self.get_market),
+            web.get("/trading-api/v1/markets/{symbol}/orderbook/hybrid", self.get_orderbook),
+            web.get("/trading-api/v1/users/hmac/login", self.hmac_login),
+            web.post("/trading-api/v2/users/login", self.ecdsa_login),
+            web.get("/trading-api/v1/users/logout", self.logout),
+            web.get("/trading-api/v1/accounts/trading-accounts", self.get_trading_accounts),
+            web.post("/trading-api/v2/orders", self.post_order),
+            web.get("/trading-api/v2/orders", self.get_orders),
+            web.post("/trading-api/v2/command", self.post_command),
+            web.post("/trading-api/v2/otc-trades", self.post_otc_trade),
+            web.get("/trading-api/v2/otc-trades", self.get_otc_trades),
+            web.get("/trading-api/v2/otc-trades/{otc_trade_id}/", self.get_otc_trade),
+            web.get("/trading-api/v2/otc-trades/{otc_trade_id}", self.get_otc_trade),
+            web.post("/trading-api/v2/otc-command", self.post_command),
+            web.get("/trading-api/v1/wallets/transactions", self.get_wallet_transactions),
+            web.get("/trading-api/v1/wallets/deposit-instructions/{kind}/{symbol}", self.get_instructions),
+            web.get("/trading-api/v1/wallets/withdrawal-instructions/{kind}/{symbol}", self.get_instructions),
+            web.get("/trading-api/v1/wallets/limits/{symbol}", self.get_limits),
+            web.post("/trading-api/v1/wallets/withdrawal", self.post_withdrawal),
+            web.get("/trading-api/v1/market-data/orderbook", self.orderbook_feed),
+            web.get("/trading-api/v1/market-data/tick", self.tick_feed),
+            web.get("/trading-api/v1/market-data/trades/{symbol}", self.trades_feed),
+            web.get("/trading-api/v1/private-data", self.private_data_feed),
+            web.get("/mock/stats", self.get_stats),
+        ])
+
+    def next_id(self):
+        return str(next(self._ids))
+
+    @web.middleware
+    async def rate_limited(self, request, handler):
+        if "-data/" in request.path or request.path.endswith("-data") or not request.path.startswith("/trading-api"):
+            return await handler(request)
+        now = time.monotonic()
+        window = self.rate_windows.setdefault(request.headers.get("BX-RATELIMIT-TOKEN"), [now, 0])
+        if now - window[0] >= 1:
+            window[:] = [now, 0]
+        window[1] += 1
+        reset = window[0] + 1 - now
+        headers = {"BX-RATELIMIT-LIMIT": str(self.rate_limit),
+                   "BX-RATELIMIT-REMAINING": str(max(self.rate_limit - window[1], 0)),
+                   "BX-RATELIMIT-RESET": f"{reset:.3f}"}
+        if window[1] > self.rate_limit:
+            self.stats["throttled"] += 1
+            response = _error(429, "TOO_MANY_REQUESTS", f"More than {self.rate_limit} requests per second")
+            response.headers["Retry-After"] = str(math.ceil(reset))
+        else:
+            response = await handler(request)
+        response.headers.update(headers)
+        return response
+
+    # authentication
+
+    def _issue_token(self, verifier_key):
+        token = secrets.token_urlsafe(32)
+        self.tokens[token] = verifier_key
+        return web.json_response({"authorizer": AUTHORIZER, "ownerAuthorizer": AUTHORIZER, "token": token})
+
+    def _token(self, request):
+        authorization = request.headers.get("Authorization", "")
+        if authorization.startswith("Bearer "):
+            return authorization[len("Bearer "):]
+        cookie = request.cookies.get("JWT_COOKIE")
+        if cookie:
+            return cookie
+        return None
+
+    def _authenticated(self, request):
+        token = self._token(request)
+        return bool(token) and (token in self.tokens or not self.strict_tokens)
+
+    def _verify(self, request, payload, signature, nonce_key=None):
+        """Return the key that signed `payload`, or None. A login token restricts the check to its own key"""
+        token = self._token(request)
+        if token in self.tokens:
+            keys = [self.tokens[token]]
+        elif token and not self.strict_tokens:
+            keys = list(self.verifiers)
+        else:
+            return None
+        for key in keys:
+            if self.verifiers[key](payload, signature):
+                return key
+        return None
+
+    def _check_nonce(self, key, nonce):
+        lower, upper = nonce_bounds()
+        if not nonce.isdigit() or not lower <= int(nonce) <= upper:
+            return f"BX-NONCE {nonce} is outside of [{lower}, {upper}]"
+        nonce = int(nonce)
+        state = self.nonces.setdefault(key, [0, 0, set()])
+        highest, pruned, used = state
+        if nonce <= highest - NONCE_WINDOW:
+            return f"BX-NONCE {nonce} is more than {NONCE_WINDOW}us below the highest nonce of this credential"
+        if nonce in used:
+            return f"BX-NONCE {nonce} was already used"
+        used.add(nonce)
+        if nonce > highest:
+            state[0] = nonce
+            if nonce - NONCE_WINDOW >= pruned + NONCE_WINDOW:
+                # once per window, so at most two windows of nonces are kept
+                state[1] = nonce - NONCE_WINDOW
+                state[2] = {used_nonce for used_nonce in used if used_nonce > state[1]}
+        return None
+
+    async def _signed_body(self, request):
+        """Check the signature and nonce of a signed POST, returns (body, None) or (None, error response)"""
+        self.stats["requests"] += 1
+        body = (await request.read()).decode("utf-8")
+        timestamp = request.headers.get("BX-TIMESTAMP", "")
+        nonce = request.headers.get("BX-NONCE", "")
+        signature = request.headers.get("BX-SIGNATURE", "")
+        if not self._authenticated(request):
+            self.stats["rejected"] += 1
+            return None, _error(401, "UNAUTHORIZED", "Missing or unknown JWT")
+        if not (timestamp and nonce and signature):
+            self.stats["rejected"] += 1
+            return None, _error(401, "MISSING_SIGNATURE_HEADERS", "BX-SIGNATURE, BX-TIMESTAMP and BX-NONCE are required")
+        signed_body = body.replace(" ", "") if request.path in OTC_PATHS else body
+        payload = (timestamp + nonce + request.method + request.path + signed_body).encode("utf-8")
+        key = self._verify(request, payload, signature)
+        if key is None:
+            self.stats["rejected"] += 1
+            return None, _error(401, "INVALID_SIGNATURE", "Signature does not match the request")
+        nonce_error = self._check_nonce(key, nonce)
+        if nonce_error:
+            self.stats["rejected"] += 1
+            return None, _error(400, "INVALID_NONCE", nonce_error)
+        try:
+            body = json.loads(body)
+        except ValueError:
+            self.stats["rejected"] += 1
+            return None, _error(400, "INVALID_BODY", "Body is not JSON")
+        if body.get("commandType") not in COMMAND_TYPES[request.path]:
+            self.stats["rejected"] += 1
+            return None, _error(400, "INVALID_COMMAND_TYPE", f"Unexpected commandType {body.get('commandType')}")
+        return body, None
+
+    async def hmac_login(self, request):
+        public_key = request.headers.get("BX-PUBLIC-KEY", "")
+        payload = request.headers.get("BX-TIMESTAMP", "") + request.headers.get("BX-NONCE", "") + "GET" + request.path
+        secret = self.hmac_keys.get(public_key)
+        expected = hmac.new(secret, payload.encode("utf-8"), sha256).hexdigest() if secret is not None else ""
+        if not expected or not hmac.compare_digest(expected, request.headers.get("BX-SIGNATURE", "")):
+            return _error(401, "INVALID_SIGNATURE", "HMAC login signature does not match")
+        return self._issue_token(f"hmac:{public_key}")
+
+    async def ecdsa_login(self, request):
+        body = await request.json()
+        public_key = body.get("publicKey", "").strip()
+        login_payload = body.get("loginPayload") or {}
+        if self.public_keys and public_key not in self.public_keys:
+            return _error(401, "UNKNOWN_PUBLIC_KEY", "Public key is not registered")
+        if int(login_payload.get("expirationTime", 0)) < time.time():
+            return _error(401, "LOGIN_EXPIRED", "loginPayload has expired")
+        try:
+            verifier = self.verifiers.get(public_key) or ecdsa_verifier(public_key)
+        except (UnexpectedDER, ValueError):
+            return _error(400, "INVALID_PUBLIC_KEY", "publicKey is not a PEM public key")
+        payload = json.dumps(login_payload, separators=(",", ":")).encode("utf-8")
+        if not verifier(payload, body.get("signature", "")):
+            return _error(401, "INVALID_SIGNATURE", "Login signature does not match")
+        self.verifiers[public_key] = verifier
+        return self._issue_token(public_key)
+
+    async def logout(self, request):
+        self.tokens.pop(self._token(request), None)
+        return web.json_response({})
+
+    # public data
+
+    async def get_nonce(self, request):
+        lower, upper = nonce_bounds()
+        return web.json_response({"lowerBound": lower, "upperBound": upper})
+
+    async def get_markets(self, request):
+        market_type = request.query.get("marketType")
+        return web.json_response([market for market in self.markets.values()
+                                  if market_type is None or market["marketType"] == market_type])
+
+    async def get_market(self, request):
+        market = self.markets.get(request.match_info["symbol"])
+        if market is None:
+            return _error(404, "MARKET_NOT_FOUND", "Unknown symbol")
+        return web.json_response(market)
+
+    async def get_orderbook(self, request):
+        market = self.rest_markets.get(request.match_info["symbol"])
+        if market is None:
+            return _error(404, "MARKET_NOT_FOUND", "Unknown symbol")
+        market.step()
+        return web.json_response(market.hybrid_orderbook())
+
+    async def get_stats(self, request):
+        return web.json_response(self.stats)
+
+    # trading
+
+    async def get_trading_accounts(self, request):
+        if not self._authenticated(request):
+            return _error(401, "UNAUTHORIZED", "Missing or unknown JWT")
+        return web.json_response([{"tradingAccountId": TRADING_ACCOUNT_ID, "isPrimaryAccount": "true",
+                                   "tradingAccountName": "mock", "isBorrowing": "false", "isLending": "false"}])
+
+    async def post_order(self, request):
+        body, error = await self._signed_body(request)
+        if error is not None:
+            return error
+        order_id = self.next_id()
+        timestamp = now_ms()
+        order = dict(body, orderId=order_id, status="OPEN", statusReason="Ok", createdAtTimestamp=str(timestamp),
+                     createdAtDatetime=iso_datetime(timestamp))
+        self.orders[order_id] = order
+        await self._publish("orders", {"type": "update", "dataType": "V1TAOrder", "data": order})
+        return web.json_response({"message": "Command acknowledged - CreateOrder", "requestId": self.next_id(),
+                                  "orderId": order_id, "clientOrderId": body.get("clientOrderId"), "test": False})
+
+    async def get_orders(self, request):
+        if not self._authenticated(request):
+            return _error(401, "UNAUTHORIZED", "Missing or unknown JWT")
+        return web.json_response(list(self.orders.values()))
+
+    async def post_command(self, request):
+        body, error = await self._signed_body(request)
+        if error is not None:
+            return error
+        command_type = body["commandType"]
+        order = self.orders.get(body.get("orderId"))
+        if order is not None:
+            if command_type == "V3CancelOrder":
+                order["status"] = "CANCELLED"
+            elif command_type == "V1AmendOrder":
+                order.update({field: value for field, value in body.items() if field != "commandType"})
+            await self._publish("orders", {"type": "update", "dataType": "V1TAOrder", "data": order})
+        otc_trade = self.otc_trades.get(body.get("otcTradeId"))
+        if otc_trade is not None and command_type == "V1CancelOtcTrade":
+            otc_trade["status"] = "CANCELLED"
+        return web.json_response({"message": f"Command acknowledged - {command_type[2:]}", "requestId": self.next_id(),
+                                  "orderId": body.get("orderId"), "otcTradeId": body.get("otcTradeId")})
+
+    async def post_otc_trade(self, request):
+        body, error = await self._signed_body(request)
+        if error is not None:
+            return error
+        otc_trade_id = self.next_id()
+        self.otc_trades[otc_trade_id] = dict(body, otcTradeId=otc_trade_id, status="PENDING",
+                                             createdAtTimestamp=str(now_ms()))
+        return web.json_response({"message": "Command acknowledged - CreateOtcTrade", "requestId": self.next_id(),
+                                  "otcTradeId": otc_trade_id, "clientOtcTradeId": body.get("clientOtcTradeId")})
+
+    async def get_otc_trades(self, request):
+        if not self._authenticated(request):
+            return _error(401, "UNAUTHORIZED", "Missing or unknown JWT")
+        return web.json_response({"data": list(self.otc_trades.values())})
+
+    async def get_otc_trade(self, request):
+        if not self._authenticated(request):
+            return _error(401, "UNAUTHORIZED", "Missing or unknown JWT")
+        otc_trade = self.otc_trades.get(request.match_info["otc_trade_id"])
+        if otc_trade is None:
+            return _error(404, "OTC_TRADE_NOT_FOUND", "Unknown otcTradeId")
+        return web.json_response(otc_trade)
+
+    # custody
+
+    async def get_wallet_transactions(self, request):
+        if not self._authenticated(request):
+            return _error(401, "UNAUTHORIZED", "Missing or unknown JWT")
+        return web.json_response({"data": []})
+
+    async def get_instructions(self, request):
+        if not self._authenticated(request):
+            return _error(401, "UNAUTHORIZED", "Missing or unknown JWT")
+        symbol = request.match_info["symbol"]
+        return web.json_response([{"network": symbol, "symbol": symbol, "address": f"mock-{symbol.lower()}-address",
+                                   "destinationId": sha256(symbol.encode("utf-8")).hexdigest()[:58],
+                                   "name": f"mock {symbol}"}])
+
+    async def get_limits(self, request):
+        if not self._authenticated(request):
+            return _error(401, "UNAUTHORIZED", "Missing or unknown JWT")
+        return web.json_response({"symbol": request.match_info["symbol"], "available": "1000000",
+                                  "twentyFourHour": "1000000"})
+
+    async def post_withdrawal(self, request):
+        """Withdrawals carry their nonce and timestamp in the body, see custody/custody_withdrawal_ecdsa.py"""
+        self.stats["requests"] += 1
+        raw_body = (await request.read()).decode("utf-8")
+        if not self._authenticated(request):
+            self.stats["rejected"] += 1
+            return _error(401, "UNAUTHORIZED", "Missing or unknown JWT")
+        try:
+            body = json.loads(raw_body)
+        except ValueError:
+            self.stats["rejected"] += 1
+            return _error(400, "INVALID_BODY", "Body is not JSON")
+        nonce, timestamp = str(body.get("nonce", "")), str(body.get("timestamp", ""))
+        payload = (timestamp + nonce + "POST" + request.path + raw_body).encode("utf-8")
+        key = self._verify(request, payload, request.headers.get("BX-SIGNATURE", ""))
+        if key is None:
+            self.stats["rejected"] += 1
+            return _error(401, "INVALID_SIGNATURE", "Signature does not match the request")
+        used = self.withdrawal_nonces.setdefault(key, set())
+        if nonce in used:
+            self.stats["rejected"] += 1
+            return _error(400, "INVALID_NONCE", f"nonce {nonce} was already used")
+        used.add(nonce)
+        return web.json_response({"statusReason": "Withdrawal Accepted", "statusReasonCode": 1001,
+                                  "custodyTransactionId": f"DB:{sha256(payload).hexdigest()}"})
+
+    # websockets
+
+    def _market(self, markets, symbol):
+        market = markets.get(symbol)
+        if market is None and symbol in self.markets:
+            market = markets[symbol] = SyntheticMarket(self.markets[symbol], random.Random(f"{self.seed}:{symbol}"))
+        return market
+
+    async def _serve(self, request, topics, subscriptions, on_subscribed, produce, initial=(), connections=None):
+        """
+        Run one websocket, registered in `connections` (websocket -> subscriptions) while it is open. Subscribe
+        commands for `topics` update `subscriptions`, keyed by (topic, symbol), and send the frames returned by
+        `on_subscribed(topic, symbol)`. `produce()` returns the frames of one step of every subscription and is called
+        `feed_rate` times per second.
+        """
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        if connections is not None:
+            connections[ws] = subscriptions
+        for frame in initial:
+            await self._send(ws, frame)
+        pump = asyncio.ensure_future(self._pump(ws, produce))
+        try:
+            async for msg in ws:
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    continue
+                try:
+                    message = json.loads(msg.data)
+                except ValueError:
+                    continue
+                if message.get("method") == "keepalivePing":
+                    await self._send(ws, _result(message.get("id"), "Keep alive pong"))
+                elif message.get("method") in ("subscribe", "unsubscribe"):
+                    await self._subscribe(ws, message, topics, subscriptions, on_subscribed)
+        finally:
+            pump.cancel()
+            if connections is not None:
+                connections.pop(ws, None)
+        return ws
+
+    async def _send(self, ws, frame):
+        if not isinstance(frame, str):
+            frame = json.dumps(frame, separators=(",", ":"))
+        await ws.send_str(frame)
+        self.stats["frames_sent"] += 1
+
+    async def _pump(self, ws, produce):
+        if not self.feed_rate:
+            return
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        steps = 0
+        while not ws.closed:
+            due = int((loop.time() - started) * self.feed_rate)
+            for _ in range(due - steps):
+                for frame in produce():
+                    await self._send(ws, frame)
+            steps = due
+            await asyncio.sleep(max(1 / self.feed_rate, 0.001))
+
+    async def _subscribe(self, ws, message, topics, subscriptions, on_subscribed):
+        params = message.get("params") or {}
+        topic, symbol = params.get("topic"), params.get("symbol")
+        if topic not in topics or (symbol is not None and symbol not in self.markets):
+            await self._send(ws, _rpc_error(message.get("id"), f"Cannot subscribe to {params}"))
+            return
+        if message["method"] == "unsubscribe":
+            subscriptions.pop((topic, symbol), None)
+            await self._send(ws, _result(message.get("id"), "Successfully unsubscribed"))
+            return
+        subscriptions[(topic, symbol)] = True
+        await self._send(ws, _result(message.get("id"), "Successfully subscribed"))
+        for frame in on_subscribed(topic, symbol):
+            await self._send(ws, frame)
+
+    async def orderbook_feed(self, request):
+        markets, subscriptions = {}, {}
+
+        def snapshot(topic, symbol):
+            market = self._market(markets, symbol)
+            return [market.l1_snapshot() if topic == "l1Orderbook" else market.l2_snapshot()]
+
+        def produce():
+            # every step of a symbol moves its book, so its l1 and l2 subscriptions stay consistent
+            frames = []
+            for topic, symbol in list(subscriptions):
+                market = self._market(markets, symbol)
+                frames.append(market.l1_snapshot() if topic == "l1Orderbook" else market.l2_update())
+            return frames
+
+        return await self._serve(request, {"l1Orderbook", "l2Orderbook"}, subscriptions, snapshot, produce)
+
+    async def tick_feed(self, request):
+        markets, subscriptions = {}, {}
+
+        def produce():
+            return [self._market(markets, symbol).tick() for _, symbol in list(subscriptions)]
+
+        return await self._serve(request, {"tick"}, subscriptions, lambda topic, symbol: [], produce)
+
+    async def trades_feed(self, request):
+        symbol = request.match_info["symbol"]
+        if symbol not in self.markets:
+            return _error(404, "MARKET_NOT_FOUND", "Unknown symbol")
+        market = SyntheticMarket(self.markets[symbol], random.Random(f"{self.seed}:{symbol}"))
+        # the trades feed needs no subscribe, it sends the recent trades on connect and then every new trade
+        return await self._serve(request, set(), {}, None, lambda: [market.trade_update()],
+                                 initial=[market.trade_snapshot()])
+
+    async def private_data_feed(self, request):
+        if not self._authenticated(request):
+            return _error(401, "UNAUTHORIZED", "Missing or unknown JWT_COOKIE")
+        subscriptions = {}
+        rng = random.Random(self.seed)
+
+        def spot_account():
+            timestamp = now_ms()
+            return {"tradingAccountId": TRADING_ACCOUNT_ID, "assetId": "1", "assetSymbol": "BTC",
+                    "availableQuantity": f"{rng.uniform(0, 10):.8f}", "borrowedQuantity": "0.00000000",
+                    "lockedQuantity": "0.00000000", "loanedQuantity": "0.00000000",
+                    "updatedAtTimestamp": str(timestamp), "updatedAtDatetime": iso_datetime(timestamp)}
+
+        def snapshot(topic, symbol):
+            if topic == "spotAccounts":
+                return [{"type": "snapshot", "dataType": "V1TASpotAccount", "data": [spot_account()]}]
+            if topic == "orders":
+                return [{"type": "snapshot", "dataType": "V1TAOrder", "data": list(self.orders.values())}]
+            return []
+
+        def produce():
+            if ("spotAccounts", None) not in subscriptions:
+                return []
+            return [{"type": "update", "dataType": "V1TASpotAccount", "data": spot_account()}]
+
+        return await self._serve(request, PRIVATE_TOPICS, subscriptions, snapshot, produce,
+                                 connections=self.private_connections)
+
+    async def _publish(self, topic, frame):
+        """Send a private-data update to every connection subscribed to `topic`"""
+        for ws, subscriptions in list(self.private_connections.items()):
+            if (topic, None) in subscriptions and not ws.closed:
+                await self._send(ws, frame)
+
+    def run(self, host="127.0.0.1", port=8765):
+        web.run_app(self.app, host=host, port=port)
+
+
+def main():
+    public_keys = []
+    public_key_file = os.getenv("BX_MOCK_PUBLIC_KEY_FILE")
+    if public_key_file:
+        with open(public_key_file) as f:
+            end = "-----END PUBLIC KEY-----"
+            public_keys = [pem + end for pem in f.read().split(end) if pem.strip()]
+    hmac_keys = {}
+    if os.getenv("BX_PUBLIC_KEY") and os.getenv("BX_SECRET_KEY"):
+        hmac_keys[os.getenv("BX_PUBLIC_KEY")] = os.getenv("BX_SECRET_KEY").encode("utf-8")
+    exchange = MockExchange(hmac_keys=hmac_keys,
+                            public_keys=public_keys,
+                            feed_rate=float(os.getenv("BX_MOCK_FEED_RATE", "10")),
+                            strict_tokens=os.getenv("BX_MOCK_STRICT_TOKENS", "false").lower() == "true",
+                            rate_limit=int(os.getenv("BX_MOCK_RATE_LIMIT", "0")))
+    exchange.run(os.getenv("BX_MOCK_HOST", "127.0.0.1"), int(os.getenv("BX_MOCK_PORT", "8765")))
+
+
+if __name__ == "__main__":
+    main()
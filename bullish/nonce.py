@@ -0,0 +1,121 @@
+"""
+Strictly increasing BX-NONCE values allocated locally.
+
+NonceAllocator.sync() reads the accepted range from /trading-api/v1/nonce once. After that every nonce is the current
+time in microseconds, as the examples used, bumped to one above the previous nonce when two requests ask within the
+same microsecond, so nonces never repeat or go backwards, whatever the number of threads. The range is fetched again
+only when it runs out, i.e. after the day it covers.
+
+Processes that sign with the same API key can share one allocator state through a file (`path`). The last nonce and
+the range are kept in the memory-mapped file and every allocation holds an exclusive flock on it, so a process that
+starts later needs no request to /v1/nonce while the stored range is still current. File sharing needs fcntl (POSIX).
+The examples pass BX_NONCE_FILE as `path`, so setting it shares their nonces between processes.
+
+    NONCES = NonceAllocator.sync(session, HOST_NAME, path=os.getenv("BX_NONCE_FILE"))
+    next_nonce = str(NONCES.next())
+"""
+import mmap
+import os
+import struct
+import threading
+import time
+
+# last allocated nonce, lower bound, upper bound
+STATE = struct.Struct("<qqq")
+
+
+class NonceAllocator:
+
+    def __init__(self, lower_bound=0, upper_bound=2 ** 63 - 1, path=None, refresh=None, clock=time.time_ns):
+        self.clock = clock
+        self.refresh = refresh
+        self._lock = threading.Lock()
+        self._last = 0
+        self._lower_bound = lower_bound
+        self._upper_bound = upper_bound
+        self._state = None
+        self._file = None
+        if path is not None:
+            self._open(path)
+
+    @classmethod
+    def sync(cls, session, host_name, path=None, **kwargs):
+        """
+        Create an allocator for the range returned by GET /trading-api/v1/nonce. With `path`, the request is skipped
+        when the shared file already holds a current range.
+        """
+        def refresh():
+            bounds = session.get(host_name + "/trading-api/v1/nonce").json()
+            return int(bounds["lowerBound"]), int(bounds["upperBound"])
+
+        allocator = cls(upper_bound=-1, path=path, refresh=refresh, **kwargs)
+        if allocator._upper_bound < allocator._now():
+            allocator._set_bounds(*refresh())
+        return allocator
+
+    def _open(self, path):
+        import fcntl
+        self._flock = fcntl.flock
+        self._lock_ex, self._lock_un = fcntl.LOCK_EX, fcntl.LOCK_UN
+        self._file = open(path, "a+b")
+        self._flock(self._file, self._lock_ex)
+        try:
+            if os.fstat(self._file.fileno()).st_size < STATE.size:
+                self._file.truncate(0)
+                self._file.write(STATE.pack(0, 0, -1))
+                self._file.flush()
+            self._state = mmap.mmap(self._file.fileno(), STATE.size)
+            self._last, self._lower_bound, self._upper_bound = STATE.unpack_from(self._state)
+        finally:
+            self._flock(self._file, self._lock_un)
+
+    def _now(self):
+        return self.clock() // 1000
+
+    def _set_bounds(self, lower_bound, upper_bound):
+        with self._lock:
+            self._lower_bound, self._upper_bound = lower_bound, upper_bound
+            if self._state is not None:
+                self._flock(self._file, self._lock_ex)
+                try:
+                    last, _, _ = STATE.unpack_from(self._state)
+                    STATE.pack_into(self._state, 0, last, lower_bound, upper_bound)
+                finally:
+                    self._flock(self._file, self._lock_un)
+
+    def _allocate(self):
+        """The next nonce, or None when it would be above the upper bound"""
+        with self._lock:
+            if self._state is None:
+                nonce = max(self._last + 1, self._now(), self._lower_bound)
+                if nonce > self._upper_bound:
+                    return None
+                self._last = nonce
+                return nonce
+            self._flock(self._file, self._lock_ex)
+            try:
+                last, self._lower_bound, self._upper_bound = STATE.unpack_from(self._state)
+                nonce = max(last + 1, self._now(), self._lower_bound)
+                if nonce > self._upper_bound:
+                    return None
+                STATE.pack_into(self._state, 0, nonce, self._lower_bound, self._upper_bound)
+                self._last = nonce
+                return nonce
+            finally:
+                self._flock(self._file, self._lock_un)
+
+    def next(self):
+        """Return the next nonce, an int strictly greater than every nonce handed out before"""
+        nonce = self._allocate()
+        if nonce is None and self.refresh is not None:
+            self._set_bounds(*self.refresh())
+            nonce = self._allocate()
+        if nonce is None:
+            raise ValueError(f"No nonce left below the upper bound {self._upper_bound}")
+        return nonce
+
+    def close(self):
+        if self._state is not None:
+            self._state.close()
+            self._file.close()
+            self._state = None
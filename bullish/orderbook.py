@@ -0,0 +1,185 @@
+"""
+Local L2 order book maintained from the orderbook websocket feeds.
+
+Each side of the book is a PriceLadder: a sorted array of fixed-point integer price keys with the best price kept at
+the end, plus a dict of price -> quantity. Applying a price level delta is a binary search plus a list insert/remove, and reading the
+best bid/offer never has to sort or scan the book.
+"""
+from bisect import bisect_left
+
+
+class PriceLadder:
+    """
+    One side of an order book. Bids are kept in ascending price order and asks in descending price order (stored as
+    negated keys), so the best level of either side is always the last element of the array.
+
+    Prices and quantities are decoded once with the market precision and held as fixed-point integers.
+    """
+
+    def __init__(self, is_bid, precision):
+        self.is_bid = is_bid
+        self.precision = precision
+        self._keys = []
+        self._levels = {}
+
+    def __len__(self):
+        return len(self._keys)
+
+    def clear(self):
+        self._keys.clear()
+        self._levels.clear()
+
+    def set_level(self, price, quantity):
+        key = price if self.is_bid else -price
+        if key not in self._levels:
+            keys = self._keys
+            if not keys or key > keys[-1]:
+                keys.append(key)
+            else:
+                keys.insert(bisect_left(keys, key), key)
+        self._levels[key] = quantity
+
+    def remove_level(self, price):
+        key = price if self.is_bid else -price
+        if self._levels.pop(key, None) is None:
+            return
+        keys = self._keys
+        if keys[-1] == key:
+            keys.pop()
+        else:
+            del keys[bisect_left(keys, key)]
+
+    def apply(self, price_levels):
+        """
+        Apply a flat [price, quantity, price, quantity, ...] list of wire strings as sent in the bids/asks of an
+        orderbook message. A zero quantity removes the level.
+        """
+        parse_price = self.precision.parse_price
+        parse_quantity = self.precision.parse_quantity
+        for i in range(0, len(price_levels), 2):
+            price = parse_price(price_levels[i])
+            quantity = parse_quantity(price_levels[i + 1])
+            if quantity == 0:
+                self.remove_level(price)
+            else:
+                self.set_level(price, quantity)
+
+    def _level(self, key):
+        return (key if self.is_bid else -key), self._levels[key]
+
+    def best(self):
+        """Return the best (price, quantity) of this side, or None when the side is empty"""
+        if not self._keys:
+            return None
+        return self._level(self._keys[-1])
+
+    def depth(self, levels=None):
+        """Return up to `levels` (price, quantity) tuples, best first"""
+        keys = self._keys
+        start = 0 if levels is None else max(len(keys) - levels, 0)
+        return [self._level(key) for key in reversed(keys[start:])]
+
+
+class OrderBook:
+    """
+    Order book for a single symbol, built from `snapshot` and `update` messages of the hybrid or l2Orderbook feeds.
+    `precision` is the bullish.fixed_point.MarketPrecision of the symbol.
+    """
+
+    def __init__(self, symbol, precision):
+        self.symbol = symbol
+        self.precision = precision
+        self.bids = PriceLadder(True, precision)
+        self.asks = PriceLadder(False, precision)
+        self.sequence_number = None
+
+    def apply_snapshot(self, data):
+        self.bids.clear()
+        self.asks.clear()
+        self.apply_update(data)
+
+    def apply_update(self, data):
+        self.bids.apply(data["bids"])
+        self.asks.apply(data["asks"])
+        seq_num_range = data.get("sequenceNumberRange")
+        if seq_num_range is not None:
+            self.sequence_number = seq_num_range[1]
+        elif "sequenceNumber" in data:
+            self.sequence_number = data["sequenceNumber"]
+
+    def on_message(self, message):
+        """Apply an already decoded orderbook websocket message"""
+        if message["type"] == "snapshot":
+            self.apply_snapshot(message["data"])
+        else:
+            self.apply_update(message["data"])
+
+    def best_bid(self):
+        return self.bids.best()
+
+    def best_ask(self):
+        return self.asks.best()
+
+    def bbo(self):
+        return self.bids.best(), self.asks.best()
+
+    def depth(self, levels=None):
+        return self.bids.depth(levels), self.asks.depth(levels)
+
+
+# dataType of the /trading-api/v1/market-data/orderbook messages, for messages that do not carry their topic
+TOPICS_BY_DATA_TYPE = {
+    "V1TALevel1": "l1Orderbook",
+    "V1TALevel2": "l2Orderbook",
+}
+
+
+class OrderBookManager:
+    """
+    Keeps one OrderBook per (topic, symbol) current from the messages of a multi-symbol orderbook websocket, so
+    any symbol's book, BBO or depth is a dict lookup away.
+
+    `precisions` maps each symbol to its bullish.fixed_point.MarketPrecision, e.g. built from /trading-api/v1/markets.
+    """
+
+    def __init__(self, precisions):
+        self.precisions = precisions
+        self.books = {}
+
+    def clear(self):
+        self.books.clear()
+
+    def book(self, symbol, topic="l2Orderbook"):
+        return self.books.get((topic, symbol))
+
+    def on_message(self, message):
+        """Apply a decoded orderbook message, returns the book it updated or None if it was not book data"""
+        data = message.get("data")
+        if not isinstance(data, dict) or "symbol" not in data:
+            return None
+        topic = message.get("topic") or TOPICS_BY_DATA_TYPE.get(message.get("dataType"))
+        if topic is None:
+            return None
+        symbol = data["symbol"]
+        book = self.books.get((topic, symbol))
+        if book is None:
+            book = self.books[(topic, symbol)] = OrderBook(symbol, self.precisions[symbol])
+        if topic == "l1Orderbook":
+            # level 1 messages carry the whole top of book as a single bid and ask
+            book.apply_snapshot({
+                "bids": data.get("bid", data.get("bids", [])),
+                "asks": data.get("ask", data.get("asks", [])),
+                "sequenceNumber": data.get("sequenceNumber"),
+            })
+        else:
+            book.on_message(message)
+        return book
+
+    def bbo(self, symbol):
+        """Best bid and offer from the l2 book of `symbol`, falling back to its l1 book"""
+        book = self.books.get(("l2Orderbook", symbol)) or self.books.get(("l1Orderbook", symbol))
+        return None if book is None else book.bbo()
+
+    def depth(self, symbol, levels=None):
+        book = self.books.get(("l2Orderbook", symbol))
+        return None if book is None else book.depth(levels)
@@ -0,0 +1,309 @@
+"""
+Client-side rate limiting of REST requests by BX-RATELIMIT-TOKEN and endpoint class.
+
+Every rate-limit token, including none, has a token bucket for all of its requests and one per endpoint class: new
+orders, commands (amends and cancels through /v2/command), OTC, custody and queries. A request takes a token from
+both before it is sent, so a burst is paced on the client instead of costing a round trip per 429.
+
+Requests wait in one queue per rate-limit token and endpoint class, served by priority, then in arrival order:
+cancels first, then amends, then new orders and OTC trades, then queries. A request waiting on its class's bucket
+holds up only its own class. Across classes only the token's bucket is shared, and when its budget is short the
+request that is otherwise ready and ranks first takes it, so a cancel sent behind a burst of new orders waits only
+for the next token, never for the orders queued ahead of it.
+
+The buckets tune themselves from responses. BX-RATELIMIT-LIMIT, -REMAINING and -RESET, or the same X-RateLimit-*
+headers, are taken as the budget of the rate-limit token: they set the limit of its bucket, cut its level to the
+remaining budget and refill it when the server's window resets, and a 429 holds it until Retry-After or the reset.
+A 429 without them halves the rate of its endpoint class and holds the token's requests until Retry-After, and the
+rate then recovers by a tenth of its configured value with every successful response.
+
+A limiter is used either from threads, with acquire(), or from one event loop, with acquire_async(), not both.
+Pacing is opt-in: the shared bullish.rest client paces every request it sends when BX_RATELIMIT_RATE is set, at that
+many requests per second of each rate-limit token, and bullish.aio_rest clients take a limiter as `rate_limiter`.
+
+    limiter = RateLimiter()
+    limiter.acquire("POST", URI, body_bytes, RATELIMIT_TOKEN)
+    response = session.post(HOST_NAME + URI, data=body_bytes, headers=headers)
+    limiter.update("POST", URI, RATELIMIT_TOKEN, response.status_code, response.headers)
+"""
+import asyncio
+import heapq
+import itertools
+import os
+import re
+import threading
+import time
+from collections import Counter
+
+# requests per second of each rate-limit token across all endpoints, before any tuning from response headers
+TOKEN_RATE = 50
+# the token rate of the shared bullish.rest client, which is only paced when it is set
+RATE = float(os.getenv("BX_RATELIMIT_RATE", "0"))
+# requests per second of each endpoint class. These are starting points, not the exchange's limits: pass the limits
+# of your account as `limits`
+LIMITS = {"orders": 50, "commands": 50, "otc": 10, "custody": 5, "query": 20}
+CANCEL, AMEND, CREATE, QUERY = range(4)
+
+_COMMAND_TYPE = re.compile(rb'"commandType":\s*"(\w+)"')
+
+
+def command_type(body):
+    """The commandType of a dict or serialized body, None if it has none"""
+    if isinstance(body, dict):
+        return body.get("commandType")
+    if isinstance(body, str):
+        body = body.encode()
+    match = _COMMAND_TYPE.search(body) if body else None
+    return match.group(1).decode() if match else None
+
+
+def classify(method, path, body=None):
+    """(endpoint class, priority) of a request"""
+    if "/otc-" in path:
+        endpoint = "otc"
+    elif "/wallets/" in path:
+        endpoint = "custody"
+    elif method == "GET":
+        endpoint = "query"
+    elif path.endswith("/command"):
+        endpoint = "commands"
+    elif path.endswith("/orders"):
+        endpoint = "orders"
+    else:
+        endpoint = "query"
+    if method == "GET":
+        return endpoint, QUERY
+    name = command_type(body) or ""
+    if "Cancel" in name:
+        return endpoint, CANCEL
+    if "Amend" in name:
+        return endpoint, AMEND
+    return endpoint, CREATE
+
+
+def _header(headers, *names):
+    for name in names:
+        value = headers.get(name)
+        if value is not None:
+            try:
+                return float(value)
+            except ValueError:
+                return None
+    return None
+
+
+def _seconds_until(reset):
+    """Seconds until a reset given as a delay in seconds or as an epoch time in seconds or milliseconds"""
+    if reset is None:
+        return None
+    if reset > 1e12:
+        return max(reset / 1000 - time.time(), 0)
+    if reset > 1e9:
+        return max(reset - time.time(), 0)
+    return reset
+
+
+class TokenBucket:
+    """
+    `rate` tokens per second up to `capacity`, its window is capacity / rate seconds. Once the server has said when its
+    window resets, the bucket refills at that time instead, as the server does
+    """
+
+    def __init__(self, rate, capacity=None, clock=time.monotonic):
+        self.rate = self.ceiling = rate
+        self.capacity = capacity or rate
+        self.window = self.capacity / rate
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+        self.resets_at = None
+        self.blocked_until = 0
+
+    def _refill(self, now):
+        if self.resets_at is None:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        elif now >= self.resets_at:
+            self.tokens = self.capacity
+            self.resets_at = None
+        self.updated = now
+
+    def delay(self, now):
+        """Seconds until a token is available"""
+        self._refill(now)
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.tokens >= 1:
+            return 0
+        if self.resets_at is not None:
+            return self.resets_at - now
+        return (1 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1
+
+    def pause(self, seconds):
+        self.blocked_until = max(self.blocked_until, self.clock() + seconds)
+
+    def tune(self, status, limit=None, remaining=None, reset_after=None, retry_after=None):
+        now = self.clock()
+        self._refill(now)
+        if limit:
+            # the server's limit is taken to be per our window
+            self.capacity = limit
+            self.rate = self.ceiling = limit / self.window
+        if remaining is not None:
+            self.tokens = min(self.tokens, remaining)
+        if reset_after is not None:
+            self.resets_at = now + reset_after
+        if status == 429:
+            if not limit:
+                self.rate = max(self.rate / 2, self.ceiling / 100)
+            pause = retry_after if retry_after is not None else reset_after
+            self.pause(pause if pause is not None else 1 / self.rate)
+        elif self.rate < self.ceiling:
+            self.rate = min(self.ceiling, self.rate + self.ceiling / 10)
+
+
+class RateLimiter:
+
+    def __init__(self, rate=TOKEN_RATE, limits=None, clock=time.monotonic):
+        self.rate = rate
+        self.limits = dict(LIMITS, **(limits or {}))
+        self.clock = clock
+        self.stats = Counter()
+        self._lock = threading.Lock()
+        # (rate-limit token, endpoint class or None for the token's own bucket) -> TokenBucket
+        self._buckets = {}
+        # rate-limit token -> endpoint class -> heap of (priority, arrival, event) of the requests waiting for it
+        self._queues = {}
+        self._arrivals = itertools.count()
+
+    def bucket(self, ratelimit_token, endpoint=None):
+        key = (ratelimit_token, endpoint)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            rate = self.rate if endpoint is None else self.limits[endpoint]
+            bucket = self._buckets[key] = TokenBucket(rate, clock=self.clock)
+        return bucket
+
+    def _enqueue(self, ratelimit_token, endpoint, priority, event):
+        entry = (priority, next(self._arrivals), event)
+        heapq.heappush(self._queues.setdefault(ratelimit_token, {}).setdefault(endpoint, []), entry)
+        self.stats["requests"] += 1
+        return entry
+
+    def _ahead(self, ratelimit_token, endpoint, entry, now):
+        """The head of another class that ranks before `entry` and only waits for the token's bucket, if any"""
+        for other, queue in self._queues[ratelimit_token].items():
+            if (other != endpoint and queue and queue[0][:2] < entry[:2]
+                    and self.bucket(ratelimit_token, other).delay(now) == 0):
+                return queue[0]
+        return None
+
+    def _wake_heads(self, ratelimit_token):
+        for queue in self._queues[ratelimit_token].values():
+            if queue:
+                queue[0][2].set()
+
+    def _try_acquire(self, ratelimit_token, endpoint, entry):
+        """0 once the request may be sent, else seconds to wait, None while requests ahead of it are waiting"""
+        queue = self._queues[ratelimit_token][endpoint]
+        if queue[0] is not entry:
+            return None
+        shared, bucket = self.bucket(ratelimit_token), self.bucket(ratelimit_token, endpoint)
+        now = self.clock()
+        delay = max(shared.delay(now), bucket.delay(now))
+        if delay > 0:
+            return delay
+        ahead = self._ahead(ratelimit_token, endpoint, entry, now)
+        if ahead is not None:
+            # e.g. a cancel that is ready to go, it takes the token's budget first
+            ahead[2].set()
+            return None
+        shared.take()
+        bucket.take()
+        heapq.heappop(queue)
+        # the next of this class, and the heads of the others that may have deferred to this one
+        self._wake_heads(ratelimit_token)
+        return 0
+
+    def _abandon(self, ratelimit_token, endpoint, entry):
+        queue = self._queues[ratelimit_token][endpoint]
+        if entry in queue:
+            queue.remove(entry)
+            heapq.heapify(queue)
+            self._wake_heads(ratelimit_token)
+
+    def acquire(self, method, path, body=None, ratelimit_token=None):
+        """Block until the request may be sent"""
+        endpoint, priority = classify(method, path, body)
+        event = threading.Event()
+        with self._lock:
+            entry = self._enqueue(ratelimit_token, endpoint, priority, event)
+        started = None
+        try:
+            while True:
+                with self._lock:
+                    event.clear()
+                    delay = self._try_acquire(ratelimit_token, endpoint, entry)
+                if delay == 0:
+                    break
+                started = started or self.clock()
+                event.wait(delay)
+        except BaseException:
+            with self._lock:
+                self._abandon(ratelimit_token, endpoint, entry)
+            raise
+        if started is not None:
+            self._waited(started)
+
+    async def acquire_async(self, method, path, body=None, ratelimit_token=None):
+        """Wait until the request may be sent, without blocking the event loop"""
+        endpoint, priority = classify(method, path, body)
+        event = asyncio.Event()
+        with self._lock:
+            entry = self._enqueue(ratelimit_token, endpoint, priority, event)
+        started = None
+        try:
+            while True:
+                with self._lock:
+                    event.clear()
+                    delay = self._try_acquire(ratelimit_token, endpoint, entry)
+                if delay == 0:
+                    break
+                started = started or self.clock()
+                try:
+                    await asyncio.wait_for(event.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+        except BaseException:
+            with self._lock:
+                self._abandon(ratelimit_token, endpoint, entry)
+            raise
+        if started is not None:
+            self._waited(started)
+
+    def _waited(self, started):
+        with self._lock:
+            self.stats["delayed"] += 1
+            self.stats["waited_seconds"] += self.clock() - started
+
+    def update(self, method, path, ratelimit_token, status, headers):
+        """Tune the buckets of a request from its response"""
+        endpoint, _ = classify(method, path)
+        limit = _header(headers, "BX-RATELIMIT-LIMIT", "X-RateLimit-Limit")
+        remaining = _header(headers, "BX-RATELIMIT-REMAINING", "X-RateLimit-Remaining")
+        reset_after = _seconds_until(_header(headers, "BX-RATELIMIT-RESET", "X-RateLimit-Reset"))
+        retry_after = _header(headers, "Retry-After")
+        with self._lock:
+            shared, bucket = self.bucket(ratelimit_token), self.bucket(ratelimit_token, endpoint)
+            if status == 429:
+                self.stats["throttled"] += 1
+            if limit or remaining is not None:
+                # the headers describe the budget of the rate-limit token, across its endpoints
+                shared.tune(status, limit, remaining, reset_after, retry_after)
+            else:
+                # without them, the endpoint backs off and every request of the token waits until it may retry
+                bucket.tune(status, reset_after=reset_after, retry_after=retry_after)
+                if status == 429:
+                    shared.pause(bucket.blocked_until - self.clock())
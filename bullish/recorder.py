@@ -0,0 +1,169 @@
+"""
+Recording raw websocket frames to memory-mapped, append-only segment files, and reading them back.
+
+FeedRecorder.record() only timestamps the frame and puts it on a queue, so the receive thread never waits on disk.
+A writer thread appends the records to the current segment: a file preallocated to `max_segment_bytes` and written
+through mmap. Segments rotate when full or after `max_segment_seconds`, and are then truncated to their used size.
+
+Each record is a little-endian header (receive time in ns, channel length, frame length) followed by the UTF-8 channel
+and frame. Every segment `<first receive ns>.seg` has a sparse index `<first receive ns>.idx` of (receive ns, offset)
+pairs, written when the segment is closed, which FeedReader uses to seek to a timestamp without scanning.
+
+    RECORDER = FeedRecorder("recordings")
+    RECORDER.record(conn.url, message)       # from on_message
+    RECORDER.close()
+
+    for received_ns, channel, frame in FeedReader("recordings").frames(start_ns=...):
+        ...
+"""
+import atexit
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+from array import array
+from bisect import bisect_right
+
+HEADER = struct.Struct("<qHI")
+INDEX_EVERY = 256
+
+
+class FeedRecorder:
+
+    def __init__(self, directory, max_segment_bytes=64 * 1024 * 1024, max_segment_seconds=3600, clock=time.time_ns):
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_seconds = max_segment_seconds
+        self.clock = clock
+        self.records = 0
+        self.dropped = 0
+        os.makedirs(directory, exist_ok=True)
+        self._queue = queue.SimpleQueue()
+        self._file = None
+        self._map = None
+        self._name = None
+        self._offset = 0
+        self._opened_at = 0
+        self._index = array("q")
+        self._thread = threading.Thread(target=self._run, name="recorder", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(self, channel, frame):
+        """Queue a frame received now on `channel` (e.g. the websocket url), never blocks"""
+        self._queue.put((self.clock(), channel, frame))
+
+    def close(self):
+        """Write out everything queued and close the current segment"""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=1)
+            except queue.Empty:
+                if self._map is not None and time.monotonic() - self._opened_at >= self.max_segment_seconds:
+                    self._close_segment()
+                continue
+            if item is None:
+                self._close_segment()
+                return
+            self._write(*item)
+
+    def _write(self, received_ns, channel, frame):
+        channel = channel.encode("utf-8")
+        frame = frame.encode("utf-8") if isinstance(frame, str) else frame
+        size = HEADER.size + len(channel) + len(frame)
+        if size + HEADER.size > self.max_segment_bytes:
+            print(f"Frame of {len(frame)} bytes does not fit in a segment, dropped")
+            self.dropped += 1
+            return
+        if self._map is not None and (self._offset + size + HEADER.size > self.max_segment_bytes or
+                                      time.monotonic() - self._opened_at >= self.max_segment_seconds):
+            self._close_segment()
+        if self._map is None:
+            self._open_segment(received_ns)
+        offset = self._offset
+        if self.records % INDEX_EVERY == 0 or offset == 0:
+            self._index.extend((received_ns, offset))
+        HEADER.pack_into(self._map, offset, received_ns, len(channel), len(frame))
+        start = offset + HEADER.size
+        self._map[start:start + len(channel)] = channel
+        start += len(channel)
+        self._map[start:start + len(frame)] = frame
+        self._offset = start + len(frame)
+        self.records += 1
+
+    def _open_segment(self, received_ns):
+        self._name = os.path.join(self.directory, str(received_ns))
+        self._file = open(self._name + ".seg", "w+b")
+        self._file.truncate(self.max_segment_bytes)
+        self._map = mmap.mmap(self._file.fileno(), self.max_segment_bytes)
+        self._offset = 0
+        self._opened_at = time.monotonic()
+        self._index = array("q")
+
+    def _close_segment(self):
+        if self._map is None:
+            return
+        self._map.flush()
+        self._map.close()
+        self._file.truncate(self._offset)
+        self._file.close()
+        with open(self._name + ".idx", "wb") as f:
+            self._index.tofile(f)
+        self._map = None
+        self._file = None
+
+
+class FeedReader:
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def segments(self):
+        """Segment start times in ns, oldest first"""
+        return sorted(int(name[:-4]) for name in os.listdir(self.directory) if name.endswith(".seg"))
+
+    def _seek(self, name, start_ns):
+        if start_ns is None or not os.path.exists(name + ".idx"):
+            return 0
+        index = array("q")
+        with open(name + ".idx", "rb") as f:
+            index.frombytes(f.read())
+        timestamps = index[0::2]
+        position = bisect_right(timestamps, start_ns) - 1
+        return index[2 * position + 1] if position >= 0 else 0
+
+    def frames(self, start_ns=None, end_ns=None):
+        """Yield (received_ns, channel, frame) for every frame received in [start_ns, end_ns)"""
+        segments = self.segments()
+        if start_ns is not None:
+            first = max(bisect_right(segments, start_ns) - 1, 0)
+            segments = segments[first:]
+        for segment in segments:
+            if end_ns is not None and segment >= end_ns:
+                return
+            name = os.path.join(self.directory, str(segment))
+            with open(name + ".seg", "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    continue
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    offset = self._seek(name, start_ns)
+                    while offset + HEADER.size <= len(data):
+                        received_ns, channel_length, frame_length = HEADER.unpack_from(data, offset)
+                        if received_ns == 0 and frame_length == 0:
+                            # the unused, zero filled tail of a segment that is still being written
+                            break
+                        start = offset + HEADER.size
+                        offset = start + channel_length + frame_length
+                        if start_ns is not None and received_ns < start_ns:
+                            continue
+                        if end_ns is not None and received_ns >= end_ns:
+                            return
+                        channel = data[start:start + channel_length].decode("utf-8")
+                        yield received_ns, channel, data[start + channel_length:offset].decode("utf-8")
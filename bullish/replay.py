@@ -0,0 +1,119 @@
+"""
+Replaying recorded websocket frames through the same (conn, message) handlers used on the live feeds.
+
+Frames recorded by bullish.recorder.FeedRecorder are read back from one or more recordings, e.g. one per shard
+process, and merged into a single stream ordered by receive time. Frames with the same receive time keep the order of
+their recording and of the `sources` list, so a replay always calls the handlers in the same order.
+
+Each frame is passed to the handler routed to the path it was received on, with a ReplayConnection standing in for the
+websocket. `speed=1` replays at the recorded pace, `speed=10` ten times faster and `speed=None` as fast as the handlers
+allow, which is what to use for regression tests and benchmarks.
+
+    replayer = FeedReplayer([FeedReader("recordings")], speed=None)
+    replayer.route(ORDERBOOK_PATH, on_message)
+    replayer.route("/trading-api/v1/market-data/trades/", on_trades_message)
+    print(replayer.run())
+"""
+import heapq
+import time
+
+from bullish.recorder import FeedReader
+
+
+class ReplayConnection:
+    """Stands in for the websocket passed to the handlers. Messages sent by a handler are kept, not sent"""
+
+    def __init__(self, url):
+        self.url = url
+        self.sock = None
+        self.sent = []
+
+    def send(self, message):
+        self.sent.append(message)
+
+
+class FeedReplayer:
+    """
+    `sources` are FeedReader instances or iterables of (received_ns, channel, frame) tuples in receive time order.
+    Frames on channels without a route are counted as skipped.
+    """
+
+    def __init__(self, sources, speed=None, clock=time.monotonic, sleep=time.sleep):
+        self.sources = list(sources)
+        self.speed = speed
+        self.clock = clock
+        self.sleep = sleep
+        self.routes = []
+        self.connections = {}
+        self._handlers = {}
+        self.frames = 0
+        self.skipped = 0
+        self.frames_by_path = {}
+        self.handler_seconds = 0.0
+        self.elapsed = 0.0
+        self.max_lag = 0.0
+        self.first_ns = None
+        self.last_ns = None
+
+    def route(self, path, on_message):
+        """Pass frames recorded on any channel containing `path` to on_message(conn, message)"""
+        self.routes.append((path, on_message))
+        self._handlers.clear()
+        self.frames_by_path.setdefault(path, 0)
+
+    def _handler(self, channel):
+        handler = self._handlers.get(channel)
+        if handler is None:
+            handler = self._handlers[channel] = next(
+                ((path, on_message) for path, on_message in self.routes if path in channel), (None, None))
+        return handler
+
+    def _frames(self, start_ns, end_ns):
+        streams = [source.frames(start_ns, end_ns) if isinstance(source, FeedReader) else source
+                   for source in self.sources]
+        if len(streams) == 1:
+            return streams[0]
+        return heapq.merge(*streams, key=lambda record: record[0])
+
+    def run(self, start_ns=None, end_ns=None):
+        """Replay every frame received in [start_ns, end_ns) and return the stats"""
+        perf_counter = time.perf_counter
+        started = self.clock()
+        for received_ns, channel, frame in self._frames(start_ns, end_ns):
+            path, on_message = self._handler(channel)
+            if on_message is None:
+                self.skipped += 1
+                continue
+            if self.first_ns is None:
+                self.first_ns = received_ns
+            self.last_ns = received_ns
+            if self.speed:
+                due = started + (received_ns - self.first_ns) / 1e9 / self.speed
+                now = self.clock()
+                if due > now:
+                    self.sleep(due - now)
+                else:
+                    self.max_lag = max(self.max_lag, now - due)
+            conn = self.connections.get(channel)
+            if conn is None:
+                conn = self.connections[channel] = ReplayConnection(channel)
+            handler_started = perf_counter()
+            on_message(conn, frame)
+            self.handler_seconds += perf_counter() - handler_started
+            self.frames += 1
+            self.frames_by_path[path] += 1
+        self.elapsed = self.clock() - started
+        return self.stats()
+
+    def stats(self):
+        recorded_seconds = (self.last_ns - self.first_ns) / 1e9 if self.first_ns is not None else 0.0
+        return {
+            "frames": self.frames,
+            "skipped": self.skipped,
+            "frames_by_path": dict(self.frames_by_path),
+            "recorded_seconds": recorded_seconds,
+            "elapsed_seconds": self.elapsed,
+            "handler_seconds": self.handler_seconds,
+            "handler_frames_per_second": self.frames / self.handler_seconds if self.handler_seconds else 0.0,
+            "max_lag_seconds": self.max_lag,
+        }
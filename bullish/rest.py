@@ -0,0 +1,142 @@
+"""
+One connection-pooled REST client shared by the examples.
+
+get_client() returns a process-wide requests.Session whose connections are kept alive and reused across requests and
+threads, instead of a new session, and so a new TCP and TLS handshake, per script or per call. Its pool holds up to
+BX_REST_POOL_SIZE connections per host. Sockets are opened with SO_KEEPALIVE, so idle pooled connections are not
+silently dropped by middleboxes, and with TCP_NODELAY unless BX_REST_TCP_NODELAY=false. The first call for a host opens
+BX_REST_WARM_CONNECTIONS connections to it up front, so the first orders do not pay for the handshakes.
+
+Every response carries `connection_reused`, whether it was sent on an already open connection (a warmed one counts as
+open), and client.stats() counts requests, reused connections and new connections.
+
+With BX_RATELIMIT_RATE set, the shared client also paces its requests with a bullish.ratelimit.RateLimiter, by the
+BX-RATELIMIT-TOKEN header they carry and their endpoint, so bursts wait on the client rather than being rejected with
+429s.
+
+    session = get_client(HOST_NAME)
+    response = session.post(HOST_NAME + URI, data=body, headers=headers)
+    response.connection_reused, session.stats()
+"""
+import os
+import socket
+import threading
+import weakref
+from collections import Counter
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from bullish import ratelimit
+
+POOL_SIZE = int(os.getenv("BX_REST_POOL_SIZE", "16"))
+TCP_NODELAY = os.getenv("BX_REST_TCP_NODELAY", "true").lower() == "true"
+WARM_CONNECTIONS = int(os.getenv("BX_REST_WARM_CONNECTIONS", "1"))
+# seconds a pooled connection may sit idle before TCP keepalive probes start
+KEEPALIVE_IDLE = 60
+
+
+def socket_options(tcp_nodelay=TCP_NODELAY):
+    options = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+    if tcp_nodelay:
+        options.append((socket.IPPROTO_TCP, socket.TCP_NODELAY, 1))
+    if hasattr(socket, "TCP_KEEPIDLE"):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, KEEPALIVE_IDLE))
+    return options
+
+
+class PooledAdapter(HTTPAdapter):
+    """An HTTPAdapter with tuned socket options that records whether each request reused a connection"""
+
+    def __init__(self, pool_size=POOL_SIZE, tcp_nodelay=TCP_NODELAY, rate_limiter=None):
+        self.socket_options = socket_options(tcp_nodelay)
+        self.rate_limiter = rate_limiter
+        self.stats = Counter()
+        self._lock = threading.Lock()
+        # connection -> the socket it had after its last request, a new socket means it connected again
+        self._sockets = weakref.WeakKeyDictionary()
+        super().__init__(pool_connections=4, pool_maxsize=pool_size)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        super().init_poolmanager(connections, maxsize, block, socket_options=self.socket_options, **pool_kwargs)
+
+    def warm(self, url, connections=1, verify=True):
+        """Open up to `connections` connections to the host of `url` and leave them in its pool"""
+        if hasattr(self, "get_connection_with_tls_context"):
+            # requests 2.32+ keys the pools by TLS settings too, take the one send() will use
+            pool = self.get_connection_with_tls_context(requests.Request("GET", url).prepare(), verify)
+        else:
+            pool = self.get_connection(url)
+        opened = [pool._get_conn() for _ in range(min(connections, self._pool_maxsize))]
+        for connection in opened:
+            connection.connect()
+            with self._lock:
+                self._sockets[connection] = connection.sock
+                self.stats["connections"] += 1
+        for connection in opened:
+            pool._put_conn(connection)
+
+    def send(self, request, **kwargs):
+        if self.rate_limiter is not None:
+            path = urlsplit(request.url).path
+            ratelimit_token = request.headers.get("BX-RATELIMIT-TOKEN")
+            self.rate_limiter.acquire(request.method, path, request.body, ratelimit_token)
+        response = super().send(request, **kwargs)
+        if self.rate_limiter is not None:
+            self.rate_limiter.update(request.method, path, ratelimit_token, response.status_code, response.headers)
+        connection = getattr(response.raw, "connection", None)
+        sock = getattr(connection, "sock", None)
+        with self._lock:
+            response.connection_reused = connection is not None and self._sockets.get(connection) is sock
+            if connection is not None:
+                self._sockets[connection] = sock
+            self.stats["requests"] += 1
+            self.stats["reused" if response.connection_reused else "connections"] += 1
+        return response
+
+
+class RestClient(requests.Session):
+
+    def __init__(self, pool_size=POOL_SIZE, tcp_nodelay=TCP_NODELAY, rate_limiter=None):
+        super().__init__()
+        self.adapter = PooledAdapter(pool_size, tcp_nodelay, rate_limiter)
+        self.mount("https://", self.adapter)
+        self.mount("http://", self.adapter)
+        self._warmed = set()
+
+    def warm(self, host_name, connections=WARM_CONNECTIONS):
+        """Open connections to a host once, later calls for the same host do nothing"""
+        if host_name and host_name not in self._warmed:
+            self._warmed.add(host_name)
+            # the CA bundle from the environment is part of the pool key, as it is for requests
+            verify = self.merge_environment_settings(host_name, {}, None, self.verify, None)["verify"]
+            self.adapter.warm(host_name, connections, verify=verify)
+
+    def stats(self):
+        """
+        {"requests", "reused", "connections"}, connections counts every connection opened, warmed ones included, and
+        with a rate limiter also "delayed" and "throttled", the requests it held back and the 429s
+        """
+        stats = dict(self.adapter.stats)
+        for key in ("requests", "reused", "connections"):
+            stats.setdefault(key, 0)
+        if self.adapter.rate_limiter is not None:
+            stats["delayed"] = self.adapter.rate_limiter.stats["delayed"]
+            stats["throttled"] = self.adapter.rate_limiter.stats["throttled"]
+        return stats
+
+
+_CLIENT = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def get_client(host_name=None):
+    """The process-wide client, with connections to `host_name` opened on first use"""
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            _CLIENT = RestClient(rate_limiter=ratelimit.RateLimiter(ratelimit.RATE) if ratelimit.RATE else None)
+        if host_name:
+            _CLIENT.warm(host_name)
+    return _CLIENT
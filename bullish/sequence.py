@@ -0,0 +1,126 @@
+"""
+Sequence tracking for incremental websocket feeds.
+
+Instead of closing the connection on the first out-of-order message, a SequenceTracker holds messages that arrive
+ahead of a gap for a short window, releases them in order once the gap fills, and only asks for a fresh snapshot
+when the gap is still open after the window. Snapshots are requested through a callback, so the caller decides how
+to get one on the existing connection (re-subscribing to a topic, or fetching the REST orderbook).
+"""
+import time
+
+
+class SequenceTracker:
+    """
+    Track messages numbered with a [first, last] sequence number range.
+
+    `accept()` returns the list of messages that can be applied in order, which may be empty (the message was a
+    duplicate or is being held behind a gap) or contain several held messages that the new one unblocked. After a
+    snapshot has been applied, call `reset()` with its sequence number.
+
+    With contiguous=False (e.g. trade ids, which increase but are not consecutive) there is no gap detection and only
+    duplicate and stale messages are dropped.
+    """
+
+    def __init__(self, request_snapshot=None, window=1.0, contiguous=True, clock=time.monotonic):
+        self.request_snapshot = request_snapshot
+        self.window = window
+        self.contiguous = contiguous
+        self.clock = clock
+        self.current = None
+        self._pending = {}
+        self._gap_started_at = None
+        self._snapshot_requested_at = None
+        self.gaps = 0
+        self.stale = 0
+        self.snapshot_requests = 0
+        self.recoveries = 0
+        self.last_recovery_time = None
+        self.total_recovery_time = 0.0
+
+    def clear(self):
+        """Forget the current position, e.g. after a reconnect. Messages are held until the next reset()."""
+        self.current = None
+        self._pending.clear()
+        self._gap_started_at = None
+        self._snapshot_requested_at = None
+
+    def reset(self, sequence_number):
+        """Start over from a snapshot at `sequence_number`, releasing any held messages that follow on from it"""
+        self.current = sequence_number
+        self._snapshot_requested_at = None
+        for first in [first for first, (last, _) in self._pending.items() if last <= sequence_number]:
+            del self._pending[first]
+        return self._drain()
+
+    def accept(self, first, last, message):
+        if self.current is None:
+            # nothing to compare against until the first snapshot arrives
+            self._pending[first] = (last, message)
+            return []
+        if last <= self.current:
+            self.stale += 1
+            return []
+        if not self.contiguous or first <= self.current + 1:
+            self.current = last
+            return [message] + self._drain()
+
+        if self._gap_started_at is None:
+            self._gap_started_at = self.clock()
+            self.gaps += 1
+        self._pending[first] = (last, message)
+        self.check()
+        return []
+
+    def check(self):
+        """
+        Request a snapshot if a gap has been open for longer than the window, and again every window until `reset()`
+        is called. Called on every held message and safe to call from a timer. The callback may apply the snapshot and
+        call `reset()` straight away. If it raises, the next call asks again.
+        """
+        if self._gap_started_at is None:
+            return
+        now = self.clock()
+        if self._snapshot_requested_at is not None and now - self._snapshot_requested_at < self.window:
+            return
+        if now - self._gap_started_at >= self.window:
+            self._snapshot_requested_at = now
+            self.snapshot_requests += 1
+            if self.request_snapshot is not None:
+                try:
+                    self.request_snapshot()
+                except Exception:
+                    self._snapshot_requested_at = None
+                    raise
+
+    def _drain(self):
+        released = []
+        pending = self._pending
+        while pending:
+            next_first = min(pending)
+            last, message = pending[next_first]
+            if last <= self.current:
+                del pending[next_first]
+                continue
+            if self.contiguous and next_first > self.current + 1:
+                break
+            del pending[next_first]
+            self.current = last
+            released.append(message)
+        if not pending and self._gap_started_at is not None:
+            self.last_recovery_time = self.clock() - self._gap_started_at
+            self.total_recovery_time += self.last_recovery_time
+            self.recoveries += 1
+            self._gap_started_at = None
+        return released
+
+    def stats(self):
+        return {
+            "current": self.current,
+            "pending": len(self._pending),
+            "gaps": self.gaps,
+            "stale": self.stale,
+            "snapshot_requests": self.snapshot_requests,
+            "recoveries": self.recoveries,
+            "last_recovery_time": self.last_recovery_time,
+            "total_recovery_time": self.total_recovery_time,
+        }
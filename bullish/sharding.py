@@ -0,0 +1,56 @@
+"""
+Spreading a symbol set over several websocket connections or worker processes.
+
+Symbols are assigned with a stable hash (CRC-32 of the symbol name), so a symbol always lands on the same shard for a
+given shard count, across restarts and across processes.
+"""
+import threading
+import time
+import zlib
+
+
+def shard_for(symbol, shards):
+    return zlib.crc32(symbol.encode("utf-8")) % shards
+
+
+def partition(symbols, shards):
+    """Split `symbols` into `shards` lists, keeping the input order within each shard"""
+    partitions = [[] for _ in range(shards)]
+    for symbol in symbols:
+        partitions[shard_for(symbol, shards)].append(symbol)
+    return partitions
+
+
+class ShardRates:
+    """Per-shard message counters, reported as messages per second since the previous report"""
+
+    def __init__(self, shards, clock=time.monotonic):
+        self.clock = clock
+        self.counts = [0] * shards
+        self._reported_counts = [0] * shards
+        self._reported_at = clock()
+
+    def mark(self, shard):
+        self.counts[shard] += 1
+
+    def rates(self):
+        now = self.clock()
+        elapsed = max(now - self._reported_at, 1e-9)
+        counts = list(self.counts)
+        rates = [(count - reported) / elapsed for count, reported in zip(counts, self._reported_counts)]
+        self._reported_counts = counts
+        self._reported_at = now
+        return rates
+
+    def report_every(self, interval, shards=None):
+        """Print the rates of `shards` (default all) every `interval` seconds from a daemon thread"""
+        def report():
+            while True:
+                time.sleep(interval)
+                rates = self.rates()
+                for shard in (range(len(rates)) if shards is None else shards):
+                    print(f"shard={shard} rate={rates[shard]:.1f} msg/s total={self.counts[shard]}")
+
+        thread = threading.Thread(target=report, name="shard-rates", daemon=True)
+        thread.start()
+        return thread
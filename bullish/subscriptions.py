@@ -0,0 +1,164 @@
+"""
+Rate-paced, acknowledged subscribes for the websocket-client examples.
+
+Instead of sleeping in on_open and sending every subscribe back to back, a SubscriptionManager sends them from its
+own thread at a configurable rate with a bounded number awaiting an ack. Each subscribe gets a unique JSON-RPC id and
+is matched to its response; subscribes that are rejected or not acknowledged in time are retried.
+
+    SUBSCRIPTIONS = SubscriptionManager([{"topic": "l2Orderbook", "symbol": "BTCUSDC"}])
+
+    def on_open(conn):
+        SUBSCRIPTIONS.start(conn)
+
+    def on_message(conn, message):
+        message = json.loads(message)
+        if SUBSCRIPTIONS.on_message(message):
+            return
+        ...
+
+    def on_close(conn, close_status_code, close_msg):
+        SUBSCRIPTIONS.stop()
+"""
+import json
+import threading
+import time
+from collections import deque
+
+from bullish.jsonrpc import command
+
+
+class SubscriptionManager:
+
+    def __init__(self, subscriptions=(), rate=50, max_in_flight=20, ack_timeout=5, max_attempts=3,
+                 clock=time.monotonic):
+        self.subscriptions = list(subscriptions)
+        self.rate = rate
+        self.max_in_flight = max_in_flight
+        self.ack_timeout = ack_timeout
+        self.max_attempts = max_attempts
+        self.clock = clock
+        self._condition = threading.Condition()
+        self._queue = deque()
+        self._in_flight = {}
+        self._attempts = {}
+        self._thread = None
+        self._conn = None
+        self._started_at = None
+        self.acked = []
+        self.failed = []
+        self.retries = 0
+        self.startup_time = None
+
+    def add(self, params):
+        with self._condition:
+            self.subscriptions.append(params)
+            if self._conn is not None:
+                self._enqueue(params)
+                self._condition.notify()
+
+    def start(self, conn):
+        """(Re)send every subscription on `conn`, typically from on_open"""
+        self.stop()
+        with self._condition:
+            self._conn = conn
+            self._queue.clear()
+            self._in_flight.clear()
+            self._attempts.clear()
+            self.acked = []
+            self.failed = []
+            self.startup_time = None
+            self._started_at = self.clock()
+            for params in self.subscriptions:
+                self._enqueue(params)
+            self._thread = threading.Thread(target=self._run, args=(conn,), name="subscriptions", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._condition:
+            self._conn = None
+            self._condition.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def on_message(self, message):
+        """Handle a decoded message, returns True if it was the response to one of our subscribes"""
+        request_id = message.get("id")
+        if request_id is None:
+            return False
+        with self._condition:
+            pending = self._in_flight.pop(request_id, None)
+            if pending is None:
+                return False
+            params, _ = pending
+            if "error" in message:
+                print(f"Subscribe {params} rejected: {message['error']}")
+                self._retry(params)
+            else:
+                self.acked.append(params)
+                self._check_complete()
+            self._condition.notify()
+        return True
+
+    def pending(self):
+        with self._condition:
+            return len(self._queue) + len(self._in_flight)
+
+    def _enqueue(self, params):
+        self._attempts[_key(params)] = 0
+        self._queue.append(params)
+
+    def _retry(self, params):
+        key = _key(params)
+        if self._attempts[key] >= self.max_attempts:
+            print(f"Giving up on subscribe {params} after {self._attempts[key]} attempts")
+            self.failed.append(params)
+            self._check_complete()
+        else:
+            self.retries += 1
+            self._queue.append(params)
+
+    def _check_complete(self):
+        if self.startup_time is None and len(self.acked) + len(self.failed) == len(self.subscriptions):
+            self.startup_time = self.clock() - self._started_at
+            print(f"Subscribed to {len(self.acked)} of {len(self.subscriptions)} topics in {self.startup_time:.3f}s")
+
+    def _expire(self, now):
+        for request_id, (params, sent_at) in list(self._in_flight.items()):
+            if now - sent_at >= self.ack_timeout:
+                del self._in_flight[request_id]
+                self._retry(params)
+
+    def _run(self, conn):
+        interval = 1 / self.rate
+        next_send_at = self.clock()
+        while True:
+            with self._condition:
+                while True:
+                    if self._conn is not conn:
+                        return
+                    now = self.clock()
+                    self._expire(now)
+                    if self._queue and len(self._in_flight) < self.max_in_flight and now >= next_send_at:
+                        break
+                    if not self._queue and not self._in_flight:
+                        self._condition.wait()
+                    elif self._queue and len(self._in_flight) < self.max_in_flight:
+                        self._condition.wait(next_send_at - now)
+                    else:
+                        oldest = min(sent_at for _, sent_at in self._in_flight.values())
+                        self._condition.wait(max(oldest + self.ack_timeout - now, 0))
+                params = self._queue.popleft()
+                message = command("subscribe", params)
+                self._attempts[_key(params)] += 1
+                self._in_flight[message["id"]] = (params, now)
+            try:
+                conn.send(json.dumps(message))
+            except Exception as e:
+                print(f"Failed to send subscribe {params}: {e}")
+                return
+            next_send_at = max(next_send_at, now) + interval
+
+
+def _key(params):
+    return tuple(sorted(params.items()))
@@ -0,0 +1,156 @@
+"""
+Reconnecting websocket feeds.
+
+FeedSupervisor owns a websocket.WebSocketApp and opens a new one whenever run_forever() returns, waiting a jittered
+exponential backoff between attempts. Subscriptions are replayed from on_open (see bullish.subscriptions), and the
+on_reconnect callback lets the script drop state that the snapshot of the new connection will rebuild, such as order
+books and trade buffers.
+
+ReconnectMetrics records how long the feed was blind for: the time from a disconnect to the first message received
+on the next connection.
+"""
+import random
+import threading
+import time
+
+import websocket
+
+from bullish.heartbeat import HEARTBEATS
+
+
+class Backoff:
+    """Exponential backoff with full jitter: attempt n waits a random time up to min(max_delay, base_delay * 2**n)"""
+
+    def __init__(self, base_delay=0.5, max_delay=30.0, rng=random.random):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rng = rng
+        self.attempt = 0
+
+    def next_delay(self):
+        delay = min(self.max_delay, self.base_delay * 2 ** self.attempt) * self.rng()
+        self.attempt += 1
+        return delay
+
+    def reset(self):
+        self.attempt = 0
+
+
+class ReconnectMetrics:
+
+    def __init__(self, clock=time.monotonic):
+        self.clock = clock
+        self.connects = 0
+        self.reconnects = 0
+        self.disconnected_at = None
+        self.last_blind_time = None
+        self.max_blind_time = 0.0
+        self.total_blind_time = 0.0
+
+    def on_connect(self):
+        self.connects += 1
+        if self.connects > 1:
+            self.reconnects += 1
+
+    def on_disconnect(self):
+        if self.disconnected_at is None:
+            self.disconnected_at = self.clock()
+
+    def on_first_message(self):
+        """Returns True if this message ended a blind period"""
+        if self.disconnected_at is None:
+            return False
+        self.last_blind_time = self.clock() - self.disconnected_at
+        self.max_blind_time = max(self.max_blind_time, self.last_blind_time)
+        self.total_blind_time += self.last_blind_time
+        self.disconnected_at = None
+        return True
+
+    def as_dict(self):
+        return {
+            "connects": self.connects,
+            "reconnects": self.reconnects,
+            "last_blind_time": self.last_blind_time,
+            "max_blind_time": self.max_blind_time,
+            "total_blind_time": self.total_blind_time,
+        }
+
+
+class FeedSupervisor:
+    """
+    Keeps one websocket feed connected. Takes the same on_open/on_message/on_error/on_close callbacks as
+    websocket.WebSocketApp, and registers every connection with the shared keepalive scheduler. Every received frame
+    is also passed to `recorder` (see bullish.recorder) when one is given.
+    """
+
+    def __init__(self, url, on_open=None, on_message=None, on_error=None, on_close=None, on_reconnect=None,
+                 cookie=None, keepalive_interval=5, backoff=None, recorder=None):
+        self.url = url
+        self.on_open = on_open
+        self.on_message = on_message
+        self.on_error = on_error
+        self.on_close = on_close
+        self.on_reconnect = on_reconnect
+        self.cookie = cookie
+        self.keepalive_interval = keepalive_interval
+        self.backoff = backoff or Backoff()
+        self.recorder = recorder
+        self.metrics = ReconnectMetrics()
+        self.conn = None
+        self._connected_once = False
+        self._receiving = False
+        self._stopped = threading.Event()
+
+    def _handle_open(self, conn):
+        self.metrics.on_connect()
+        if self.on_open:
+            self.on_open(conn)
+
+    def _handle_message(self, conn, message):
+        if self.recorder is not None:
+            self.recorder.record(self.url, message)
+        if not self._receiving:
+            self._receiving = True
+            self.backoff.reset()
+            if self.metrics.on_first_message():
+                print(f"Reconnected to {self.url}, blind for {self.metrics.last_blind_time:.3f}s")
+        if self.on_message:
+            self.on_message(conn, message)
+
+    def _handle_close(self, conn, close_status_code, close_msg):
+        HEARTBEATS.unregister(conn)
+        self.metrics.on_disconnect()
+        if self.on_close:
+            self.on_close(conn, close_status_code, close_msg)
+
+    def run_forever(self):
+        while not self._stopped.is_set():
+            if self._connected_once and self.on_reconnect:
+                self.on_reconnect()
+            self._connected_once = True
+            self._receiving = False
+            self.conn = websocket.WebSocketApp(self.url,
+                                               on_open=self._handle_open,
+                                               on_message=self._handle_message,
+                                               on_error=self.on_error,
+                                               on_close=self._handle_close,
+                                               cookie=self.cookie)
+            HEARTBEATS.register(self.conn, interval=self.keepalive_interval)
+            self.conn.run_forever()
+            HEARTBEATS.unregister(self.conn)
+            self.metrics.on_disconnect()
+            if self._stopped.is_set():
+                break
+            delay = self.backoff.next_delay()
+            print(f"Connection to {self.url} dropped, reconnecting in {delay:.2f}s")
+            self._stopped.wait(delay)
+
+    def start(self):
+        thread = threading.Thread(target=self.run_forever)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stopped.set()
+        if self.conn is not None:
+            self.conn.close()
@@ -0,0 +1,137 @@
+"""
+Columnar ring buffer for the trades feed, with rolling analytics.
+
+TradeBuffer stores the last `capacity` trades in fixed-size array.array columns (price, quantity, side, tradeId,
+timestamp) instead of a deque of message dicts. Prices and quantities are the fixed-point integers produced by
+bullish.fixed_point.MarketPrecision. Each column supports the buffer protocol, so `as_numpy()` returns NumPy views of
+the storage without copying.
+
+Every RollingWindow keeps trade count, volume, notional (for VWAP) and high/low over the last `seconds` of trade time,
+updated in amortised O(1) per trade: a trade is added once and evicted once, and high/low use monotonic deques.
+A window can only cover trades still held in the buffer, so size `capacity` for the longest window you need.
+"""
+from array import array
+from collections import deque
+
+SIDES = {"BUY": 1, "SELL": -1}
+
+
+class RollingWindow:
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.length_ms = int(seconds * 1000)
+        self.count = 0
+        self.volume = 0
+        self.notional = 0
+        self.tail = 0
+        self._highs = deque()
+        self._lows = deque()
+
+    def add(self, seq, price, quantity):
+        self.count += 1
+        self.volume += quantity
+        self.notional += price * quantity
+        highs = self._highs
+        while highs and highs[-1][1] <= price:
+            highs.pop()
+        highs.append((seq, price))
+        lows = self._lows
+        while lows and lows[-1][1] >= price:
+            lows.pop()
+        lows.append((seq, price))
+
+    def evict(self, seq, price, quantity):
+        """Remove the oldest trade in the window, which has sequence `seq`"""
+        self.count -= 1
+        self.volume -= quantity
+        self.notional -= price * quantity
+        self.tail = seq + 1
+        if self._highs[0][0] == seq:
+            self._highs.popleft()
+        if self._lows[0][0] == seq:
+            self._lows.popleft()
+
+    def high(self):
+        return self._highs[0][1] if self._highs else None
+
+    def low(self):
+        return self._lows[0][1] if self._lows else None
+
+    def vwap(self):
+        """Volume weighted average price in the same fixed-point scale as the prices, or None for an empty window"""
+        return self.notional // self.volume if self.volume else None
+
+    def as_dict(self):
+        return {
+            "seconds": self.seconds,
+            "count": self.count,
+            "volume": self.volume,
+            "vwap": self.vwap(),
+            "high": self.high(),
+            "low": self.low(),
+        }
+
+
+class TradeBuffer:
+
+    def __init__(self, capacity=100, windows=(60,)):
+        self.capacity = capacity
+        self.prices = array("q", bytes(8 * capacity))
+        self.quantities = array("q", bytes(8 * capacity))
+        self.sides = array("b", bytes(capacity))
+        self.trade_ids = array("q", bytes(8 * capacity))
+        self.timestamps = array("q", bytes(8 * capacity))
+        self.windows = {seconds: RollingWindow(seconds) for seconds in windows}
+        # total number of trades appended, trade n lives in slot n % capacity while n >= seq - capacity
+        self.seq = 0
+
+    def __len__(self):
+        return min(self.seq, self.capacity)
+
+    def append(self, price, quantity, side, trade_id, timestamp):
+        seq = self.seq
+        slot = seq % self.capacity
+        if seq >= self.capacity:
+            # the trade being overwritten has to leave every window that still holds it
+            for window in self.windows.values():
+                if window.tail <= seq - self.capacity:
+                    window.evict(seq - self.capacity, self.prices[slot], self.quantities[slot])
+        self.prices[slot] = price
+        self.quantities[slot] = quantity
+        self.sides[slot] = side
+        self.trade_ids[slot] = trade_id
+        self.timestamps[slot] = timestamp
+        self.seq = seq + 1
+        for window in self.windows.values():
+            window.add(seq, price, quantity)
+            cutoff = timestamp - window.length_ms
+            while window.tail < seq and self.timestamps[window.tail % self.capacity] <= cutoff:
+                tail_slot = window.tail % self.capacity
+                window.evict(window.tail, self.prices[tail_slot], self.quantities[tail_slot])
+
+    def append_trade(self, trade):
+        """Append a trade message whose price and quantity were decoded with MarketPrecision.parse_trade"""
+        self.append(trade["price"], trade["quantity"], SIDES[trade["side"]], int(trade["tradeId"]),
+                    int(trade["createdAtTimestamp"]))
+
+    def window(self, seconds):
+        return self.windows[seconds]
+
+    def latest(self):
+        """Slot index of the most recent trade, or None when empty"""
+        return (self.seq - 1) % self.capacity if self.seq else None
+
+    def as_numpy(self):
+        """
+        Zero-copy NumPy views of the columns. Slots are in ring order: once the buffer has wrapped, the oldest trade
+        is at index `seq % capacity`.
+        """
+        import numpy
+        return {
+            "price": numpy.frombuffer(self.prices, dtype=numpy.int64),
+            "quantity": numpy.frombuffer(self.quantities, dtype=numpy.int64),
+            "side": numpy.frombuffer(self.sides, dtype=numpy.int8),
+            "trade_id": numpy.frombuffer(self.trade_ids, dtype=numpy.int64),
+            "timestamp": numpy.frombuffer(self.timestamps, dtype=numpy.int64),
+        }
@@ -5,16 +5,17 @@ This script only makes read only requests and can be safely run in it's entirety
 environment variables as descried in README.md including generating a JWT token
 """
 import os
-import requests
 from dotenv import load_dotenv
 
+from bullish.rest import get_client
+
 load_dotenv()
 
 HOST_NAME = os.getenv("BX_API_HOSTNAME")
 PRIVATE_KEY = os.getenv("BX_PRIVATE_KEY")
 JWT_TOKEN = os.getenv("BX_JWT")
 
-session = requests.Session()
+session = get_client(HOST_NAME)
 headers = {
   "Content-type": "application/json",
   "Authorization" : "Bearer " + JWT_TOKEN
@@ -25,7 +26,7 @@ Transaction History
 """
 print( "/trading-api/v1/wallets/transactions", end="\n\n")
 
-transactionsResponse = requests.Session().get(
+transactionsResponse = session.get(
   HOST_NAME + "/trading-api/v1/wallets/transactions",
   headers = headers,
   verify=True
@@ -38,7 +39,7 @@ Deposit Instructions for crypto and fiat
 """
 print("/trading-api/v1/wallets/deposit-instructions/crypto/BTC", end="\n\n")
 
-response = requests.Session().get(
+response = session.get(
   HOST_NAME + "/trading-api/v1/wallets/deposit-instructions/crypto/BTC",
   headers = headers,
   verify=True
@@ -48,7 +49,7 @@ print(response.json(), end="\n\n\n")
 
 print("/trading-api/v1/wallets/deposit-instructions/fiat/USD", end="\n\n")
 
-response = requests.Session().get(
+response = session.get(
   HOST_NAME + "/trading-api/v1/wallets/deposit-instructions/fiat/USD",
   headers = headers,
   verify=True
@@ -61,7 +62,7 @@ Withdrawal Instructions for crypto and fiat
 """
 print("/trading-api/v1/wallets/withdrawal-instructions/crypto/BTC", end="\n\n")
 
-response = requests.Session().get(
+response = session.get(
   HOST_NAME + "/trading-api/v1/wallets/withdrawal-instructions/crypto/BTC",
   headers = headers,
   verify=True
@@ -71,7 +72,7 @@ print(response.json(), end="\n\n\n")
 
 print("/trading-api/v1/wallets/withdrawal-instructions/fiat/USD", end="\n\n")
 
-response = requests.Session().get(
+response = session.get(
   HOST_NAME + "/trading-api/v1/wallets/withdrawal-instructions/fiat/USD",
   headers = headers,
   verify=True
@@ -84,7 +85,7 @@ Limits for crypto and fiat
 """
 print("/trading-api/v1/wallets/limits/BTC", end="\n\n")
 
-response = requests.Session().get(
+response = session.get(
   HOST_NAME + "/trading-api/v1/wallets/limits/BTC",
   headers = headers,
   verify=True
@@ -94,10 +95,16 @@ print(response.json(), end="\n\n\n")
 
 print("/trading-api/v1/wallets/limits/USD", end="\n\n")
 
-response = requests.Session().get(
+response = session.get(
   HOST_NAME + "/trading-api/v1/wallets/limits/USD",
   headers = headers,
   verify=True
 )
 
-print(response.json(), end="\n\n\n")
\ No newline at end of file
+print(response.json(), end="\n\n\n")
+
+"""
+Connection reuse, all of the requests above share the connections of one pooled client
+"""
+stats = session.stats()
+print(f"requests={stats['requests']} reused={stats['reused']} connections opened={stats['connections']}")
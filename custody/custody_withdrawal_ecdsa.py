@@ -1,15 +1,12 @@
-import base64
-import json
 import os
 import time
 import uuid
-from hashlib import sha256
-import requests
-import hashlib
-from ecdsa import SigningKey
-from ecdsa.util import sigencode_der, sigdecode_der
 from dotenv import load_dotenv
 
+from bullish.canonical import canonical, signing_payload
+from bullish.rest import get_client
+from bullish.signing import ecdsa_signer
+
 load_dotenv()
 
 HOST_NAME = os.getenv("BX_API_HOSTNAME")
@@ -34,7 +31,7 @@ scngA998+4fOr9ISC8DCrHqH342hRANCAATeifjZzOSBst+huFmcc7DZy9Es/D6i
 """
 session and headers are consistent for all calls in this file
 """
-session = requests.Session()
+session = get_client(HOST_NAME)
 headers = {
   "Content-type": "application/json",
   "Authorization" : "Bearer " + JWT_TOKEN
@@ -122,24 +119,23 @@ withdraw_payload = {
     }
 }
 
+withdraw_body = canonical(withdraw_payload)
+
 # Create string for signing
-withdraw_payload_str = str((json.dumps(withdraw_payload, separators=(",", ":"))).encode("utf-8"), 'utf-8')
-signature_payload=f"""{timestamp}{nonce}POST/trading-api/v1/wallets/withdrawal{withdraw_payload_str}"""
-signature_payload_bytes = bytes(signature_payload, 'utf-8')
+signature_payload_bytes = signing_payload(timestamp, nonce, "POST", "/trading-api/v1/wallets/withdrawal", withdraw_body)
 
 # Decode the PEM-encoded private key
-private_key = SigningKey.from_pem(private_key_pem)
+signer = ecdsa_signer(private_key_pem)
 
 # Sign string with private key and encode it with BASE64
-signature = private_key.sign(signature_payload_bytes, hashfunc=hashlib.sha256, sigencode=sigencode_der)
-signature_base64 = base64.b64encode(signature).decode()
+signature_base64 = signer.sign(signature_payload_bytes)
 
 headers["BX-SIGNATURE"] = signature_base64
 
 withdraw_response = session.post(
     HOST_NAME + "/trading-api/v1/wallets/withdrawal",
     headers = headers,
-    json=withdraw_payload,
+    data=withdraw_body,
     verify=True
 )
 
@@ -1,14 +1,13 @@
-import base64
 from datetime import timezone
-from hashlib import sha256
 
-import json
 import os
-import requests
 import urllib3
 from dotenv import load_dotenv
-from ecdsa import SigningKey
-from ecdsa.util import sigencode_der
+
+from bullish.canonical import canonical, signing_payload
+from bullish.nonce import NonceAllocator
+from bullish.rest import get_client
+from bullish.signing import ecdsa_signer
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
@@ -37,12 +36,11 @@ vjW5Zm6UvsoN8cQbc+3mElZKwHBfs5vi+9h9JOBcRD9NF8Fz+Oa17yKV
 """
 
 # Decode the PEM-encoded private key
-PRIVATE_KEY = SigningKey.from_pem(private_key_pem)
+SIGNER = ecdsa_signer(private_key_pem)
 
-session = requests.Session()
-response = session.get(HOST_NAME + "/trading-api/v1/nonce", verify=False)
-nonce = json.loads(response.text)["lowerBound"]
-next_nonce = str(int(datetime.now(timezone.utc).timestamp() * 1_000_000))
+session = get_client(HOST_NAME)
+NONCES = NonceAllocator.sync(session, HOST_NAME, path=os.getenv("BX_NONCE_FILE"))
+next_nonce = str(NONCES.next())
 timestamp = str(int(datetime.now(timezone.utc).timestamp() * 1000))
 
 body = {
@@ -56,10 +54,9 @@ body = {
     "tradingAccountId": TRADING_ACCOUNT_ID,
 }
 
-body_string = json.dumps(body, separators=(",", ":"))
-payload = (timestamp + next_nonce + "POST" + URI + body_string).encode("utf-8")
-signature = PRIVATE_KEY.sign(payload, hashfunc=sha256, sigencode=sigencode_der)
-signature = base64.b64encode(signature).decode()
+body_bytes = canonical(body)
+payload = signing_payload(timestamp, next_nonce, "POST", URI, body_bytes)
+signature = SIGNER.sign(payload)
 
 headers = {
     "Content-type": "application/json",
@@ -71,6 +68,6 @@ headers = {
 }
 
 response = session.post(
-    HOST_NAME + URI, data=body_string, headers=headers
+    HOST_NAME + URI, data=body_bytes, headers=headers
 )
 logging.info(f"http_status={response.status_code} body={response.text}")
@@ -1,13 +1,14 @@
-import hmac
-import json
 import os
-import requests
 from datetime import timezone
-from hashlib import sha256
 
 import urllib3
 from dotenv import load_dotenv
 
+from bullish.canonical import canonical
+from bullish.nonce import NonceAllocator
+from bullish.rest import get_client
+from bullish.signing import HmacSigner
+
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 load_dotenv()
@@ -25,11 +26,11 @@ JWT_TOKEN = os.getenv("BX_JWT")
 TRADING_ACCOUNT_ID = os.getenv("BX_TRADING_ACCOUNT_ID")
 RATELIMIT_TOKEN = os.getenv("BX_RATELIMIT_TOKEN")
 URI = "/trading-api/v2/orders"
+SIGNER = HmacSigner(SECRET_KEY)
 
-session = requests.Session()
-response = session.get(HOST_NAME + "/trading-api/v1/nonce", verify=False)
-nonce = json.loads(response.text)["lowerBound"]
-next_nonce = str(int(datetime.now(timezone.utc).timestamp() * 1_000_000))
+session = get_client(HOST_NAME)
+NONCES = NonceAllocator.sync(session, HOST_NAME, path=os.getenv("BX_NONCE_FILE"))
+next_nonce = str(NONCES.next())
 timestamp = str(int(datetime.now(timezone.utc).timestamp() * 1000))
 
 body = {
@@ -45,10 +46,8 @@ body = {
     "tradingAccountId": TRADING_ACCOUNT_ID,
 }
 
-body_string = json.dumps(body, separators=(",", ":"))
-payload = timestamp + next_nonce + "POST" + URI + body_string
-digest = sha256(payload.encode("utf-8")).hexdigest().encode('utf-8')
-signature = hmac.new(SECRET_KEY, digest, sha256).hexdigest()
+body_bytes = canonical(body)
+signature = SIGNER.sign(timestamp, next_nonce, "POST", URI, body_bytes)
 
 headers = {
     "Content-type": "application/json",
@@ -60,6 +59,6 @@ headers = {
 }
 
 response = session.post(
-    HOST_NAME + URI, data=body_string, headers=headers
+    HOST_NAME + URI, data=body_bytes, headers=headers
 )
 logging.info(f"http_status={response.status_code} body={response.text}")
@@ -0,0 +1,46 @@
+import asyncio
+import os
+
+from dotenv import load_dotenv
+
+from bullish import ratelimit
+from bullish.aio_rest import AsyncRestClient
+from bullish.canonical import V3_CREATE_ORDER
+from bullish.nonce import NonceAllocator
+from bullish.rest import get_client
+from bullish.signing import HmacSigner
+
+load_dotenv()
+import logging
+import sys
+logging.basicConfig(level=logging.INFO,
+                    format='[%(asctime)s | %(levelname)-4s | %(threadName)s] %(message)s',
+                    datefmt='%Y-%m-%d %H:%M:%S',
+                    handlers=[logging.StreamHandler(sys.stdout)])
+
+HOST_NAME = os.getenv("BX_API_HOSTNAME")
+SECRET_KEY = bytes(os.getenv("BX_SECRET_KEY"), 'utf-8')
+JWT_TOKEN = os.getenv("BX_JWT")
+TRADING_ACCOUNT_ID = os.getenv("BX_TRADING_ACCOUNT_ID")
+RATELIMIT_TOKEN = os.getenv("BX_RATELIMIT_TOKEN")
+SIGNER = HmacSigner(SECRET_KEY)
+NONCES = NonceAllocator.sync(get_client(HOST_NAME), HOST_NAME, path=os.getenv("BX_NONCE_FILE"))
+
+# a ladder of SELL orders, all sent at once over a few pooled connections
+ETHUSDC_LIMIT = V3_CREATE_ORDER.bind(symbol="ETHUSDC", type="LIMIT", side="SELL", quantity="1.123", timeInForce="GTC",
+                                     allowBorrow=False, tradingAccountId=TRADING_ACCOUNT_ID)
+PRICES = ["1432.6", "1433.6", "1434.6", "1435.6", "1436.6"]
+
+
+async def create_orders(client):
+    bodies = [ETHUSDC_LIMIT.render(price=price, clientOrderId=str(NONCES.next())) for price in PRICES]
+    responses = await asyncio.gather(*(client.create_order(body) for body in bodies))
+    for price, response in zip(PRICES, responses):
+        logging.info(f"price={price} http_status={response.status} body={response.text}")
+
+
+# paced by BX-RATELIMIT-TOKEN and endpoint when BX_RATELIMIT_RATE is set
+RATE_LIMITER = ratelimit.RateLimiter(ratelimit.RATE) if ratelimit.RATE else None
+
+AsyncRestClient(HOST_NAME, SIGNER, JWT_TOKEN, nonces=NONCES, ratelimit_token=RATELIMIT_TOKEN, max_connections=4,
+                rate_limiter=RATE_LIMITER).run(create_orders)
@@ -1,13 +1,15 @@
-import hmac
 import json
 import logging
 import os
-import requests
 import sys
 from datetime import datetime
 from datetime import timezone
 from dotenv import load_dotenv
-from hashlib import sha256
+
+from bullish.canonical import canonical
+from bullish.nonce import NonceAllocator
+from bullish.rest import get_client
+from bullish.signing import HmacSigner
 
 load_dotenv()
 logging.basicConfig(level=logging.INFO,
@@ -20,11 +22,11 @@ SECRET_KEY = bytes(os.getenv("BX_SECRET_KEY"), 'utf-8')
 JWT_TOKEN = os.getenv("BX_JWT")
 TRADING_ACCOUNT_ID = os.getenv("BX_TRADING_ACCOUNT_ID")
 PATH = "/trading-api/v2/otc-command"
+SIGNER = HmacSigner(SECRET_KEY)
 
-session = requests.Session()
-response = session.get(HOST_NAME + "/trading-api/v1/nonce", verify=False)
-nonce = json.loads(response.text)["lowerBound"]
-next_nonce = str(int(datetime.now(timezone.utc).timestamp() * 1_000_000))
+session = get_client(HOST_NAME)
+NONCES = NonceAllocator.sync(session, HOST_NAME, path=os.getenv("BX_NONCE_FILE"))
+next_nonce = str(NONCES.next())
 timestamp = str(int(datetime.now(timezone.utc).timestamp() * 1000))
 
 body = {
@@ -33,10 +35,8 @@ body = {
     "otcTradeId": "200000000000000281"
 }
 
-body_string = json.dumps(body, separators=(",", ":"))
-payload = (timestamp + next_nonce + "POST" + PATH + body_string.replace(" ", "")).encode("utf-8")
-digest = sha256(payload).hexdigest().encode('utf-8')
-signature = hmac.new(SECRET_KEY, digest, sha256).hexdigest()
+body_bytes = canonical(body)
+signature = SIGNER.sign(timestamp, next_nonce, "POST", PATH, body_bytes.replace(b" ", b""))
 
 headers = {
     "Content-type": "application/json",
@@ -51,7 +51,7 @@ logging.info(f"body=\n{json.dumps(body, indent=2)}")
 
 url = HOST_NAME + PATH
 response = session.post(
-    url, data=body_string, headers=headers
+    url, data=body_bytes, headers=headers
 )
 formatted_response = json.dumps(json.loads(response.text), indent=2)
 logging.info(f"http_status={response.status_code} body=\n{formatted_response}")
@@ -1,15 +1,15 @@
-import base64
 import json
 import logging
 import os
-import requests
 import sys
 from datetime import datetime
 from datetime import timezone
 from dotenv import load_dotenv
-from ecdsa import SigningKey
-from ecdsa.util import sigencode_der
-from hashlib import sha256
+
+from bullish.canonical import canonical, signing_payload
+from bullish.nonce import NonceAllocator
+from bullish.rest import get_client
+from bullish.signing import ecdsa_signer
 
 load_dotenv()
 logging.basicConfig(level=logging.INFO,
@@ -24,12 +24,11 @@ PRIVATE_KEY_PEM = os.getenv("PRIVATE_KEY_PEM")
 PATH = "/trading-api/v2/otc-trades"
 
 # Decode the PEM-encoded private key
-PRIVATE_KEY = SigningKey.from_pem(PRIVATE_KEY_PEM)
+SIGNER = ecdsa_signer(PRIVATE_KEY_PEM)
 
-session = requests.Session()
-response = session.get(HOST_NAME + "/trading-api/v1/nonce", verify=False)
-nonce = json.loads(response.text)["lowerBound"]
-next_nonce = str(int(datetime.now(timezone.utc).timestamp() * 1_000_000))
+session = get_client(HOST_NAME)
+NONCES = NonceAllocator.sync(session, HOST_NAME, path=os.getenv("BX_NONCE_FILE"))
+next_nonce = str(NONCES.next())
 timestamp = str(int(datetime.now(timezone.utc).timestamp() * 1000))
 
 body = {
@@ -59,11 +58,10 @@ body = {
     ]
 }
 
-body_string = json.dumps(body, separators=(",", ":"))
+body_bytes = canonical(body)
 # the extra replace() call is because remarks field can contain spaces
-payload = (timestamp + next_nonce + "POST" + PATH + body_string.replace(" ", "")).encode("utf-8")
-signature = PRIVATE_KEY.sign(payload, hashfunc=sha256, sigencode=sigencode_der)
-signature = base64.b64encode(signature).decode()
+payload = signing_payload(timestamp, next_nonce, "POST", PATH, body_bytes.replace(b" ", b""))
+signature = SIGNER.sign(payload)
 
 headers = {
     "Content-type": "application/json",
@@ -78,7 +76,7 @@ logging.info(f"body=\n{json.dumps(body, indent=2)}")
 
 url = HOST_NAME + PATH
 response = session.post(
-    url, data=body_string, headers=headers
+    url, data=body_bytes, headers=headers
 )
 formatted_response = json.dumps(json.loads(response.text), indent=2)
 logging.info(f"http_status={response.status_code} body=\n{formatted_response}")
\ No newline at end of file
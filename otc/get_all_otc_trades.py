@@ -1,10 +1,11 @@
 import json
 import logging
 import os
-import requests
 import sys
 from dotenv import load_dotenv
 
+from bullish.rest import get_client
+
 load_dotenv()
 logging.basicConfig(level=logging.INFO,
                     format='[%(asctime)s | %(levelname)-4s | %(threadName)s] %(message)s',
@@ -16,7 +17,7 @@ JWT_TOKEN = os.getenv("BX_JWT")
 TRADING_ACCOUNT_ID = os.getenv("BX_TRADING_ACCOUNT_ID")
 PATH = "/trading-api/v2/otc-trades" + "?tradingAccountId=" + TRADING_ACCOUNT_ID
 
-session = requests.Session()
+session = get_client()
 
 headers = {
     "Content-type": "application/json",
@@ -1,10 +1,11 @@
 import json
 import logging
 import os
-import requests
 import sys
 from dotenv import load_dotenv
 
+from bullish.rest import get_client
+
 load_dotenv()
 logging.basicConfig(level=logging.INFO,
                     format='[%(asctime)s | %(levelname)-4s | %(threadName)s] %(message)s',
@@ -17,7 +18,7 @@ TRADING_ACCOUNT_ID = os.getenv("BX_TRADING_ACCOUNT_ID")
 OTC_TRADE_ID = "4472891243135527018"
 PATH = "/trading-api/v2/otc-trades/" + OTC_TRADE_ID + "/" + "?tradingAccountId=" + TRADING_ACCOUNT_ID
 
-session = requests.Session()
+session = get_client()
 
 headers = {
     "Content-type": "application/json",
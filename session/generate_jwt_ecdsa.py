@@ -2,13 +2,11 @@ import base64
 import json
 import os
 from datetime import datetime, timezone
-from hashlib import sha256
-import requests
-import hashlib
-from ecdsa import SigningKey
-from ecdsa.util import sigencode_der, sigdecode_der
 from dotenv import load_dotenv
 
+from bullish.rest import get_client
+from bullish.signing import ecdsa_signer
+
 load_dotenv()
 
 HOST_NAME = os.getenv("BX_API_HOSTNAME")
@@ -30,9 +28,9 @@ scngA998+4fOr9ISC8DCrHqH342hRANCAATeifjZzOSBst+huFmcc7DZy9Es/D6i
 """
 
 # Decode the PEM-encoded private key
-private_key = SigningKey.from_pem(private_key_pem)
+signer = ecdsa_signer(private_key_pem)
 
-session = requests.Session()
+session = get_client()
 metadata = base64.b64decode(ENCODED_METADATA)
 user_id = str(json.loads(metadata)["userId"])
 
@@ -47,8 +45,7 @@ login_payload = {
 }
 
 payload = (json.dumps(login_payload, separators=(",", ":"))).encode("utf-8")
-signature = private_key.sign(payload, hashfunc=hashlib.sha256, sigencode=sigencode_der)
-signature_base64 = base64.b64encode(signature).decode()
+signature_base64 = signer.sign(payload)
 
 headers = {
     "Content-type": "application/json",
@@ -1,7 +1,9 @@
-import hmac, requests, os
+import os
 from datetime import datetime, timezone
 from dotenv import load_dotenv
-from hashlib import sha256
+
+from bullish.rest import get_client
+from bullish.signing import HmacSigner
 
 load_dotenv()
 
@@ -9,12 +11,11 @@ HOST_NAME = os.getenv("BX_API_HOSTNAME")
 PUBLIC_KEY = os.getenv("BX_PUBLIC_KEY")
 SECRET_KEY = bytes(os.getenv("BX_SECRET_KEY"), 'utf-8')
 
-session = requests.Session()
+session = get_client(HOST_NAME)
 nonce = int(datetime.now(timezone.utc).timestamp())
 ts = str(int(datetime.now(timezone.utc).timestamp() * 1000))
 path = "/trading-api/v1/users/hmac/login"
-message = ts + str(nonce) + "GET" + "/trading-api/v1/users/hmac/login"
-signature = hmac.new(SECRET_KEY, message.encode("utf-8"), sha256).hexdigest()
+signature = HmacSigner(SECRET_KEY).sign_login(ts, str(nonce), path)
 
 headers = {
     'BX-PUBLIC-KEY': PUBLIC_KEY,
@@ -1,8 +1,9 @@
 import os
 
-import requests
 from dotenv import load_dotenv
 
+from bullish.rest import get_client
+
 load_dotenv()
 
 
@@ -10,7 +11,7 @@ HOST_NAME = os.getenv("BX_API_HOSTNAME")
 JWT_TOKEN = os.getenv("BX_JWT")
 
 
-session = requests.Session()
+session = get_client(HOST_NAME)
 
 
 headers = {
@@ -3,15 +3,16 @@ import json
 import os
 from datetime import datetime, timezone
 from hashlib import sha256
-import requests
 from eosio_signer import EOSIOKey
 from dotenv import load_dotenv
 
+from bullish.rest import get_client
+
 load_dotenv()
 
 HOST_NAME = os.getenv("BX_API_HOSTNAME")
 JWT_TOKEN = os.getenv("BX_JWT")
-session = requests.Session()
+session = get_client()
 
 headers = {
     "Content-type": "application/json",
@@ -0,0 +1,37 @@
+import os
+
+from dotenv import load_dotenv
+
+from bullish.aio_websocket import FeedClient, ORDERBOOK_PATH, PRIVATE_DATA_PATH, TICK_PATH, TRADES_PATH
+
+load_dotenv()
+
+HOST_NAME = os.getenv("BX_WS_API_HOSTNAME")
+JWT_TOKEN = os.getenv("BX_JWT")
+TRADING_ACCOUNT_ID = os.getenv("BX_TRADING_ACCOUNT_ID")
+COOKIE = f"JWT_COOKIE={JWT_TOKEN}"
+
+## ALL OF THE FEEDS BELOW RUN ON ONE ASYNCIO EVENT LOOP, INSTEAD OF ONE THREAD PER CONNECTION
+ORDERBOOKS = [
+    {"topic": "l1Orderbook", "symbol": "BTCUSDC"},
+    {"topic": "l2Orderbook", "symbol": "BTCUSDC"},
+    {"topic": "l2Orderbook", "symbol": "ETHUSDC"},
+]
+
+TICKS = [
+    {"topic": "tick", "symbol": "BTCUSDC"},
+    {"topic": "tick", "symbol": "ETHUSDC"},
+]
+
+
+def on_message(conn, message):
+    print(f"Received message from {conn.url}: {message}")
+
+
+feeds = FeedClient(HOST_NAME)
+feeds.add(ORDERBOOK_PATH, on_message, subscriptions=ORDERBOOKS, keepalive_interval=300)
+feeds.add(TICK_PATH, on_message, subscriptions=TICKS, keepalive_interval=300)
+feeds.add(TRADES_PATH.format(symbol="BTCUSDC"), on_message)
+private_data_path = PRIVATE_DATA_PATH if TRADING_ACCOUNT_ID is None else f"{PRIVATE_DATA_PATH}?tradingAccountId={TRADING_ACCOUNT_ID}"
+feeds.add(private_data_path, on_message, subscriptions=[{"topic": "spotAccounts"}], cookie=COOKIE)
+feeds.run_forever()
@@ -1,14 +1,22 @@
-import json
 import os
-import threading
-import time
 
-import websocket
 from dotenv import load_dotenv
 
+from bullish.dispatch import Dispatcher, get_codec
+from bullish.fixed_point import MarketPrecision
+from bullish.orderbook import OrderBookManager
+from bullish.recorder import FeedRecorder
+from bullish.rest import get_client
+from bullish.subscriptions import SubscriptionManager
+from bullish.supervisor import FeedSupervisor
+
 load_dotenv()
 
+API_HOST_NAME = os.getenv("BX_API_HOSTNAME")
 HOST_NAME = os.getenv("BX_WS_API_HOSTNAME")
+# Set BX_RECORD_DIR to record every received frame, see bullish/recorder.py
+RECORD_DIR = os.getenv("BX_RECORD_DIR")
+RECORDER = FeedRecorder(RECORD_DIR) if RECORD_DIR else None
 
 ## FOR EXAMPLE, WE ARE INTERESTED IN THE FOLLOWING ORDERBOOKS
 btcusdc_l1 = {
@@ -28,79 +36,61 @@ ethusdc_l2 = {
 
 SUPSCRIPTIONS = [btcusdc_l1, btcusdc_l2, ethusdc_l2]
 
-# Global variable to store the keepalive timer
-keepalive_timer = None
-
-def send_keepalive(conn):
-    """Send a keepAlive message to maintain the WebSocket connection"""
-    global keepalive_timer
-    
-    if conn.sock and conn.sock.connected:
-        keepalive_message = {
-            "jsonrpc": "2.0",
-            "type": "command",
-            "method": "keepalivePing",
-            "id": get_id()
-        }
-        
-        print("Sending keepAlive message")
-        conn.send(json.dumps(keepalive_message))
-        
-        # Schedule the next keepalive. Every 300 (5 minutes)
-        keepalive_timer = threading.Timer(300, send_keepalive, [conn])
-        keepalive_timer.daemon = True
-        keepalive_timer.start()
+# Subscribes are paced from a background thread and matched to their acks, failed ones are retried
+SUBSCRIPTION_MANAGER = SubscriptionManager(SUPSCRIPTIONS, rate=50)
 
 def on_open(conn):
-    time.sleep(1)
     for sub in SUPSCRIPTIONS:
-        topic = sub["topic"]
-        symbol = sub["symbol"]
-
-        # We need to send a subscribe message to the websocket for each topic and symbol we want
-        subscribe_message = {
-            "jsonrpc": "2.0",
-            "type": "command",
-            "method": "subscribe",
-            "params": {
-                "topic": topic,
-                "symbol": symbol
-            },
-            "id": get_id()
-        }
-
-        print(f"Subscribing to topic:{topic} for symbol:{symbol}")
-        conn.send(json.dumps(subscribe_message))
-        
-    # Start the keepalive timer (5 minutes = 300 seconds)
-    send_keepalive(conn)
-
-def get_id():
-    return str(int(time.time() * 1000))
+        print(f"Subscribing to topic:{sub['topic']} for symbol:{sub['symbol']}")
+    SUBSCRIPTION_MANAGER.start(conn)
+
+# One book per topic and symbol, kept current from the messages below. Strategies can read any symbol's BBO or depth
+# with ORDER_BOOKS.bbo(symbol) / ORDER_BOOKS.depth(symbol, levels) instead of parsing the raw messages.
+MARKETS = get_client().get(API_HOST_NAME + "/trading-api/v1/markets").json()
+ORDER_BOOKS = OrderBookManager({market["symbol"]: MarketPrecision.from_market(market) for market in MARKETS})
+
+def on_book_message(message):
+    book = ORDER_BOOKS.on_message(message)
+    if book is None:
+        print(f"Received message: {message}")
+        return
+    best_bid, best_ask = ORDER_BOOKS.bbo(book.symbol)
+    print(f"{book.symbol} bid={format_level(book, best_bid)} ask={format_level(book, best_ask)}")
+
+def format_level(book, level):
+    if level is None:
+        return "-"
+    price, quantity = level
+    return f"{book.precision.format_quantity(quantity)}@{book.precision.format_price(price)}"
+
+# Frames are routed on their type/symbol before being decoded, frames for other symbols are never parsed
+DISPATCHER = Dispatcher(codec=get_codec())
+DISPATCHER.on_response(SUBSCRIPTION_MANAGER.on_message)
+for symbol in {sub["symbol"] for sub in SUPSCRIPTIONS}:
+    DISPATCHER.subscribe(on_book_message, symbol=symbol)
 
 def on_message(conn, message):
-    print(f"Received message: {message}")
+    DISPATCHER.dispatch(message)
+
+def on_reconnect():
+    # the new connection sends fresh snapshots for every subscription
+    ORDER_BOOKS.clear()
 
 def on_error(conn, message):
     print(f"Received error: {message}")
 
 def on_close(conn, close_status_code, close_msg):
-    global keepalive_timer
     print(f"Closed connection to {conn.url}. close_status_code={close_status_code}, close_msg={close_msg}")
-    
-    # Cancel the keepalive timer if it exists
-    if keepalive_timer:
-        keepalive_timer.cancel()
-        keepalive_timer = None
-
-def open_connection():
-    ws_conn = websocket.WebSocketApp(HOST_NAME + "/trading-api/v1/market-data/orderbook",
-                                     on_open=on_open,
-                                     on_message=on_message,
-                                     on_error=on_error,
-                                     on_close=on_close)
-    ws_conn.run_forever()
-
-
-wst = threading.Thread(target=open_connection)
-wst.start()
+    SUBSCRIPTION_MANAGER.stop()
+    print(f"Reconnect stats: {SUPERVISOR.metrics.as_dict()}")
+
+# Reconnects with a jittered exponential backoff when the connection drops
+SUPERVISOR = FeedSupervisor(HOST_NAME + "/trading-api/v1/market-data/orderbook",
+                            on_open=on_open,
+                            on_message=on_message,
+                            on_error=on_error,
+                            on_close=on_close,
+                            on_reconnect=on_reconnect,
+                            recorder=RECORDER,
+                            keepalive_interval=300)
+SUPERVISOR.start()
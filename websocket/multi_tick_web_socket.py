@@ -1,96 +1,83 @@
-import json
+import multiprocessing
 import os
-import requests
 import threading
-import time
 
-import websocket
 from dotenv import load_dotenv
 
+from bullish.dispatch import Dispatcher, get_codec
+from bullish.recorder import FeedRecorder
+from bullish.rest import get_client
+from bullish.sharding import ShardRates, partition
+from bullish.subscriptions import SubscriptionManager
+from bullish.supervisor import FeedSupervisor
+
 load_dotenv()
 
 API_HOST_NAME = os.getenv("BX_API_HOSTNAME")
 WSS_HOST_NAME = os.getenv("BX_WS_API_HOSTNAME")
-
-# Global variable to store the keepalive timer
-keepalive_timer = None
-
-def send_keepalive(conn):
-    """Send a keepAlive message to maintain the WebSocket connection"""
-    global keepalive_timer
-    
-    if conn.sock and conn.sock.connected:
-        keepalive_message = {
-            "jsonrpc": "2.0",
-            "type": "command",
-            "method": "keepalivePing",
-            "id": get_id()
-        }
-        
-        print("Sending keepAlive message")
-        conn.send(json.dumps(keepalive_message))
-        
-        # Schedule the next keepalive. Every 300 (5 minutes)
-        keepalive_timer = threading.Timer(300, send_keepalive, [conn])
-        keepalive_timer.daemon = True
-        keepalive_timer.start()
+# Set BX_RECORD_DIR to record every received frame, see bullish/recorder.py. Shard processes record to a
+# subdirectory each.
+RECORD_DIR = os.getenv("BX_RECORD_DIR")
+RECORDER = None
+
+# Spread the tick subscriptions over this many connections. With BX_TICK_SHARD_PROCESSES=true every shard runs in its
+# own worker process, so tick handling scales with the number of cores.
+SHARDS = int(os.getenv("BX_TICK_SHARDS", "1"))
+USE_PROCESSES = os.getenv("BX_TICK_SHARD_PROCESSES", "false").lower() == "true"
+RATES = ShardRates(SHARDS)
+SUBSCRIBE_RATE = int(os.getenv("BX_SUBSCRIBE_RATE", "50"))
 
 def get_markets():
-    response = requests.get(API_HOST_NAME + "/trading-api/v1/markets?marketType=SPOT")
+    response = get_client().get(API_HOST_NAME + "/trading-api/v1/markets?marketType=SPOT")
     return response.json()
 
-def on_open(conn):
-    print("Subscribing to spot markets")
-    markets = get_markets()
-    time.sleep(1)
-    for market in markets:
-        topic = 'tick'
-        symbol = market.get('symbol')
-
-        # We need to send a subscribe message to the websocket for each topic and symbol we want
-        subscribe_message = {
-            "jsonrpc": "2.0",
-            "type": "command",
-            "method": "subscribe",
-            "params": {
-                "topic": topic,
-                "symbol": symbol
-            },
-            "id": get_id()
-        }
-
-        print(f"Subscribing to topic:{topic} for symbol:{symbol}")
-        conn.send(json.dumps(subscribe_message))
-        
-    # Start the keepalive timer (5 minutes = 300 seconds)
-    send_keepalive(conn)
-
-def get_id():
-    return str(int(time.time() * 1000))
-
-def on_message(conn, message):
-    print(f"Received message: {message}")
+def on_tick(message, shard):
+    RATES.mark(shard)
+    print(f"Received message on shard {shard}: {message}")
 
 def on_error(conn, message):
     print(f"Received error: {message}")
 
-def on_close(conn, close_status_code, close_msg):
-    global keepalive_timer
+def on_close(conn, close_status_code, close_msg, subscriptions):
     print(f"Closed connection to {conn.url}. close_status_code={close_status_code}, close_msg={close_msg}")
-    
-    # Cancel the keepalive timer if it exists
-    if keepalive_timer:
-        keepalive_timer.cancel()
-        keepalive_timer = None
-
-def open_connection():
-    ws_conn = websocket.WebSocketApp(WSS_HOST_NAME + "/trading-api/v1/market-data/tick",
-                                     on_open=on_open,
-                                     on_message=on_message,
-                                     on_error=on_error,
-                                     on_close=on_close)
-    ws_conn.run_forever()
-
-
-wst = threading.Thread(target=open_connection)
-wst.start()
+    subscriptions.stop()
+
+def open_connection(shard, symbols):
+    # Subscribes are paced from a background thread and matched to their acks, failed ones are retried
+    subscriptions = SubscriptionManager([{"topic": "tick", "symbol": symbol} for symbol in symbols], rate=SUBSCRIBE_RATE)
+    print(f"Subscribing to {len(symbols)} spot markets on shard {shard}")
+    # Subscribe acks go to the subscription manager, everything else to on_tick, each frame is decoded once
+    dispatcher = Dispatcher(codec=get_codec())
+    dispatcher.on_response(subscriptions.on_message)
+    dispatcher.subscribe(lambda message: on_tick(message, shard))
+    # Reconnects with a jittered exponential backoff when the connection drops, on_open subscribes again
+    supervisor = FeedSupervisor(WSS_HOST_NAME + "/trading-api/v1/market-data/tick",
+                                on_open=subscriptions.start,
+                                on_message=lambda conn, message: dispatcher.dispatch(message),
+                                on_error=on_error,
+                                on_close=lambda conn, code, msg: on_close(conn, code, msg, subscriptions),
+                                recorder=RECORDER,
+                                keepalive_interval=300)
+    supervisor.run_forever()
+
+def run_shard_process(shard, symbols):
+    global RECORDER
+    if RECORD_DIR:
+        RECORDER = FeedRecorder(os.path.join(RECORD_DIR, f"shard-{shard}"))
+    RATES.report_every(10, shards=[shard])
+    open_connection(shard, symbols)
+
+
+if __name__ == "__main__":
+    if RECORD_DIR and not USE_PROCESSES:
+        RECORDER = FeedRecorder(RECORD_DIR)
+    symbols = [market.get('symbol') for market in get_markets()]
+    for shard, shard_symbols in enumerate(partition(symbols, SHARDS)):
+        if not shard_symbols:
+            continue
+        if USE_PROCESSES:
+            multiprocessing.Process(target=run_shard_process, args=(shard, shard_symbols)).start()
+        else:
+            threading.Thread(target=open_connection, args=(shard, shard_symbols)).start()
+    if not USE_PROCESSES:
+        RATES.report_every(10)
@@ -1,12 +1,12 @@
 import json
 import os
 import ssl
-import threading
 import time
 
-import websocket
 from dotenv import load_dotenv
 
+from bullish.supervisor import FeedSupervisor
+
 load_dotenv()
 
 HOST_NAME = os.getenv("BX_WS_API_HOSTNAME")
@@ -19,18 +19,6 @@ def get_id():
     return str(int(time.time() * 1000))
 
 
-def ping(conn):
-    ping_message = {
-        "jsonrpc": "2.0",
-        "type": "command",
-        "method": "keepalivePing",
-        "params": {},
-        "id": get_id()
-    }
-    conn.send(json.dumps(ping_message))
-    threading.Timer(interval=5, function=ping, args=(conn,)).start()
-
-
 def on_message(conn, message):
     print(f"Received message: {message}")
 
@@ -41,6 +29,7 @@ def on_error(conn, message):
 
 def on_close(conn, close_status_code, close_msg):
     print(f"Closed connection to {conn.url}. close_status_code={close_status_code}, close_msg={close_msg}")
+    print(f"Reconnect stats: {SUPERVISOR.metrics.as_dict()}")
 
 
 def on_open(conn):
@@ -57,17 +46,13 @@ def on_open(conn):
     conn.send(json.dumps(subscribe_message))
 
 
-def open_connection():
-    url = f"{HOST_NAME}/trading-api/v1/private-data?tradingAccountId={TRADING_ACCOUNT_ID}" if TRADING_ACCOUNT_ID is not None else f"{HOST_NAME}/trading-api/v1/private-data"
-    ws_conn = websocket.WebSocketApp(url,
-                                     on_open=on_open,
-                                     on_message=on_message,
-                                     on_error=on_error,
-                                     on_close=on_close,
-                                     cookie=COOKIE)
-    threading.Timer(interval=5, function=ping, args=(ws_conn,)).start()
-    ws_conn.run_forever()
-
-
-wst = threading.Thread(target=open_connection)
-wst.start()
+URL = f"{HOST_NAME}/trading-api/v1/private-data?tradingAccountId={TRADING_ACCOUNT_ID}" if TRADING_ACCOUNT_ID is not None else f"{HOST_NAME}/trading-api/v1/private-data"
+# Reconnects with a jittered exponential backoff when the connection drops, on_open subscribes again
+SUPERVISOR = FeedSupervisor(URL,
+                            on_open=on_open,
+                            on_message=on_message,
+                            on_error=on_error,
+                            on_close=on_close,
+                            cookie=COOKIE,
+                            keepalive_interval=5)
+SUPERVISOR.start()
@@ -1,73 +1,108 @@
 import json
 import os
-import threading
-import time
-from collections import deque
-import websocket
 from dotenv import load_dotenv
 
+from bullish.candles import CandleAggregator
+from bullish.fixed_point import MarketPrecision
+from bullish.recorder import FeedRecorder
+from bullish.rest import get_client
+from bullish.sequence import SequenceTracker
+from bullish.supervisor import FeedSupervisor
+from bullish.trades import TradeBuffer
+
 load_dotenv()
 
+API_HOST_NAME = os.getenv("BX_API_HOSTNAME")
 WS_HOST_NAME = os.getenv("BX_WS_API_HOSTNAME")
+# Set BX_RECORD_DIR to record every received frame, see bullish/recorder.py
+RECORD_DIR = os.getenv("BX_RECORD_DIR")
+RECORDER = FeedRecorder(RECORD_DIR) if RECORD_DIR else None
+# prices and quantities are kept as fixed-point integers, see bullish/fixed_point.py
+PRECISION = MarketPrecision.from_market(get_client().get(API_HOST_NAME + "/trading-api/v1/markets/BTCUSD").json())
+# the last TRADE_CAPACITY trades in columnar form, with rolling VWAP, volume, count and high/low over 1 and 5 minutes
+TRADE_CAPACITY = 10_000
+WINDOWS = (60, 300)
 TRADES = None
-CURR_TRADE_ID = None
-
-
-def get_id():
-    return str(int(time.time() * 1000))
-
-
-def ping(conn):
-    ping_message = {
-        "jsonrpc": "2.0",
-        "type": "command",
-        "method": "keepalivePing",
-        "params": {},
-        "id": get_id()
-    }
-    conn.send(json.dumps(ping_message))
-    threading.Timer(interval=5, function=ping, args=(conn,)).start()
+# trade ids increase but are not consecutive, so only stale and duplicate trades are dropped
+TRADE_IDS = SequenceTracker(contiguous=False)
+# the newest trade already counted in CANDLES, so a snapshot after a reconnect only adds the trades it missed
+CANDLE_TRADE_ID = 0
 
 
 def on_message(conn, message):
-    global TRADES, CURR_TRADE_ID
+    global TRADES
     message = json.loads(message)
     if "type" not in message:
         return
     print(message)
     data = message["data"]
     if message["type"] == "snapshot" and isinstance(data, list):
-        if data:
-            CURR_TRADE_ID = data[0]["tradeId"]
-            TRADES = deque(data, maxlen=100)
-        else:
-            TRADES = deque(maxlen=100)
+        # the snapshot lists the most recent trade first
+        TRADES = TradeBuffer(TRADE_CAPACITY, WINDOWS)
+        for trade in reversed(data):
+            add_trade(trade)
+        for trade in TRADE_IDS.reset(int(data[0]["tradeId"]) if data else 0):
+            add_trade(trade)
     if message["type"] == "update":
-        trade_id = data["tradeId"]
-        if trade_id > CURR_TRADE_ID:
-            TRADES.appendleft(data)
-            CURR_TRADE_ID = data["tradeId"]
-        else:
-            print(f"Incoming trade_id must be larger than current trade_id. trade_id={trade_id} curr_trade_id={CURR_TRADE_ID}")
-            conn.close()
+        trade_id = int(data["tradeId"])
+        # updates before the first snapshot are held by TRADE_IDS and released by its reset()
+        for trade in TRADE_IDS.accept(trade_id, trade_id, data):
+            add_trade(trade)
+        if TRADES is not None:
+            report()
 
 
-def on_error(conn, message):
-    print(f"Received error: {message}")
+def add_trade(trade):
+    global CANDLE_TRADE_ID
+    TRADES.append_trade(PRECISION.parse_trade(trade))
+    trade_id = int(trade["tradeId"])
+    if trade_id > CANDLE_TRADE_ID:
+        CANDLE_TRADE_ID = trade_id
+        CANDLES.add_trade(trade["symbol"], trade["price"], trade["quantity"], int(trade["createdAtTimestamp"]))
 
 
-def on_close(conn, close_status_code, close_msg):
-    print(f"Closed connection to {conn.url}. close_status_code={close_status_code}, close_msg={close_msg}")
+def report():
+    for seconds in WINDOWS:
+        window = TRADES.window(seconds)
+        if window.count:
+            print(f"last {seconds}s: trades={window.count} volume={PRECISION.format_quantity(window.volume)} "
+                  f"vwap={PRECISION.format_price(window.vwap())} high={PRECISION.format_price(window.high())} "
+                  f"low={PRECISION.format_price(window.low())}")
 
 
-def open_connection():
-    ws_conn = websocket.WebSocketApp(WS_HOST_NAME + "/trading-api/v1/market-data/trades/BTCUSD",
-                                     on_message=on_message,
-                                     on_error=on_error,
-                                     on_close=on_close)
-    threading.Timer(interval=5, function=ping, args=(ws_conn,)).start()
-    ws_conn.run_forever()
+def on_bar_close(bar):
+    print(f"{bar.symbol} {bar.resolution}s bar closed: open={PRECISION.format_price(bar.open)} "
+          f"high={PRECISION.format_price(bar.high)} low={PRECISION.format_price(bar.low)} "
+          f"close={PRECISION.format_price(bar.close)} volume={PRECISION.format_quantity(bar.volume)}")
 
 
-wst = threading.Thread(target=open_connection)
-wst.start()
+# 1s/1m/5m/1h OHLCV bars built from every trade applied, snapshots included. Trades up to 1s late still count
+CANDLES = CandleAggregator(resolutions=(1, 60, 300, 3600), lateness_ms=1000, on_bar_close=on_bar_close)
+
+
+def on_error(conn, message):
+    print(f"Received error: {message}")
+
+
+def on_close(conn, close_status_code, close_msg):
+    print(f"Closed connection to {conn.url}. close_status_code={close_status_code}, close_msg={close_msg}")
+    print(f"Trade id stats: {TRADE_IDS.stats()}")
+    print(f"Reconnect stats: {SUPERVISOR.metrics.as_dict()}")
+
+
+def on_reconnect():
+    global TRADES
+    # the snapshot sent on the new connection rebuilds the trade buffer, hold any updates until it arrives
+    TRADES = None
+    TRADE_IDS.clear()
+
+
+# Reconnects with a jittered exponential backoff when the connection drops
+SUPERVISOR = FeedSupervisor(WS_HOST_NAME + "/trading-api/v1/market-data/trades/BTCUSD",
+                            on_message=on_message,
+                            on_error=on_error,
+                            on_close=on_close,
+                            on_reconnect=on_reconnect,
+                            recorder=RECORDER,
+                            keepalive_interval=5)
+SUPERVISOR.start()